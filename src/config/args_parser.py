@@ -37,6 +37,20 @@ def parse_args() -> argparse.Namespace:
         default=0,
         help="Seleciona N-ésimo arquivo listado (1..N) sem digitar no menu",
     )
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        default=[],
+        help=(
+            "Várias fontes processadas juntas com um único modelo e inferência em lote "
+            "(arquivos e/ou índices de webcam, ex.: --sources cam1.mp4 cam2.mp4 0)"
+        ),
+    )
+    parser.add_argument(
+        "--input-dir",
+        default="",
+        help="Processa em lote todos os vídeos e imagens de um diretório com vários processos",
+    )
     
     # Argumentos do modelo
     parser.add_argument(
@@ -108,6 +122,16 @@ def parse_args() -> argparse.Namespace:
         default=0.80,
         help="Limiar de matching entre detecções e tracks (ByteTrack)",
     )
+    parser.add_argument(
+        "--tracker-backend",
+        type=str,
+        default="supervision",
+        choices=["supervision", "native"],
+        help=(
+            "Backend de rastreamento: supervision (sv.ByteTrack) ou native "
+            "(associador ByteTrack em NumPy, sem objetos por track)"
+        ),
+    )
     parser.add_argument(
         "--reassoc-window",
         type=int,
@@ -135,6 +159,29 @@ def parse_args() -> argparse.Namespace:
         ),
     )
     
+    # Checkpoint do tracker
+    parser.add_argument(
+        "--checkpoint-dir",
+        type=str,
+        default="",
+        help=(
+            "Diretório para checkpoints do tracker (um arquivo por fonte). Ao iniciar, "
+            "o estado salvo da mesma fonte é restaurado e motos já contadas não são recontadas"
+        ),
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=300,
+        help="Salva checkpoint do tracker a cada N frames (0 desativa o gatilho por frames)",
+    )
+    parser.add_argument(
+        "--checkpoint-seconds",
+        type=float,
+        default=30.0,
+        help="Salva checkpoint do tracker a cada N segundos (0 desativa o gatilho por tempo)",
+    )
+    
     # Argumentos de captura
     parser.add_argument(
         "--backend",
@@ -143,6 +190,14 @@ def parse_args() -> argparse.Namespace:
         choices=["auto", "any", "dshow", "msmf"],
         help="Backend de captura para webcam no Windows (auto, any, dshow, msmf)",
     )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help=(
+            "Webcam em modo ao vivo: thread de captura mantém só o frame mais recente "
+            "(descarta os atrasados), buffer mínimo e MJPG; mostra a latência por frame"
+        ),
+    )
     
     # Argumentos de exibição e saída
     parser.add_argument(
@@ -161,19 +216,226 @@ def parse_args() -> argparse.Namespace:
         default=os.path.join("output", "runs", "geosense_output.mp4"),
         help="Caminho do arquivo de saída (se --save)",
     )
+    parser.add_argument(
+        "--writer",
+        type=str,
+        default="opencv",
+        choices=["opencv", "ffmpeg"],
+        help="Backend de gravação do --save: OpenCV (mp4v) ou processo ffmpeg local via pipe",
+    )
+    parser.add_argument(
+        "--writer-queue",
+        type=int,
+        default=32,
+        help="Frames na fila da thread de gravação (0 = gravação síncrona no loop)",
+    )
+    parser.add_argument(
+        "--ffmpeg-codec",
+        type=str,
+        default="libx264",
+        help="Codec do --writer ffmpeg (ex.: libx264, libx265, h264_nvenc)",
+    )
+    parser.add_argument(
+        "--ffmpeg-preset",
+        type=str,
+        default="veryfast",
+        help="Preset do codec no --writer ffmpeg (ex.: ultrafast, veryfast, medium)",
+    )
+    parser.add_argument(
+        "--output-size",
+        type=str,
+        default="",
+        help="Resolução do vídeo salvo, ex.: 1280x720 (vazio = tamanho do frame)",
+    )
+    parser.add_argument(
+        "--output-fps",
+        type=float,
+        default=0.0,
+        help="FPS do vídeo salvo no --writer ffmpeg (0 = FPS da fonte)",
+    )
     parser.add_argument(
         "--max-frames",
         type=int,
         default=0,
         help="Para após N frames (0 = infinito)",
     )
+    parser.add_argument(
+        "--summary-interval",
+        type=float,
+        default=5.0,
+        help=(
+            "Sem --show e sem --save nada é renderizado; imprime um resumo em texto "
+            "a cada N segundos"
+        ),
+    )
+    
+    # Argumentos de desempenho
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help=(
+            "Executa captura, inferência, rastreamento e saída em estágios paralelos "
+            "com filas limitadas (vazão próxima à do estágio mais lento)"
+        ),
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=4,
+        help="Tamanho máximo de cada fila entre estágios do --pipeline (backpressure)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help=(
+            "Frames por chamada ao modelo em fontes de arquivo (maior = mais vazão, "
+            "mais latência). Webcam sempre usa 1"
+        ),
+    )
+    parser.add_argument(
+        "--detect-every",
+        type=int,
+        default=1,
+        help=(
+            "Roda o detector a cada N frames; nos intermediários o tracker propaga as "
+            "caixas por velocidade constante (1 = todos os frames)"
+        ),
+    )
+    parser.add_argument(
+        "--motion-gate",
+        action="store_true",
+        help=(
+            "Pula a inferência quando o frame não mudou (câmeras estáticas) e reutiliza "
+            "as últimas detecções"
+        ),
+    )
+    parser.add_argument(
+        "--motion-thresh",
+        type=float,
+        default=0.002,
+        help="Fração mínima de pixels alterados para o --motion-gate rodar o detector",
+    )
+    parser.add_argument(
+        "--motion-max-skip",
+        type=int,
+        default=30,
+        help="Máximo de inferências seguidas puladas pelo --motion-gate (0 = sem limite)",
+    )
+    parser.add_argument(
+        "--zones",
+        type=str,
+        default="",
+        help=(
+            "Arquivo JSON de zonas (ex.: data/configs/zones_example.json). A inferência "
+            "roda apenas nos retângulos que cobrem as zonas"
+        ),
+    )
+    parser.add_argument(
+        "--zones-pad",
+        type=int,
+        default=16,
+        help="Margem em pixels ao redor das zonas para não cortar motos na borda",
+    )
+    parser.add_argument(
+        "--zones-reload",
+        type=float,
+        default=1.0,
+        help=(
+            "Verifica a cada N segundos se o arquivo de --zones mudou e aplica as novas "
+            "zonas sem reiniciar o tracker (0 = desativa)"
+        ),
+    )
+    parser.add_argument(
+        "--zones-json-every",
+        type=float,
+        default=5.0,
+        help=(
+            "Intervalo em segundos para gravar a ocupação das zonas no --json-out "
+            "(0 = só ao final)"
+        ),
+    )
+    parser.add_argument(
+        "--zone-debounce",
+        type=int,
+        default=5,
+        help="Frames seguidos em outra zona para registrar entrada/saída (evita visitas de borda)",
+    )
+    parser.add_argument(
+        "--zone-exit-after",
+        type=int,
+        default=0,
+        help=(
+            "Frames sem ver a moto para encerrar sua visita à zona "
+            "(0 = mesmo valor de --reassoc-window)"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Processos workers dos modos --input-dir e --segments (0 = automático)",
+    )
+    parser.add_argument(
+        "--worker-threads",
+        type=int,
+        default=0,
+        help="Threads de torch/OpenCV por worker nos modos --input-dir e --segments (0 = núcleos / workers)",
+    )
+    parser.add_argument(
+        "--segments",
+        type=int,
+        default=0,
+        help=(
+            "Divide um arquivo de vídeo em N segmentos processados em paralelo, com IDs "
+            "costurados nas fronteiras (0 = desativado; não grava vídeo anotado)"
+        ),
+    )
+    parser.add_argument(
+        "--segment-overlap",
+        type=int,
+        default=60,
+        help="Frames de sobreposição com o segmento anterior para aquecer o tracker e costurar IDs",
+    )
     
     # Argumentos de logging
     parser.add_argument(
         "--json-out",
         type=str,
         default=os.path.join("output", "runs", "motos.json"),
-        help="Caminho do arquivo JSON para registrar motos únicas (atualiza incrementalmente)",
+        help=(
+            "Caminho do arquivo JSON para registrar motos únicas (atualiza incrementalmente). "
+            "Com extensão .ndjson/.jsonl cada evento é acrescentado como uma linha, sem reescrever o arquivo"
+        ),
+    )
+    parser.add_argument(
+        "--compact-json",
+        nargs=2,
+        metavar=("NDJSON", "JSON"),
+        default=None,
+        help="Gera o documento JSON aninhado (sources) a partir de um log NDJSON e sai",
+    )
+    parser.add_argument(
+        "--json-durability",
+        type=str,
+        choices=["none", "batch", "every"],
+        default="every",
+        help=(
+            "Durabilidade do --json-out: every grava e sincroniza cada evento; batch agrupa os eventos "
+            "em uma thread de fundo (uma escrita e um fsync por grupo); none agrupa sem fsync"
+        ),
+    )
+    parser.add_argument(
+        "--json-flush-ms",
+        type=float,
+        default=500.0,
+        help="Intervalo máximo em ms entre gravações agrupadas do --json-out (durability batch/none)",
+    )
+    parser.add_argument(
+        "--json-flush-count",
+        type=int,
+        default=256,
+        help="Quantidade de eventos pendentes que antecipa a gravação agrupada do --json-out",
     )
     parser.add_argument(
         "--run-id",
@@ -181,5 +443,15 @@ def parse_args() -> argparse.Namespace:
         default="",
         help="ID único da execução. Se vazio, é gerado automaticamente",
     )
+    parser.add_argument(
+        "--recording-start",
+        type=str,
+        default="",
+        help=(
+            "Modo offline para arquivos: início da gravação (ISO 8601, ex.: 2026-01-05T08:00:00, "
+            "ou 'mtime' = modificação do arquivo menos a duração). detected_at passa a ser esse "
+            "início mais a posição do frame no vídeo, independente da velocidade de processamento"
+        ),
+    )
     
     return parser.parse_args()
@@ -0,0 +1,64 @@
+"""Atribuição ótima com limiar de custo, compartilhada pelo tracker nativo e pela reassociação"""
+
+import numpy as np
+from typing import Tuple
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except Exception:  # SciPy é opcional: sem ele a atribuição é gulosa
+    linear_sum_assignment = None
+
+
+def _solve(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Atribuição de menor custo; sem SciPy, gulosa pelo menor custo"""
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(cost)
+        return rows.astype(np.int64), cols.astype(np.int64)
+
+    rows, cols = [], []
+    used_rows, used_cols = set(), set()
+    for flat in np.argsort(cost, axis=None, kind="stable").tolist():
+        row, col = divmod(flat, cost.shape[1])
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        rows.append(row)
+        cols.append(col)
+    return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+
+
+def linear_assignment(cost: np.ndarray, thresh: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pares (linhas, colunas) da atribuição de menor custo, só com custo <= `thresh`
+
+    Mesma semântica do `linear_assignment` do ByteTrack (custos acima do limiar
+    saturam em `thresh + 1e-4` e os pares saturados são descartados), mas sem
+    resolver a matriz inteira: pares isolados, em que a linha e a coluna só têm
+    uma opção abaixo do limiar, são aceitos direto, e o resolvedor roda apenas
+    sobre as linhas e colunas restantes que têm alguma opção. Em cenas esparsas
+    quase todos os pares são isolados.
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if cost.size == 0:
+        return empty, empty
+
+    feasible = cost <= thresh
+    row_options = np.count_nonzero(feasible, axis=1)
+    col_options = np.count_nonzero(feasible, axis=0)
+    isolated = feasible & (row_options == 1)[:, None] & (col_options == 1)[None, :]
+    rows, cols = np.nonzero(isolated)
+
+    rest_rows = np.flatnonzero((row_options > 0) & ~isolated.any(axis=1))
+    rest_cols = np.flatnonzero((col_options > 0) & ~isolated.any(axis=0))
+    if len(rest_rows) == 0 or len(rest_cols) == 0:
+        return rows.astype(np.int64), cols.astype(np.int64)
+
+    sub = cost[np.ix_(rest_rows, rest_cols)]
+    sub = np.where(sub <= thresh, sub, thresh + 1e-4)
+    sub_rows, sub_cols = _solve(sub)
+    keep = sub[sub_rows, sub_cols] <= thresh
+    return (
+        np.concatenate([rows, rest_rows[sub_rows[keep]]]).astype(np.int64),
+        np.concatenate([cols, rest_cols[sub_cols[keep]]]).astype(np.int64),
+    )
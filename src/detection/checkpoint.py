@@ -0,0 +1,184 @@
+"""Checkpoint binário do estado do tracker, gravado em segundo plano"""
+
+import os
+import queue
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+import numpy as np
+import supervision as sv
+from supervision.tracker.byte_tracker.basetrack import BaseTrack, TrackState
+from supervision.tracker.byte_tracker.core import STrack
+
+if TYPE_CHECKING:
+    from .tracker import MotorcycleTracker
+
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path(directory: str, source_desc: str) -> str:
+    """Arquivo de checkpoint de uma fonte dentro de `directory`"""
+    name = re.sub(r"[^\w.-]+", "_", source_desc).strip("_") or "source"
+    return os.path.join(directory, f"{name}.tracker.npz")
+
+
+def snapshot_byte_track(tracker: sv.ByteTrack) -> Dict[str, np.ndarray]:
+    """Copia os tracks ativos e perdidos do sv.ByteTrack para arrays
+
+    Tracks removidos não são guardados: o ByteTrack só os usa para filtrar a lista
+    de perdidos, que já sai filtrada.
+    """
+    tracks = list(tracker.tracked_tracks) + list(tracker.lost_tracks)
+    n = len(tracks)
+    return {
+        "frame_id": np.int64(tracker.frame_id),
+        "next_id": np.int64(BaseTrack._count),
+        "lost": np.arange(n) >= len(tracker.tracked_tracks),
+        "track_id": np.array([t.track_id for t in tracks], dtype=np.int64),
+        "state": np.array([t.state.value for t in tracks], dtype=np.int8),
+        "activated": np.array([t.is_activated for t in tracks], dtype=bool),
+        "score": np.array([t.score for t in tracks], dtype=np.float32),
+        "class_id": np.array([t.class_ids for t in tracks], dtype=np.float32),
+        "start_frame": np.array([t.start_frame for t in tracks], dtype=np.int64),
+        "end_frame": np.array([t.frame_id for t in tracks], dtype=np.int64),
+        "tracklet_len": np.array([t.tracklet_len for t in tracks], dtype=np.int64),
+        "tlwh": np.array([t._tlwh for t in tracks], dtype=np.float32).reshape(n, 4),
+        "mean": np.array([t.mean for t in tracks], dtype=np.float64).reshape(n, 8),
+        "covariance": np.array([t.covariance for t in tracks], dtype=np.float64).reshape(n, 8, 8),
+    }
+
+
+def restore_byte_track(tracker: sv.ByteTrack, state: Dict[str, np.ndarray]) -> None:
+    """Recria os tracks de um sv.ByteTrack a partir de `snapshot_byte_track`"""
+    tracked, lost = [], []
+    for i in range(len(state["track_id"])):
+        track = STrack(state["tlwh"][i], float(state["score"][i]), float(state["class_id"][i]))
+        track.kalman_filter = tracker.kalman_filter
+        track.mean = state["mean"][i].copy()
+        track.covariance = state["covariance"][i].copy()
+        track.track_id = int(state["track_id"][i])
+        track.state = TrackState(int(state["state"][i]))
+        track.is_activated = bool(state["activated"][i])
+        track.start_frame = int(state["start_frame"][i])
+        track.frame_id = int(state["end_frame"][i])
+        track.tracklet_len = int(state["tracklet_len"][i])
+        (lost if state["lost"][i] else tracked).append(track)
+    tracker.tracked_tracks = tracked
+    tracker.lost_tracks = lost
+    tracker.removed_tracks = []
+    tracker.frame_id = int(state["frame_id"])
+    # O contador de IDs do supervision é global: nunca volta para trás
+    BaseTrack._count = max(BaseTrack._count, int(state["next_id"]))
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, np.ndarray]]:
+    """Lê um checkpoint; None se o arquivo não existe ou não pode ser lido"""
+    if not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            state = {key: data[key] for key in data.files}
+    except Exception as e:
+        print(f"Aviso: não foi possível ler o checkpoint {path}: {e}")
+        return None
+    if int(state.get("version", -1)) != CHECKPOINT_VERSION:
+        print(f"Aviso: checkpoint {path} ignorado (versão incompatível).")
+        return None
+    return state
+
+
+class TrackerCheckpointer:
+    """Grava snapshots do tracker a cada N frames ou T segundos em uma thread de fundo
+
+    O snapshot (cópia dos arrays) é feito na thread do chamador, entre dois
+    updates; compressão e escrita ficam com a thread de fundo. Só o snapshot mais
+    recente espera na fila: se a escrita anterior ainda não terminou, o pendente
+    é substituído. O arquivo é escrito em `.tmp` e trocado atomicamente.
+
+    `extra`, se dado, é chamado junto com cada snapshot e seus arrays entram no
+    mesmo arquivo (ex.: posição no vídeo e IDs já registrados).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        every_frames: int = 300,
+        every_seconds: float = 30.0,
+        extra: Optional[Callable[[], Dict[str, np.ndarray]]] = None,
+    ) -> None:
+        self.path = path
+        self.extra = extra
+        self.every_frames = max(0, int(every_frames))
+        self.every_seconds = max(0.0, float(every_seconds))
+        self.saved = 0
+        self.failed = 0
+        self._last_frame: Optional[int] = None
+        self._last_time = time.monotonic()
+        self._queue: "queue.Queue[Optional[Dict[str, np.ndarray]]]" = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, name="geosense-checkpoint", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            state = self._queue.get()
+            if state is None:
+                return
+            self._write(state)
+
+    def _write(self, state: Dict[str, np.ndarray]) -> None:
+        tmp_path = self.path + ".tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, **state)
+                # Sem o fsync, uma queda de energia pode deixar o arquivo final vazio ou truncado
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.saved += 1
+        except Exception as e:
+            if self.failed == 0:
+                print(f"Aviso: falha ao salvar checkpoint do tracker em {self.path}: {e}")
+            self.failed += 1
+
+    def _submit(self, state: Dict[str, np.ndarray]) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(state)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def maybe_save(self, tracker: "MotorcycleTracker") -> bool:
+        """Faz snapshot do tracker se o intervalo em frames ou segundos venceu"""
+        if self._last_frame is None:
+            self._last_frame = tracker.frame_count
+        frames_due = self.every_frames > 0 and tracker.frame_count - self._last_frame >= self.every_frames
+        seconds_due = self.every_seconds > 0 and time.monotonic() - self._last_time >= self.every_seconds
+        if not (frames_due or seconds_due):
+            return False
+        self.save(tracker)
+        return True
+
+    def save(self, tracker: "MotorcycleTracker") -> None:
+        """Faz snapshot do tracker agora e agenda a escrita"""
+        self._last_frame = tracker.frame_count
+        self._last_time = time.monotonic()
+        state = tracker.snapshot()
+        if self.extra is not None:
+            state.update(self.extra())
+        self._submit(state)
+
+    def close(self, tracker: Optional["MotorcycleTracker"] = None) -> None:
+        """Grava um snapshot final (se `tracker` for dado) e espera a escrita terminar"""
+        if tracker is not None:
+            self.save(tracker)
+        self._queue.put(None)
+        self._thread.join()
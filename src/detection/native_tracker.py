@@ -0,0 +1,235 @@
+"""Associador estilo ByteTrack em NumPy puro, operando direto sobre arrays"""
+
+import numpy as np
+from typing import Dict, Tuple
+
+from ..utils.geometry import pairwise_iou_xyxy
+from .assignment import linear_assignment
+
+_ARRAYS = ("track_id", "boxes", "velocity", "score", "start_frame",
+           "end_frame", "state", "activated", "slot")
+
+# Estados de um track
+_TRACKED = 1
+_LOST = 2
+_REMOVED = 3
+
+# Mesmos limiares fixos do ByteTrack do supervision
+_LOW_SCORE = 0.1
+_SECOND_MATCH_THRESH = 0.5
+_UNCONFIRMED_MATCH_THRESH = 0.7
+_DUPLICATE_IOU_DIST = 0.15
+
+# Peso da velocidade medida na média móvel do modelo de velocidade constante
+_VELOCITY_SMOOTHING = 0.5
+
+
+class NativeByteTrack:
+    """
+    Associação em duas etapas do ByteTrack sobre arrays, sem objetos por track
+
+    Reproduz as regras do `sv.ByteTrack` (supervision 0.18): detecções acima de
+    `track_thresh` associam primeiro com tracks ativos e perdidos (custo
+    `1 - IoU * confiança`, limiar `match_thresh`), as de confiança baixa
+    (0.1 < conf < `track_thresh`) recuperam tracks ativos que sobraram (limiar
+    0.5), tracks de um frame só precisam de uma segunda detecção (limiar 0.7) para
+    serem ativados, novos tracks exigem `track_thresh + 0.1`, tracks perdidos
+    expiram após `track_buffer` frames e duplicatas entre ativos e perdidos são
+    descartadas.
+
+    Diferenças deliberadas: o filtro de Kalman é trocado por velocidade constante
+    suavizada em xyxy, e a caixa devolvida é a da detecção, não a estimada.
+
+    O estado fica em arrays paralelos, um índice por track, compactados quando
+    tracks são removidos; como IDs novos entram no fim, `track_id` fica ordenado.
+    A coluna `slot` guarda o slot do ID canônico do `MotorcycleTracker`, o que
+    dispensa o mapeamento tid -> slot por dicionário.
+    """
+
+    def __init__(
+        self,
+        track_thresh: float = 0.25,
+        track_buffer: int = 30,
+        match_thresh: float = 0.8,
+        frame_rate: int = 30,
+    ):
+        self.track_thresh = track_thresh
+        self.match_thresh = match_thresh
+        self.det_thresh = track_thresh + 0.1
+        self.max_time_lost = int(frame_rate / 30.0 * track_buffer)
+
+        self.frame_id = 0
+        self._next_id = 1
+
+        self.track_id = np.zeros(0, dtype=np.int64)
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.velocity = np.zeros((0, 4), dtype=np.float32)
+        self.score = np.zeros(0, dtype=np.float32)
+        self.start_frame = np.zeros(0, dtype=np.int64)
+        self.end_frame = np.zeros(0, dtype=np.int64)
+        self.state = np.zeros(0, dtype=np.int8)
+        self.activated = np.zeros(0, dtype=bool)
+        self.slot = np.zeros(0, dtype=np.int64)
+
+    def size(self) -> int:
+        """Número de tracks mantidos (ativos, não confirmados e perdidos)"""
+        return len(self.track_id)
+
+    def predict(self) -> np.ndarray:
+        """Caixas previstas para o frame atual por velocidade constante"""
+        steps = (self.frame_id - self.end_frame).astype(np.float32)
+        return self.boxes + self.velocity * steps[:, None]
+
+    def _match(
+        self,
+        tracks: np.ndarray,
+        predicted: np.ndarray,
+        rows: np.ndarray,
+        xyxy: np.ndarray,
+        scores: np.ndarray,
+        thresh: float,
+        fuse_score: bool,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Associa tracks a linhas de detecção; retorna os índices casados de cada lado"""
+        if len(tracks) == 0 or len(rows) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        similarity = pairwise_iou_xyxy(predicted[tracks], xyxy[rows])
+        if fuse_score:
+            similarity *= scores[rows][None, :]
+        matched_tracks, matched_rows = linear_assignment(1.0 - similarity, thresh)
+        return tracks[matched_tracks], rows[matched_rows]
+
+    def _apply(self, tracks: np.ndarray, rows: np.ndarray, xyxy: np.ndarray, scores: np.ndarray) -> None:
+        """Atualiza (ou reativa) tracks com as detecções casadas"""
+        if len(tracks) == 0:
+            return
+        gaps = np.maximum(1, self.frame_id - self.end_frame[tracks]).astype(np.float32)
+        measured = (xyxy[rows] - self.boxes[tracks]) / gaps[:, None]
+        first = (self.end_frame[tracks] == self.start_frame[tracks])[:, None]
+        self.velocity[tracks] = np.where(
+            first,
+            measured,
+            _VELOCITY_SMOOTHING * measured + (1.0 - _VELOCITY_SMOOTHING) * self.velocity[tracks],
+        )
+        self.boxes[tracks] = xyxy[rows]
+        self.score[tracks] = scores[rows]
+        self.end_frame[tracks] = self.frame_id
+        self.state[tracks] = _TRACKED
+        self.activated[tracks] = True
+
+    def _spawn(self, rows: np.ndarray, xyxy: np.ndarray, scores: np.ndarray) -> None:
+        """Cria um track para cada linha dada, no fim dos arrays"""
+        n = len(rows)
+        self.track_id = np.concatenate([self.track_id, np.arange(self._next_id, self._next_id + n)])
+        self._next_id += n
+        self.boxes = np.concatenate([self.boxes, xyxy[rows]])
+        self.velocity = np.concatenate([self.velocity, np.zeros((n, 4), dtype=np.float32)])
+        self.score = np.concatenate([self.score, scores[rows]])
+        self.start_frame = np.concatenate([self.start_frame, np.full(n, self.frame_id)])
+        self.end_frame = np.concatenate([self.end_frame, np.full(n, self.frame_id)])
+        self.state = np.concatenate([self.state, np.full(n, _TRACKED, dtype=np.int8)])
+        # Como no ByteTrack, só tracks do primeiro frame já nascem ativados
+        self.activated = np.concatenate([self.activated, np.full(n, self.frame_id == 1)])
+        self.slot = np.concatenate([self.slot, np.full(n, -1, dtype=np.int64)])
+
+    def _remove_duplicates(self, predicted: np.ndarray) -> None:
+        """Descarta o mais recente de cada par ativo/perdido com IoU > 0.85"""
+        tracked = np.flatnonzero(self.state == _TRACKED)
+        lost = np.flatnonzero(self.state == _LOST)
+        if len(tracked) == 0 or len(lost) == 0:
+            return
+        iou = pairwise_iou_xyxy(self.boxes[tracked], predicted[lost])
+        pairs_t, pairs_l = np.nonzero(1.0 - iou < _DUPLICATE_IOU_DIST)
+        if len(pairs_t) == 0:
+            return
+        age_t = self.end_frame[tracked[pairs_t]] - self.start_frame[tracked[pairs_t]]
+        age_l = self.end_frame[lost[pairs_l]] - self.start_frame[lost[pairs_l]]
+        self.state[np.where(age_t > age_l, lost[pairs_l], tracked[pairs_t])] = _REMOVED
+
+    def _compact(self, det_row: np.ndarray) -> np.ndarray:
+        """Remove tracks descartados dos arrays; retorna `det_row` compactado"""
+        keep = self.state != _REMOVED
+        if keep.all():
+            return det_row
+        for name in _ARRAYS:
+            setattr(self, name, getattr(self, name)[keep])
+        return det_row[keep]
+
+    def update(self, xyxy: np.ndarray, confidence: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Avança um frame com as detecções (N, 4) e suas confianças
+
+        Returns:
+            Tuple de (linhas das detecções rastreadas, índices dos tracks correspondentes);
+            os índices valem até o próximo `update`
+        """
+        self.frame_id += 1
+        xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        scores = np.asarray(confidence, dtype=np.float32).reshape(-1)
+
+        high = np.flatnonzero(scores > self.track_thresh)
+        low = np.flatnonzero((scores > _LOW_SCORE) & (scores < self.track_thresh))
+
+        predicted = self.predict()
+        det_row = np.full(len(self.track_id), -1, dtype=np.int64)
+        tracked = self.state == _TRACKED
+        pool = np.flatnonzero((tracked & self.activated) | (self.state == _LOST))
+        unconfirmed = np.flatnonzero(tracked & ~self.activated)
+
+        # Primeira associação: detecções de confiança alta com tracks ativos e perdidos
+        tracks, rows = self._match(pool, predicted, high, xyxy, scores, self.match_thresh, True)
+        self._apply(tracks, rows, xyxy, scores)
+        det_row[tracks] = rows
+        pool_left = pool[det_row[pool] < 0]
+        high_left = np.setdiff1d(high, rows, assume_unique=True)
+
+        # Segunda associação: confiança baixa só recupera tracks que estavam ativos
+        remaining = pool_left[self.state[pool_left] == _TRACKED]
+        tracks, rows = self._match(remaining, predicted, low, xyxy, scores, _SECOND_MATCH_THRESH, False)
+        self._apply(tracks, rows, xyxy, scores)
+        det_row[tracks] = rows
+        self.state[remaining[det_row[remaining] < 0]] = _LOST
+
+        # Tracks de um frame só: confirmados pela segunda detecção ou descartados
+        tracks, rows = self._match(unconfirmed, predicted, high_left, xyxy, scores, _UNCONFIRMED_MATCH_THRESH, True)
+        self._apply(tracks, rows, xyxy, scores)
+        det_row[tracks] = rows
+        self.state[unconfirmed[det_row[unconfirmed] < 0]] = _REMOVED
+        high_left = np.setdiff1d(high_left, rows, assume_unique=True)
+
+        # Novos tracks a partir das detecções altas que sobraram
+        new_rows = high_left[scores[high_left] >= self.det_thresh]
+        if len(new_rows) > 0:
+            self._spawn(new_rows, xyxy, scores)
+            predicted = np.concatenate([predicted, xyxy[new_rows]])
+            det_row = np.concatenate([det_row, new_rows])
+
+        # Perdidos há mais de `track_buffer` frames expiram
+        expired = (self.state == _LOST) & (self.frame_id - self.end_frame > self.max_time_lost)
+        self.state[expired] = _REMOVED
+
+        self._remove_duplicates(predicted)
+        det_row = self._compact(det_row)
+
+        out = np.flatnonzero((self.state == _TRACKED) & self.activated)
+        return det_row[out], out
+
+    def release_slots(self, slots: np.ndarray) -> None:
+        """Desvincula tracks de slots canônicos liberados"""
+        if len(slots) > 0 and len(self.slot) > 0:
+            self.slot[np.isin(self.slot, slots)] = -1
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Cópia do estado completo, para checkpoint"""
+        state = {name: getattr(self, name).copy() for name in _ARRAYS}
+        state["frame_id"] = np.int64(self.frame_id)
+        state["next_id"] = np.int64(self._next_id)
+        return state
+
+    def restore(self, state: Dict[str, np.ndarray]) -> None:
+        """Substitui o estado pelo de `snapshot`"""
+        for name in _ARRAYS:
+            setattr(self, name, np.array(state[name], dtype=getattr(self, name).dtype))
+        self.frame_id = int(state["frame_id"])
+        self._next_id = int(state["next_id"])
@@ -0,0 +1,115 @@
+"""Índice espacial em grade uniforme para candidatos à reassociação"""
+
+import numpy as np
+from typing import Tuple
+
+# Chave de célula: (ix + deslocamento) * passo + (iy + deslocamento), aceitando índices negativos
+_KEY_OFFSET = 1 << 20
+_KEY_STRIDE = 1 << 21
+
+
+class SpatialGrid:
+    """
+    Grade uniforme que indexa cada slot pela célula do centro da sua caixa
+
+    A chave de célula de cada slot é mantida de forma incremental em um array; a
+    visão ordenada por célula só é refeita quando algum slot mudou de célula, entrou
+    ou saiu do índice, então motos paradas ou com pequeno jitter não custam nada. A
+    consulta busca todas as células vizinhas de uma vez com `searchsorted`.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = max(1.0, float(cell_size))
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._indexed = np.zeros(0, dtype=bool)
+        self._sorted_slots = np.zeros(0, dtype=np.int64)
+        self._sorted_keys = np.zeros(0, dtype=np.int64)
+        self._dirty = False
+
+    @property
+    def cell_count(self) -> int:
+        self._refresh()
+        return len(np.unique(self._sorted_keys))
+
+    def _cell_keys(self, ix: np.ndarray, iy: np.ndarray) -> np.ndarray:
+        return (ix + _KEY_OFFSET) * _KEY_STRIDE + (iy + _KEY_OFFSET)
+
+    def _ensure(self, size: int) -> None:
+        if size <= len(self._indexed):
+            return
+        size = max(size, 2 * len(self._indexed))
+        keys = np.zeros(size, dtype=np.int64)
+        keys[:len(self._keys)] = self._keys
+        indexed = np.zeros(size, dtype=bool)
+        indexed[:len(self._indexed)] = self._indexed
+        self._keys, self._indexed = keys, indexed
+
+    def _refresh(self) -> None:
+        """Refaz a visão ordenada por célula se o índice mudou"""
+        if not self._dirty:
+            return
+        slots = np.flatnonzero(self._indexed)
+        order = np.argsort(self._keys[slots], kind="stable")
+        self._sorted_slots = slots[order]
+        self._sorted_keys = self._keys[self._sorted_slots]
+        self._dirty = False
+
+    def update(self, slots: np.ndarray, boxes: np.ndarray) -> None:
+        """Indexa (ou move) os slots pelo centro das suas caixas atuais"""
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0:
+            return
+        self._ensure(int(slots.max()) + 1)
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        ix = np.floor((boxes[:, 0] + boxes[:, 2]) / (2.0 * self.cell_size)).astype(np.int64)
+        iy = np.floor((boxes[:, 1] + boxes[:, 3]) / (2.0 * self.cell_size)).astype(np.int64)
+        keys = self._cell_keys(ix, iy)
+        if np.any(~self._indexed[slots] | (self._keys[slots] != keys)):
+            self._keys[slots] = keys
+            self._indexed[slots] = True
+            self._dirty = True
+
+    def remove(self, slots: np.ndarray) -> None:
+        """Remove slots do índice (caixas expiradas ou slots liberados)"""
+        slots = np.asarray(slots, dtype=np.int64)
+        slots = slots[slots < len(self._indexed)]
+        if len(slots) > 0 and self._indexed[slots].any():
+            self._indexed[slots] = False
+            self._dirty = True
+
+    def query_pairs(self, boxes: np.ndarray, margin_x: np.ndarray, margin_y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pares (índice da caixa consultada, slot) para os slots cujos centros caem nas
+        células a até `margin_x`/`margin_y` (por caixa) do centro de cada caixa consultada
+        """
+        self._refresh()
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if len(boxes) == 0 or len(self._sorted_keys) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        cx = (boxes[:, 0] + boxes[:, 2]) / 2.0
+        cy = (boxes[:, 1] + boxes[:, 3]) / 2.0
+        x0 = np.floor((cx - margin_x) / self.cell_size).astype(np.int64)
+        x1 = np.floor((cx + margin_x) / self.cell_size).astype(np.int64)
+        y0 = np.floor((cy - margin_y) / self.cell_size).astype(np.int64)
+        y1 = np.floor((cy + margin_y) / self.cell_size).astype(np.int64)
+
+        # Todas as células (caixa, dx, dy) do retângulo de cada caixa
+        span_x, span_y = int((x1 - x0).max()) + 1, int((y1 - y0).max()) + 1
+        dx = np.arange(span_x)[None, :, None]
+        dy = np.arange(span_y)[None, None, :]
+        valid = (dx <= (x1 - x0)[:, None, None]) & (dy <= (y1 - y0)[:, None, None])
+        rows = np.broadcast_to(np.arange(len(boxes))[:, None, None], valid.shape)[valid]
+        keys = self._cell_keys((x0[:, None, None] + dx), (y0[:, None, None] + dy))
+        keys = np.broadcast_to(keys, valid.shape)[valid]
+
+        # Cada célula é um intervalo contíguo na visão ordenada
+        lo = np.searchsorted(self._sorted_keys, keys, side="left")
+        hi = np.searchsorted(self._sorted_keys, keys, side="right")
+        counts = hi - lo
+        total = int(counts.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        positions = starts + np.arange(total)
+        return np.repeat(rows, counts), self._sorted_slots[positions]
@@ -0,0 +1,109 @@
+"""Armazenamento em arrays (struct-of-arrays) do estado dos IDs canônicos"""
+
+import numpy as np
+from typing import Dict, Iterable, List, Sequence
+
+_ARRAYS = ("canonical_id", "boxes", "velocity", "last_seen", "seen_frames",
+           "alive", "has_box", "has_velocity", "confirmed")
+
+
+class CanonicalStore:
+    """
+    Estado dos IDs canônicos em arrays pré-alocados, um slot por ID
+
+    Caixas e velocidades ficam em arrays float32 (N, 4), último frame visto e frames
+    vistos em int32, e flags em arrays booleanos. Slots liberados voltam para uma
+    free-list e são reutilizados; a capacidade dobra quando acaba. `track_slot`
+    indexa tracks do ByteTrack (tid) para o slot do ID canônico.
+    """
+
+    def __init__(self, capacity: int = 256):
+        capacity = max(1, int(capacity))
+        self.canonical_id = np.full(capacity, -1, dtype=np.int64)
+        self.boxes = np.zeros((capacity, 4), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 4), dtype=np.float32)
+        self.last_seen = np.zeros(capacity, dtype=np.int32)
+        self.seen_frames = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.has_box = np.zeros(capacity, dtype=bool)
+        self.has_velocity = np.zeros(capacity, dtype=bool)
+        self.confirmed = np.zeros(capacity, dtype=bool)
+
+        self.track_slot: Dict[int, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+    @property
+    def capacity(self) -> int:
+        return len(self.canonical_id)
+
+    def _grow(self) -> None:
+        """Dobra a capacidade dos arrays e adiciona os novos slots à free-list"""
+        old = self.capacity
+        new = old * 2
+        for name in _ARRAYS:
+            array = getattr(self, name)
+            grown = np.zeros((new,) + array.shape[1:], dtype=array.dtype)
+            grown[:old] = array
+            setattr(self, name, grown)
+        self.canonical_id[old:] = -1
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    def allocate(self, canonical_id: int) -> int:
+        """Reserva um slot para um novo ID canônico e retorna seu índice"""
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self.canonical_id[slot] = canonical_id
+        self.last_seen[slot] = 0
+        self.seen_frames[slot] = 0
+        self.alive[slot] = True
+        self.has_box[slot] = False
+        self.has_velocity[slot] = False
+        self.confirmed[slot] = False
+        return slot
+
+    def release(self, slots: Sequence[int]) -> None:
+        """Libera slots e remove os tracks que apontavam para eles"""
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0:
+            return
+        self.alive[slots] = False
+        self.has_box[slots] = False
+        self.has_velocity[slots] = False
+        self.canonical_id[slots] = -1
+        self._free.extend(slots.tolist())
+        released = set(slots.tolist())
+        self.track_slot = {tid: slot for tid, slot in self.track_slot.items() if slot not in released}
+
+    def retain_tracks(self, live_tids: Iterable[int]) -> int:
+        """Mantém no mapeamento só os tids ainda vivos no ByteTrack; retorna quantos saíram"""
+        live = set(live_tids)
+        before = len(self.track_slot)
+        self.track_slot = {tid: slot for tid, slot in self.track_slot.items() if tid in live}
+        return before - len(self.track_slot)
+
+    def slots_for_tracks(self, tracker_ids: np.ndarray) -> np.ndarray:
+        """Slot de cada tid (-1 para tracks ainda sem ID canônico)"""
+        return np.fromiter(
+            (self.track_slot.get(int(tid), -1) for tid in tracker_ids),
+            dtype=np.int64,
+            count=len(tracker_ids),
+        )
+
+    def size(self) -> int:
+        """Número de IDs canônicos vivos"""
+        return int(np.count_nonzero(self.alive))
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Cópia dos arrays e do mapeamento tid -> slot, para checkpoint"""
+        state = {name: getattr(self, name).copy() for name in _ARRAYS}
+        state["track_tids"] = np.fromiter(self.track_slot.keys(), dtype=np.int64, count=len(self.track_slot))
+        state["track_slots"] = np.fromiter(self.track_slot.values(), dtype=np.int64, count=len(self.track_slot))
+        return state
+
+    def restore(self, state: Dict[str, np.ndarray]) -> None:
+        """Substitui o estado pelo de `snapshot`; a free-list é refeita a partir de `alive`"""
+        for name in _ARRAYS:
+            setattr(self, name, np.array(state[name], dtype=getattr(self, name).dtype))
+        self.track_slot = dict(zip(state["track_tids"].tolist(), state["track_slots"].tolist()))
+        self._free = np.flatnonzero(~self.alive)[::-1].tolist()
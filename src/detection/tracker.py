@@ -4,7 +4,25 @@ import numpy as np
 import supervision as sv
 from typing import Dict, List, Optional, Set, Tuple
 
-from ..utils.geometry import bbox_iou_xyxy, center_distance_xyxy
+from ..utils.geometry import (
+    paired_center_distance_xyxy,
+    paired_iou_xyxy,
+    pairwise_center_distance_xyxy,
+    pairwise_iou_xyxy,
+)
+from .assignment import linear_assignment
+from .checkpoint import CHECKPOINT_VERSION, restore_byte_track, snapshot_byte_track
+from .native_tracker import NativeByteTrack
+from .spatial_grid import SpatialGrid
+from .track_store import CanonicalStore
+
+TRACKER_BACKENDS = ("supervision", "native")
+
+# Custo de pares que não podem ser reassociados
+_FORBIDDEN_COST = 1e6
+
+# Abaixo deste número de IDs perdidos a matriz completa é mais barata que consultar a grade
+_GRID_MIN_CANDIDATES = 64
 
 
 class MotorcycleTracker:
@@ -20,7 +38,9 @@ class MotorcycleTracker:
         reassoc_iou: float = 0.30,
         reassoc_dist_frac: float = 0.03,
         frame_width: int = 1920,
-        frame_height: int = 1080
+        frame_height: int = 1080,
+        detect_every: int = 1,
+        backend: str = "supervision"
     ):
         """
         Args:
@@ -33,26 +53,50 @@ class MotorcycleTracker:
             reassoc_dist_frac: Fração da diagonal do frame para distância máxima
             frame_width: Largura do frame
             frame_height: Altura do frame
+            detect_every: Intervalo entre keyframes com detecção; nos demais frames as
+                caixas são propagadas com `propagate`
+            backend: "supervision" (sv.ByteTrack) ou "native" (NativeByteTrack sobre
+                arrays, com o slot canônico guardado no próprio track)
         """
-        self.byte_tracker = sv.ByteTrack(
+        if backend not in TRACKER_BACKENDS:
+            raise ValueError(f"Backend de tracker inválido: {backend} (use {', '.join(TRACKER_BACKENDS)})")
+        self.detect_every = max(1, int(detect_every))
+        self.backend = backend
+        
+        # ByteTrack só avança em keyframes: buffer convertido para keyframes
+        tracker_cls = NativeByteTrack if backend == "native" else sv.ByteTrack
+        self.byte_tracker = tracker_cls(
             track_thresh=track_thresh,
             match_thresh=match_thresh,
-            track_buffer=track_buffer,
+            track_buffer=max(1, track_buffer // self.detect_every),
         )
         
         self.min_track_frames = min_track_frames
+        self.track_buffer = track_buffer
         self.reassoc_window = reassoc_window
         self.reassoc_iou = reassoc_iou
         self.reassoc_dist_frac = reassoc_dist_frac
         
         self.frame_diagonal = float(np.hypot(frame_width, frame_height))
         
-        # Controle de IDs canônicos
-        self.unique_canonical_ids: Set[int] = set()
-        self.canonical_seen_frames: Dict[int, int] = {}
-        self.track_to_canonical: Dict[int, int] = {}
-        self.canonical_last_bbox: Dict[int, np.ndarray] = {}
-        self.canonical_last_seen_frame: Dict[int, int] = {}
+        # Estado dos IDs canônicos em arrays, um slot por ID
+        self.store = CanonicalStore()
+        
+        # Grade sobre os centros das caixas candidatas à reassociação
+        self._reassoc_dist = self.reassoc_dist_frac * self.frame_diagonal
+        self.grid = SpatialGrid(cell_size=max(self._reassoc_dist, self.frame_diagonal / 64.0))
+        self._newly_confirmed: Set[int] = set()
+        
+        # Contadores O(1): continuam corretos depois que o estado antigo é removido
+        self.unique_count = 0
+        self.evicted_count = 0
+        self._evict_interval = max(1, min(reassoc_window, track_buffer) // 2)
+        
+        # Saída do último keyframe, usada para propagar caixas entre detecções
+        self._last_detections: sv.Detections = sv.Detections.empty()
+        self._last_canonical_ids: List[Optional[int]] = []
+        self._last_slots = np.zeros(0, dtype=np.int64)
+        self._last_update_frame = 0
         
         self.frame_count = 0
     
@@ -64,101 +108,259 @@ class MotorcycleTracker:
             Tuple de (detecções com tracker_id, lista de IDs canônicos correspondentes)
         """
         # Atualiza ByteTrack
-        detections = self.byte_tracker.update_with_detections(detections)
+        detections, det_slots, track_rows = self._associate(detections)
         
-        # Gerencia IDs canônicos
-        current_canonical_ids: Set[int] = set()
+        store = self.store
         det_canonical_ids: List[Optional[int]] = [None] * len(detections)
+        self._newly_confirmed = set()
         
-        # Primeiro passo: mapeia tracks existentes para IDs canônicos
-        if len(detections) > 0 and detections.tracker_id is not None:
-            for i in range(len(detections)):
-                tid = detections.tracker_id[i]
-                if tid is None:
-                    continue
-                tid_int = int(tid)
-                
-                if tid_int in self.track_to_canonical:
-                    cid = self.track_to_canonical[tid_int]
-                    det_canonical_ids[i] = cid
-                    current_canonical_ids.add(cid)
-                    
-                    # Atualiza último bbox e frame visto
-                    try:
-                        self.canonical_last_bbox[cid] = detections.xyxy[i].copy()
-                    except Exception:
-                        self.canonical_last_bbox[cid] = np.array(detections.xyxy[i], dtype=float)
-                    self.canonical_last_seen_frame[cid] = self.frame_count
-        
-        # Segundo passo: reassocia tracks novos ou perdidos
         if len(detections) > 0 and detections.tracker_id is not None:
-            for i in range(len(detections)):
-                tid = detections.tracker_id[i]
-                if tid is None:
-                    continue
-                tid_int = int(tid)
-                
-                # Se já tem mapeamento, pula
-                if tid_int in self.track_to_canonical:
-                    continue
-                
-                bbox = detections.xyxy[i]
-                best_cid: Optional[int] = None
-                best_iou = -1.0
-                best_dist = 1e12
-                
-                # Procura por ID canônico próximo recentemente perdido
-                for cid, last_bbox in list(self.canonical_last_bbox.items()):
-                    last_seen = self.canonical_last_seen_frame.get(cid, -10**9)
-                    
-                    # Ignora se muito antigo ou já em uso
-                    if self.frame_count - last_seen > self.reassoc_window:
-                        continue
-                    if cid in current_canonical_ids:
-                        continue
-                    
-                    # Calcula similaridade
-                    iou = bbox_iou_xyxy(bbox, last_bbox)
-                    dist = center_distance_xyxy(bbox, last_bbox)
-                    
-                    if iou > best_iou or (abs(iou - best_iou) < 1e-9 and dist < best_dist):
-                        best_iou = iou
-                        best_dist = dist
-                        best_cid = cid
+            xyxy = np.asarray(detections.xyxy, dtype=np.float32)
+            
+            # Primeiro passo: tracks existentes atualizam o slot do seu ID canônico
+            known = np.flatnonzero(det_slots >= 0)
+            known_slots = det_slots[known]
+            if len(known) > 0:
+                # Estima velocidade por frame para propagação entre keyframes
+                if self.detect_every > 1:
+                    with_box = store.has_box[known_slots]
+                    rows, slots = known[with_box], known_slots[with_box]
+                    gaps = np.maximum(1, self.frame_count - store.last_seen[slots]).astype(np.float32)
+                    store.velocity[slots] = (xyxy[rows] - store.boxes[slots]) / gaps[:, None]
+                    store.has_velocity[slots] = True
                 
-                # Decide se reassocia ou cria novo ID
-                dist_thresh = self.reassoc_dist_frac * self.frame_diagonal
-                if best_cid is not None and (best_iou >= self.reassoc_iou or best_dist <= dist_thresh):
-                    cid = best_cid
+                store.boxes[known_slots] = xyxy[known]
+                store.has_box[known_slots] = True
+                store.last_seen[known_slots] = self.frame_count
+                self.grid.update(known_slots, xyxy[known])
+            
+            # Segundo passo: reassocia tracks novos com IDs canônicos perdidos recentemente
+            new_rows = np.flatnonzero(det_slots < 0)
+            if len(new_rows) > 0:
+                lost = store.has_box & (self.frame_count - store.last_seen <= self.reassoc_window)
+                lost[known_slots] = False
+                lost_slots = np.flatnonzero(lost)
+                if self.reassoc_iou > 0 and len(lost_slots) > _GRID_MIN_CANDIDATES:
+                    candidates = self._nearby_candidates(xyxy[new_rows], lost_slots, lost)
                 else:
-                    cid = tid_int  # Novo ID canônico
+                    candidates = self._dense_candidates(xyxy[new_rows], lost_slots)
+                assignment = self._assign_lost(*candidates)
                 
-                # Mapeia e atualiza
-                self.track_to_canonical[tid_int] = cid
-                det_canonical_ids[i] = cid
-                current_canonical_ids.add(cid)
+                for row, i in enumerate(new_rows.tolist()):
+                    tid_int = int(detections.tracker_id[i])
+                    # Reassocia ao slot perdido atribuído ou cria novo ID canônico
+                    slot = assignment.get(row)
+                    if slot is None:
+                        slot = store.allocate(tid_int)
+                    if track_rows is None:
+                        store.track_slot[tid_int] = slot
+                    det_slots[i] = slot
                 
-                try:
-                    self.canonical_last_bbox[cid] = bbox.copy()
-                except Exception:
-                    self.canonical_last_bbox[cid] = np.array(bbox, dtype=float)
-                self.canonical_last_seen_frame[cid] = self.frame_count
-        
-        # Atualiza contadores de frames vistos
-        for cid in current_canonical_ids:
-            self.canonical_seen_frames[cid] = self.canonical_seen_frames.get(cid, 0) + 1
+                new_slots = det_slots[new_rows]
+                if track_rows is not None:
+                    self.byte_tracker.slot[track_rows[new_rows]] = new_slots
+                store.boxes[new_slots] = xyxy[new_rows]
+                store.has_box[new_slots] = True
+                store.last_seen[new_slots] = self.frame_count
+                self.grid.update(new_slots, xyxy[new_rows])
             
-            # Confirma como único se atingiu o mínimo de frames
-            if cid not in self.unique_canonical_ids and self.canonical_seen_frames[cid] >= self.min_track_frames:
-                self.unique_canonical_ids.add(cid)
+            # Atualiza contadores de frames vistos e confirma quem atingiu o mínimo
+            current = np.unique(det_slots)
+            store.seen_frames[current] += 1
+            newly = current[~store.confirmed[current] & (store.seen_frames[current] >= self.min_track_frames)]
+            store.confirmed[newly] = True
+            self.unique_count += len(newly)
+            self._newly_confirmed = set(store.canonical_id[newly].tolist())
+            det_canonical_ids = store.canonical_id[det_slots].tolist()
         
+        if self.frame_count % self._evict_interval == 0:
+            self._evict_stale()
+        
+        self._last_detections = detections
+        self._last_canonical_ids = det_canonical_ids
+        self._last_slots = det_slots
+        self._last_update_frame = self.frame_count
         self.frame_count += 1
         
         return detections, det_canonical_ids
     
+    def _associate(self, detections: sv.Detections) -> Tuple[sv.Detections, np.ndarray, Optional[np.ndarray]]:
+        """
+        Roda o backend de tracking sobre as detecções do keyframe
+        
+        Returns:
+            Tuple de (detecções com tracker_id, slot canônico de cada uma ou -1,
+            índices dos tracks no backend nativo ou None no supervision)
+        """
+        if self.backend == "native":
+            if len(detections) == 0 or detections.confidence is None:
+                rows, tracks = self.byte_tracker.update(np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32))
+            else:
+                rows, tracks = self.byte_tracker.update(detections.xyxy, detections.confidence)
+            detections = detections[rows] if len(rows) > 0 else sv.Detections.empty()
+            detections.tracker_id = self.byte_tracker.track_id[tracks]
+            return detections, self.byte_tracker.slot[tracks], tracks
+        
+        detections = self.byte_tracker.update_with_detections(detections)
+        if len(detections) == 0 or detections.tracker_id is None:
+            return detections, np.zeros(0, dtype=np.int64), None
+        return detections, self.store.slots_for_tracks(detections.tracker_id), None
+    
+    def propagate(self) -> Tuple[sv.Detections, List[Optional[int]]]:
+        """
+        Avança um frame sem detecção, propagando as caixas do último keyframe
+        
+        Usa velocidade constante por ID canônico. Frames propagados não contam para
+        `min_track_frames`: a confirmação exige observações reais do detector.
+        
+        Returns:
+            Tuple de (detecções propagadas, lista de IDs canônicos correspondentes)
+        """
+        self._newly_confirmed = set()
+        detections = self._last_detections
+        
+        if len(detections) > 0 and len(self._last_slots) == len(detections):
+            steps = self.frame_count - self._last_update_frame
+            slots = self._last_slots
+            velocities = np.where(self.store.has_velocity[slots][:, None], self.store.velocity[slots], 0.0)
+            detections = sv.Detections(
+                xyxy=detections.xyxy + velocities * steps,
+                confidence=detections.confidence,
+                class_id=detections.class_id,
+                tracker_id=detections.tracker_id,
+            )
+        
+        self.frame_count += 1
+        
+        return detections, list(self._last_canonical_ids)
+    
+    def _evict_stale(self) -> None:
+        """
+        Libera o estado de IDs canônicos que não podem mais voltar
+        
+        Caixas e velocidades saem após `reassoc_window` frames sem o ID (não é mais
+        candidato à reassociação). O slot inteiro, incluindo os tracks do ByteTrack
+        que apontam para ele, é liberado após `max(reassoc_window, track_buffer)`
+        frames, quando o ByteTrack também já descartou os tracks. Tids que o
+        ByteTrack já descartou saem do mapeamento tid -> slot mesmo que o ID
+        canônico continue vivo com outro tid (ex.: moto parada piscando).
+        """
+        store = self.store
+        reassoc_cutoff = self.frame_count - self.reassoc_window
+        identity_cutoff = self.frame_count - max(self.reassoc_window, self.track_buffer)
+        
+        stale = store.has_box & (store.last_seen < reassoc_cutoff)
+        self.grid.remove(np.flatnonzero(stale))
+        store.has_box[stale] = False
+        store.has_velocity[stale] = False
+        
+        dead = np.flatnonzero(store.alive & (store.last_seen < identity_cutoff))
+        if len(dead) > 0:
+            store.release(dead)
+            if self.backend == "native":
+                self.byte_tracker.release_slots(dead)
+            self.evicted_count += len(dead)
+        
+        # O backend nativo guarda o slot no próprio track e compacta os removidos
+        if self.backend != "native":
+            store.retain_tracks(self._live_track_ids())
+    
+    def _live_track_ids(self) -> List[int]:
+        """Tids ativos ou perdidos (ainda recuperáveis) no sv.ByteTrack"""
+        tracker = self.byte_tracker
+        return [t.track_id for t in tracker.tracked_tracks] + [t.track_id for t in tracker.lost_tracks]
+    
+    def _dense_candidates(
+        self,
+        new_bboxes: np.ndarray,
+        lost_slots: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Pares permitidos (linha, slot, IoU, distância) a partir da matriz completa"""
+        lost_bboxes = self.store.boxes[lost_slots]
+        iou = pairwise_iou_xyxy(new_bboxes, lost_bboxes)
+        dist = pairwise_center_distance_xyxy(new_bboxes, lost_bboxes)
+        rows, cols = np.nonzero((iou >= self.reassoc_iou) | (dist <= self._reassoc_dist))
+        return rows, lost_slots[cols], iou[rows, cols], dist[rows, cols]
+    
+    def _nearby_candidates(
+        self,
+        new_bboxes: np.ndarray,
+        lost_slots: np.ndarray,
+        lost: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pares permitidos (linha, slot, IoU, distância) só entre vizinhos na grade
+        
+        Com IoU mínimo positivo, um par só é aceito se as caixas se sobrepõem (centros
+        a menos da soma das meias-larguras/alturas) ou se os centros estão a até a
+        distância máxima de reassociação; pares fora dessas margens nem são avaliados.
+        """
+        lost_boxes = self.store.boxes[lost_slots]
+        half_w = (new_bboxes[:, 2] - new_bboxes[:, 0]) / 2.0
+        half_h = (new_bboxes[:, 3] - new_bboxes[:, 1]) / 2.0
+        max_half_w = float(np.max(lost_boxes[:, 2] - lost_boxes[:, 0])) / 2.0
+        max_half_h = float(np.max(lost_boxes[:, 3] - lost_boxes[:, 1])) / 2.0
+        rows, slots = self.grid.query_pairs(
+            new_bboxes,
+            margin_x=np.maximum(half_w + max_half_w, self._reassoc_dist),
+            margin_y=np.maximum(half_h + max_half_h, self._reassoc_dist),
+        )
+        if len(slots) > 0:
+            keep = lost[slots]
+            rows, slots = rows[keep], slots[keep]
+        
+        iou = paired_iou_xyxy(new_bboxes[rows], self.store.boxes[slots])
+        dist = paired_center_distance_xyxy(new_bboxes[rows], self.store.boxes[slots])
+        allowed = (iou >= self.reassoc_iou) | (dist <= self._reassoc_dist)
+        return rows[allowed], slots[allowed], iou[allowed], dist[allowed]
+    
+    def _assign_lost(
+        self,
+        rows: np.ndarray,
+        slots: np.ndarray,
+        iou: np.ndarray,
+        dist: np.ndarray,
+    ) -> Dict[int, int]:
+        """
+        Atribui tracks novos a slots de IDs canônicos perdidos a partir dos pares permitidos
+        
+        A atribuição ótima roda só sobre as linhas e colunas com algum par permitido,
+        priorizando IoU e desempatando pela distância.
+        
+        Returns:
+            Dict de índice do track novo para o slot do ID canônico reassociado
+        """
+        if len(rows) == 0:
+            return {}
+        
+        unique_rows, row_idx = np.unique(rows, return_inverse=True)
+        unique_slots, col_idx = np.unique(slots, return_inverse=True)
+        cost = np.full((len(unique_rows), len(unique_slots)), _FORBIDDEN_COST)
+        cost[row_idx, col_idx] = (1.0 - iou) + 1e-3 * dist / max(self.frame_diagonal, 1.0)
+        
+        assigned_rows, assigned_cols = linear_assignment(cost, thresh=_FORBIDDEN_COST / 2)
+        return dict(zip(unique_rows[assigned_rows].tolist(), unique_slots[assigned_cols].tolist()))
+    
+    def accepts_reassociation(self, iou: float, dist: float) -> bool:
+        """Regra de reassociação: IoU mínimo ou centros a até `reassoc_dist_frac` da diagonal"""
+        return iou >= self.reassoc_iou or dist <= self._reassoc_dist
+    
     def get_unique_count(self) -> int:
         """Retorna o número de motos únicas confirmadas"""
-        return len(self.unique_canonical_ids)
+        return self.unique_count
+    
+    def get_state_size(self) -> Dict[str, int]:
+        """Tamanho do estado mantido em memória, para acompanhar execuções longas"""
+        store = self.store
+        return {
+            "tracks": self.byte_tracker.size() if self.backend == "native" else len(self._live_track_ids()),
+            "canonical_ids": store.size(),
+            "reassoc_candidates": int(np.count_nonzero(store.has_box)),
+            "confirmed_in_memory": int(np.count_nonzero(store.alive & store.confirmed)),
+            "capacity": store.capacity,
+            "grid_cells": self.grid.cell_count,
+            "evicted": self.evicted_count,
+        }
     
     def get_active_count(self, det_canonical_ids: List[Optional[int]]) -> int:
         """Retorna o número de motos ativas no frame atual"""
@@ -166,4 +368,76 @@ class MotorcycleTracker:
     
     def is_newly_confirmed(self, canonical_id: int) -> bool:
         """Verifica se o ID canônico foi recém confirmado neste frame"""
-        return self.canonical_seen_frames.get(canonical_id, 0) == self.min_track_frames
+        return canonical_id in self._newly_confirmed
+    
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """
+        Copia o estado do tracker para arrays planos (checkpoint)
+        
+        Inclui slots canônicos, mapeamento tid -> slot, contadores, a saída do último
+        keyframe (para `propagate`) e o estado interno do backend de tracking. Só
+        copia: serializar e gravar fica a cargo de quem chama.
+        """
+        state: Dict[str, np.ndarray] = {
+            "version": np.int64(CHECKPOINT_VERSION),
+            "backend": np.array(self.backend),
+            "frame_diagonal": np.float64(self.frame_diagonal),
+            "frame_count": np.int64(self.frame_count),
+            "unique_count": np.int64(self.unique_count),
+            "evicted_count": np.int64(self.evicted_count),
+            "last_update_frame": np.int64(self._last_update_frame),
+            "last_slots": self._last_slots.copy(),
+            "last_canonical_ids": np.array(
+                [-1 if cid is None else cid for cid in self._last_canonical_ids], dtype=np.int64
+            ),
+        }
+        last, n = self._last_detections, len(self._last_detections)
+        state["last_xyxy"] = np.array(last.xyxy, dtype=np.float32).reshape(n, 4)
+        state["last_confidence"] = np.zeros(n, dtype=np.float32) if last.confidence is None else last.confidence.astype(np.float32)
+        state["last_class_id"] = np.zeros(n, dtype=np.int64) if last.class_id is None else last.class_id.astype(np.int64)
+        state["last_tracker_id"] = np.full(n, -1, dtype=np.int64) if last.tracker_id is None else last.tracker_id.astype(np.int64)
+        
+        for key, value in self.store.snapshot().items():
+            state[f"store_{key}"] = value
+        backend_state = self.byte_tracker.snapshot() if self.backend == "native" else snapshot_byte_track(self.byte_tracker)
+        for key, value in backend_state.items():
+            state[f"bt_{key}"] = value
+        return state
+    
+    def restore(self, state: Dict[str, np.ndarray]) -> None:
+        """
+        Restaura o estado de `snapshot`
+        
+        Raises:
+            ValueError: se o checkpoint é de outro backend ou de outra resolução
+        """
+        if str(state["backend"]) != self.backend:
+            raise ValueError(f"checkpoint do backend {state['backend']}, tracker usa {self.backend}")
+        if not np.isclose(float(state["frame_diagonal"]), self.frame_diagonal):
+            raise ValueError("checkpoint de uma fonte com outra resolução")
+        
+        self.store.restore({key[len("store_"):]: value for key, value in state.items() if key.startswith("store_")})
+        backend_state = {key[len("bt_"):]: value for key, value in state.items() if key.startswith("bt_")}
+        if self.backend == "native":
+            self.byte_tracker.restore(backend_state)
+        else:
+            restore_byte_track(self.byte_tracker, backend_state)
+        
+        self.frame_count = int(state["frame_count"])
+        self.unique_count = int(state["unique_count"])
+        self.evicted_count = int(state["evicted_count"])
+        self._last_update_frame = int(state["last_update_frame"])
+        self._last_slots = np.array(state["last_slots"], dtype=np.int64)
+        self._last_canonical_ids = [None if cid < 0 else cid for cid in state["last_canonical_ids"].tolist()]
+        self._last_detections = sv.Detections(
+            xyxy=state["last_xyxy"],
+            confidence=state["last_confidence"],
+            class_id=state["last_class_id"],
+            tracker_id=state["last_tracker_id"],
+        ) if len(state["last_xyxy"]) > 0 else sv.Detections.empty()
+        self._newly_confirmed = set()
+        
+        # A grade é derivada das caixas candidatas
+        store = self.store
+        self.grid = SpatialGrid(cell_size=self.grid.cell_size)
+        self.grid.update(np.flatnonzero(store.has_box), store.boxes[store.has_box])
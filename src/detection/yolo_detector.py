@@ -1,7 +1,7 @@
 """Detector YOLO para motocicletas"""
 
 import numpy as np
-from typing import Dict, List, Set
+from typing import Dict, List, Sequence, Set, Tuple
 from ultralytics import YOLO
 import supervision as sv
 
@@ -62,7 +62,77 @@ class YoloDetector:
             verbose=False,
         )
         
-        result = results[0]
+        return self._to_detections(results[0])
+    
+    def detect_batch(
+        self,
+        frames: Sequence[np.ndarray],
+        conf: float = 0.35,
+        iou: float = 0.60,
+        imgsz: int = 960,
+        half: bool = False,
+        augment: bool = False
+    ) -> List[sv.Detections]:
+        """Detecta motocicletas em vários frames com uma única chamada ao modelo
+        
+        Os frames são enviados juntos ao `predict`, que os processa em um único lote;
+        o resultado mantém a ordem de entrada.
+        """
+        if len(frames) == 0:
+            return []
+        results = self.model.predict(
+            source=list(frames),
+            conf=conf,
+            iou=iou,
+            imgsz=imgsz,
+            device=self.device,
+            half=half,
+            augment=augment,
+            classes=self.motorcycle_class_ids if self.motorcycle_class_ids else None,
+            batch=len(frames),
+            verbose=False,
+        )
+        return [self._to_detections(result) for result in results]
+    
+    def detect_regions(
+        self,
+        frames: Sequence[np.ndarray],
+        regions: Sequence[Tuple[int, int, int, int]],
+        conf: float = 0.35,
+        iou: float = 0.60,
+        imgsz: int = 960,
+        half: bool = False,
+        augment: bool = False
+    ) -> List[sv.Detections]:
+        """Detecta motocicletas apenas dentro de regiões (x1, y1, x2, y2) de cada frame
+        
+        Todos os recortes de todos os frames vão em um único lote; as caixas voltam
+        para coordenadas do frame antes de serem unidas por frame.
+        """
+        crops = [frame[y1:y2, x1:x2] for frame in frames for (x1, y1, x2, y2) in regions]
+        if len(crops) == 1:
+            results = [self.detect(crops[0], conf=conf, iou=iou, imgsz=imgsz, half=half, augment=augment)]
+        else:
+            results = self.detect_batch(crops, conf=conf, iou=iou, imgsz=imgsz, half=half, augment=augment)
+        
+        merged: List[sv.Detections] = []
+        for fi in range(len(frames)):
+            parts: List[sv.Detections] = []
+            for ri, (x1, y1, _, _) in enumerate(regions):
+                detections = results[fi * len(regions) + ri]
+                if len(detections) > 0:
+                    detections.xyxy = detections.xyxy + np.array([x1, y1, x1, y1], dtype=detections.xyxy.dtype)
+                    parts.append(detections)
+            if not parts:
+                merged.append(results[fi * len(regions)] if regions else sv.Detections.empty())
+            elif len(parts) == 1:
+                merged.append(parts[0])
+            else:
+                merged.append(sv.Detections.merge(parts))
+        return merged
+    
+    def _to_detections(self, result) -> sv.Detections:
+        """Converte um resultado da Ultralytics em detecções filtradas de motocicleta"""
         detections = sv.Detections.from_ultralytics(result)
         
         # Filtra apenas motocicletas se temos nomes de classes
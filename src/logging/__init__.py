@@ -1,6 +1,13 @@
 """Módulo de logging para o GeoSense"""
 
-from .json_logger import JsonLogger
+from .json_logger import JsonLogger, compact_ndjson, create_json_logger, read_ndjson_document
 from .oracle_logger import OracleLogger, create_oracle_logger_from_env
 
-__all__ = ["JsonLogger", "OracleLogger", "create_oracle_logger_from_env"]
+__all__ = [
+    "JsonLogger",
+    "compact_ndjson",
+    "create_json_logger",
+    "read_ndjson_document",
+    "OracleLogger",
+    "create_oracle_logger_from_env",
+]
@@ -1,30 +1,185 @@
 """Logger JSON para salvar dados de motos detectadas"""
 
+import argparse
+import atexit
 import json
 import os
+import threading
+import time
 import uuid
 from datetime import datetime
-from typing import Any, Dict, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, TextIO, Tuple
+
+# Extensões do modo append-only (uma linha JSON compacta por evento)
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+# Durabilidade das escritas: "every" grava e sincroniza cada evento na hora;
+# "batch" agrupa eventos em uma thread de fundo (uma escrita e um fsync por
+# grupo); "none" agrupa igual, mas deixa a sincronização com o disco para o SO
+DURABILITY_MODES = ("none", "batch", "every")
+
+
+def is_ndjson_path(path: str) -> bool:
+    """Indica se o caminho usa o formato NDJSON (pela extensão)"""
+    return os.path.splitext(path)[1].lower() in NDJSON_EXTENSIONS
+
+
+def _write_text_atomic(path: str, text: str, fsync: bool = True) -> None:
+    """
+    Escreve o texto de forma atômica usando arquivo temporário
+
+    Raises:
+        OSError: se nem a troca atômica nem a escrita direta funcionarem
+    """
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+            if fsync:
+                try:
+                    f.flush()
+                    os.fsync(f.fileno())
+                except OSError:
+                    pass
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            with open(path, "w", encoding="utf-8") as g:
+                g.write(text)
+                if fsync:
+                    try:
+                        g.flush()
+                        os.fsync(g.fileno())
+                    except OSError:
+                        pass
+    finally:
+        try:
+            if os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    """Escreve o JSON de forma atômica usando arquivo temporário"""
+    _write_text_atomic(path, json.dumps(data, ensure_ascii=False, indent=2))
+
+
+def _visit_key(source: str, visit: Dict[str, Any]) -> str:
+    return f"{source}|{visit.get('track_id')}|{visit.get('zone')}|{visit.get('entered_at')}|{visit.get('run_id', '')}"
+
+
+def read_ndjson_document(path: str) -> Dict[str, Any]:
+    """
+    Monta o documento aninhado (`sources` -> motos, visits, zones) a partir de um NDJSON
+
+    Linhas inválidas ou incompletas são ignoradas; da ocupação das zonas vale a
+    última linha de cada fonte.
+    """
+    sources: Dict[str, Any] = {}
+    now_iso = datetime.now().isoformat()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            try:
+                record = json.loads(line)
+            except Exception:
+                continue
+            if not isinstance(record, dict):
+                continue
+            kind = record.pop("type", "moto")
+            source = str(record.get("source") or "unknown")
+            bucket = sources.setdefault(source, {"updated_at": now_iso, "motos": []})
+            if kind == "moto":
+                bucket["motos"].append(record)
+            elif kind == "visit":
+                record.pop("source", None)
+                bucket.setdefault("visits", []).append(record)
+            elif kind == "zones":
+                bucket["zones"] = {"updated_at": record.get("updated_at"), "items": record.get("items", [])}
+    return {"updated_at": now_iso, "sources": sources}
+
+
+def compact_ndjson(path: str, out_path: str) -> Dict[str, int]:
+    """Grava em `out_path` o documento aninhado equivalente ao NDJSON `path` (escrita atômica)"""
+    document = read_ndjson_document(path)
+    directory = os.path.dirname(out_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    _write_json_atomic(out_path, document)
+    buckets = document["sources"].values()
+    return {
+        "sources": len(document["sources"]),
+        "motos": sum(len(b.get("motos", [])) for b in buckets),
+        "visits": sum(len(b.get("visits", [])) for b in buckets),
+    }
 
 
 class JsonLogger:
-    """Logger para salvar dados de detecção em formato JSON"""
+    """Logger para salvar dados de detecção em formato JSON
+    
+    Caminhos .ndjson/.jsonl usam o modo append-only: cada evento vira uma linha JSON
+    compacta acrescentada ao arquivo, sem reescrever o histórico. O documento
+    aninhado (`sources`) pode ser gerado quando necessário com `compact_ndjson`.
+
+    Com `durability` "batch" ou "none" as inserções só entram em uma fila em
+    memória e uma thread de fundo grava o grupo a cada `flush_interval` segundos
+    ou ao juntar `flush_count` eventos (group commit). `close()` esvazia a fila.
+    `on_commit`, se definido, recebe os track_ids de cada grupo de motos depois que
+    o grupo chegou ao arquivo (em qualquer modo de durabilidade).
+    """
     
-    def __init__(self, path: str, source_desc: Optional[str] = None, run_id: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        path: str,
+        source_desc: Optional[str] = None,
+        run_id: Optional[str] = None,
+        ndjson: Optional[bool] = None,
+        durability: str = "every",
+        flush_interval: float = 0.5,
+        flush_count: int = 256,
+    ) -> None:
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability inválida: {durability!r} (use {', '.join(DURABILITY_MODES)})")
         self._path = path
         self._seen_keys: Set[str] = set()
+        self._visit_keys: Set[str] = set()
         self._data: Dict[str, Any] = {}
         self._current_source: str = source_desc or ""
         self._run_id: str = run_id or ""
+        self._ndjson = is_ndjson_path(path) if ndjson is None else bool(ndjson)
+        self._stream: Optional[TextIO] = None
+        self._durability = durability
+        self._flush_interval = max(0.01, float(flush_interval))
+        self._flush_count = max(1, int(flush_count))
+        # Fila de escrita: eventos pendentes (e, no NDJSON, suas linhas) protegidos por _wake
+        self._wake = threading.Condition()
+        self._dirty = 0
+        self._dirty_since = 0.0
+        self._pending_lines: List[str] = []
+        self._pending_ids: List[int] = []
+        self.on_commit: Optional[Callable[[List[int]], None]] = None
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.failed = 0
         try:
             os.makedirs(os.path.dirname(path) or "output/runs", exist_ok=True)
         except Exception:
             pass
-        try:
-            self._cleanup_temp()
-        except Exception:
-            pass
-        self._load_or_init(source_desc)
+        if self._ndjson:
+            self._open_ndjson(source_desc)
+        else:
+            try:
+                self._cleanup_temp()
+            except Exception:
+                pass
+            self._load_or_init(source_desc)
+        if durability != "every":
+            self._thread = threading.Thread(target=self._run_flusher, name="geosense-json-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
 
     def _load_or_init(self, source_desc: Optional[str]) -> None:
         """Carrega dados existentes ou inicializa novo arquivo"""
@@ -85,14 +240,7 @@ class JsonLogger:
         except Exception:
             pass
 
-        norm_source = (source_desc or "unknown")
-        try:
-            if isinstance(norm_source, str) and norm_source.isdigit():
-                norm_source = f"webcam_{norm_source}"
-        except Exception:
-            pass
-        
-        self._current_source = norm_source
+        self._current_source = self._normalize_source(source_desc)
         self._data = {"updated_at": now_iso, "sources": sources}
         if self._run_id:
             self._data["run_id"] = self._run_id
@@ -104,12 +252,208 @@ class JsonLogger:
                 for item in bucket.get("motos", []) or []:
                     try:
                         tid = int(item.get("track_id"))
-                        self._seen_keys.add(f"{src}|{tid}")
+                        self._seen_keys.add(f"{src}|{tid}|{item.get('run_id', '')}")
                     except Exception:
                         continue
+                for item in bucket.get("visits", []) or []:
+                    if isinstance(item, dict):
+                        self._visit_keys.add(_visit_key(src, item))
         except Exception:
             self._seen_keys = set()
 
+    @staticmethod
+    def _normalize_source(source_desc: Optional[str]) -> str:
+        """Nome do bucket da fonte (índices de webcam viram webcam_N)"""
+        norm_source = (source_desc or "unknown")
+        try:
+            if isinstance(norm_source, str) and norm_source.isdigit():
+                norm_source = f"webcam_{norm_source}"
+        except Exception:
+            pass
+        return norm_source
+
+    def _open_ndjson(self, source_desc: Optional[str]) -> None:
+        """Abre o NDJSON para acréscimo, cortando uma última linha incompleta (queda no meio da escrita)"""
+        self._current_source = self._normalize_source(source_desc)
+        valid_size = 0
+        total_size = 0
+        if os.path.isfile(self._path):
+            with open(self._path, "rb") as f:
+                for raw in f:
+                    total_size += len(raw)
+                    if not raw.endswith(b"\n"):
+                        break
+                    valid_size += len(raw)
+                    try:
+                        record = json.loads(raw)
+                    except Exception:
+                        continue
+                    if not isinstance(record, dict):
+                        continue
+                    source = str(record.get("source") or "unknown")
+                    try:
+                        if record.get("type", "moto") == "moto":
+                            self._seen_keys.add(f"{source}|{int(record.get('track_id'))}|{record.get('run_id', '')}")
+                        elif record.get("type") == "visit":
+                            self._visit_keys.add(_visit_key(source, record))
+                    except Exception:
+                        continue
+            if valid_size < total_size:
+                print(
+                    f"Aviso: última linha incompleta em {self._path} descartada "
+                    f"({total_size - valid_size} bytes)"
+                )
+                with open(self._path, "r+b") as f:
+                    f.truncate(valid_size)
+        self._stream = open(self._path, "a", encoding="utf-8")
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Enfileira um evento como uma linha JSON compacta (gravada no próximo flush)"""
+        self._pending_lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def _schedule_write(self, events: int = 1) -> None:
+        """Marca eventos para gravação (chamar com _wake adquirido)"""
+        if self._dirty == 0:
+            self._dirty_since = time.monotonic()
+        self._dirty += events
+        if self._thread is None:
+            self._write(*self._take_payload())
+        elif self._dirty == events or self._dirty >= self._flush_count:
+            self._wake.notify()
+
+    def _take_payload(self) -> Tuple[Any, List[int]]:
+        """Retira da fila o que deve ser gravado e os track_ids das motos do grupo (chamar com _wake adquirido)
+
+        No JSON retorna uma cópia rasa do documento: a serialização, que cresce com o
+        documento, acontece em `_write`, sem segurar o lock das inserções.
+        """
+        self._dirty = 0
+        ids, self._pending_ids = self._pending_ids, []
+        if self._ndjson:
+            payload = "".join(self._pending_lines)
+            self._pending_lines = []
+            return payload, ids
+        return self._snapshot_data(), ids
+
+    def _snapshot_data(self) -> Dict[str, Any]:
+        """Cópia rasa do documento (registros inseridos não mudam; só as listas crescem)"""
+        snapshot = dict(self._data)
+        snapshot["sources"] = {
+            src: {key: list(value) if isinstance(value, list) else value for key, value in bucket.items()}
+            for src, bucket in self._data.get("sources", {}).items()
+        }
+        return snapshot
+
+    def _write(self, payload: Any, ids: List[int]) -> None:
+        """Grava um grupo: um acréscimo (NDJSON) ou uma troca atômica (JSON), com um fsync
+
+        Se a gravação falha, o grupo volta para o início da fila e é tentado de novo
+        no próximo flush (ou no de `close()`, que é a última tentativa).
+        """
+        fsync = self._durability != "none"
+        written = ""
+        try:
+            if self._ndjson:
+                if payload:
+                    start = self._stream.tell()
+                    try:
+                        self._stream.write(payload)
+                        self._stream.flush()
+                    except Exception:
+                        self._reopen_stream(start)
+                        raise
+                    written = payload
+                if fsync:
+                    os.fsync(self._stream.fileno())
+            else:
+                _write_text_atomic(self._path, json.dumps(payload, ensure_ascii=False, indent=2), fsync=fsync)
+            self.flushes += 1
+        except Exception as e:
+            if not self.failed:
+                print(f"Aviso: falha ao gravar {self._path}: {e}")
+            self.failed += 1
+            self._requeue(payload if self._ndjson and not written else "", ids)
+            return
+        if ids and self.on_commit is not None:
+            try:
+                self.on_commit(ids)
+            except Exception as e:
+                print(f"Aviso: falha ao confirmar registros de {self._path}: {e}")
+
+    def _reopen_stream(self, size: int) -> None:
+        """Descarta uma escrita parcial (volta o arquivo a `size` bytes) para a repetição não emendar linhas"""
+        try:
+            self._stream.close()
+        except Exception:
+            pass
+        self._stream = None
+        try:
+            os.truncate(self._path, size)
+        except OSError:
+            pass
+        try:
+            self._stream = open(self._path, "a", encoding="utf-8")
+        except OSError:
+            pass
+
+    def _requeue(self, lines: str, ids: List[int]) -> None:
+        """Devolve um grupo que falhou ao início da fila e agenda nova tentativa"""
+        with self._wake:
+            if self._closing:
+                # Falha na gravação final de close(): não há próxima tentativa
+                print(f"Aviso: registros pendentes de {self._path} não foram gravados")
+                return
+            if lines:
+                self._pending_lines.insert(0, lines)
+            self._pending_ids[:0] = ids
+            if self._dirty == 0:
+                self._dirty_since = time.monotonic()
+            # No JSON o documento em memória já contém o grupo: basta regravá-lo
+            self._dirty += max(1, len(ids))
+            self._wake.notify()
+
+    def _run_flusher(self) -> None:
+        """Thread de fundo: grava a fila por tempo (flush_interval) ou por quantidade (flush_count)"""
+        while True:
+            with self._wake:
+                while not self._dirty and not self._closing:
+                    self._wake.wait()
+                if not self._dirty:
+                    return
+                deadline = self._dirty_since + self._flush_interval
+                while not self._closing and self._dirty < self._flush_count:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wake.wait(remaining)
+                payload, ids = self._take_payload()
+            self._write(payload, ids)
+
+    def close(self) -> None:
+        """Esvazia a fila de escrita e fecha o arquivo (pode ser chamado mais de uma vez)"""
+        if self._thread is None:
+            # Modo every: só resta um grupo se a última gravação falhou
+            with self._wake:
+                self._closing = True
+                if self._dirty:
+                    self._write(*self._take_payload())
+        else:
+            with self._wake:
+                self._closing = True
+                self._wake.notify()
+            self._thread.join()
+            self._thread = None
+            try:
+                atexit.unregister(self.close)
+            except Exception:
+                pass
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+
     def _cleanup_temp(self) -> None:
         """Remove arquivos temporários órfãos"""
         tmp_path = self._path + ".tmp"
@@ -125,54 +469,30 @@ class JsonLogger:
                 except Exception:
                     pass
 
-    def _atomic_write_json(self) -> None:
-        """Escreve o JSON de forma atômica usando arquivo temporário"""
-        tmp_path = self._path + ".tmp"
-        try:
-            with open(tmp_path, "w", encoding="utf-8") as f:
-                json.dump(self._data, f, ensure_ascii=False, indent=2)
-                try:
-                    f.flush()
-                    os.fsync(f.fileno())
-                except Exception:
-                    pass
-            try:
-                os.replace(tmp_path, self._path)
-            except Exception:
-                with open(self._path, "w", encoding="utf-8") as g:
-                    json.dump(self._data, g, ensure_ascii=False, indent=2)
-                    try:
-                        g.flush()
-                        os.fsync(g.fileno())
-                    except Exception:
-                        pass
-                try:
-                    if os.path.isfile(tmp_path):
-                        os.remove(tmp_path)
-                except Exception:
-                    pass
-        except Exception:
-            try:
-                if os.path.isfile(tmp_path):
-                    os.remove(tmp_path)
-            except Exception:
-                pass
-
-    def _ensure_source_bucket(self) -> Dict[str, Any]:
-        """Garante que existe um bucket para a fonte atual"""
+    def _ensure_source_bucket(self, source: Optional[str] = None) -> Dict[str, Any]:
+        """Garante que existe um bucket para a fonte (padrão: fonte atual)"""
+        source = source or self._current_source
         now_iso = datetime.now().isoformat()
         sources = self._data.setdefault("sources", {})
-        bucket = sources.get(self._current_source)
+        bucket = sources.get(source)
         if not isinstance(bucket, dict):
             bucket = {"updated_at": now_iso, "motos": []}
-            sources[self._current_source] = bucket
+            sources[source] = bucket
         bucket.setdefault("motos", [])
         bucket["updated_at"] = now_iso
         self._data["updated_at"] = now_iso
         return bucket
 
-    def insert_moto(self, track_id: Optional[int], x: float, y: float, detected_at: datetime, db_id: Optional[int] = None) -> None:
-        """Insere uma nova moto detectada no log"""
+    def insert_moto(
+        self,
+        track_id: Optional[int],
+        x: float,
+        y: float,
+        detected_at: datetime,
+        db_id: Optional[int] = None,
+        source: Optional[str] = None,
+    ) -> None:
+        """Insere uma nova moto detectada no log (no bucket de `source`, se informado)"""
         if track_id is None:
             return
         try:
@@ -180,14 +500,11 @@ class JsonLogger:
         except Exception:
             return
         
+        source = source or self._current_source
         run_key = self._run_id or ""  
-        key = f"{self._current_source}|{tid}|{run_key}"
-        if key in self._seen_keys:
-            return
-            
-        bucket = self._ensure_source_bucket()
+        key = f"{source}|{tid}|{run_key}"
         entry = {
-            "source": self._current_source,
+            "source": source,
             "track_id": tid,
             "x": float(round(x, 2)),
             "y": float(round(y, 2)),
@@ -199,8 +516,135 @@ class JsonLogger:
             entry["run_id"] = self._run_id
         
         try:
-            bucket["motos"].append(entry)
-            self._atomic_write_json()
-            self._seen_keys.add(key)
+            with self._wake:
+                if key in self._seen_keys:
+                    return
+                if self._ndjson:
+                    self._append({"type": "moto", **entry})
+                else:
+                    self._ensure_source_bucket(source)["motos"].append(entry)
+                self._seen_keys.add(key)
+                self._pending_ids.append(tid)
+                self._schedule_write()
         except Exception:
             pass
+
+    def insert_visit(self, visit: Dict[str, Any], source: Optional[str] = None) -> None:
+        """Registra uma visita encerrada a uma zona (entrada, saída e permanência)"""
+        source = source or self._current_source
+        entry = {
+            "track_id": int(visit["track_id"]),
+            "zone": visit["zone"],
+            "entered_at": visit["entered_at"].isoformat(),
+            "exited_at": visit["exited_at"].isoformat(),
+            "dwell_frames": int(visit["dwell_frames"]),
+            "dwell_seconds": float(visit["dwell_seconds"]),
+            "reason": visit["reason"],
+        }
+        if self._run_id:
+            entry["run_id"] = self._run_id
+        try:
+            with self._wake:
+                if self._ndjson:
+                    self._append({"type": "visit", "source": source, **entry})
+                else:
+                    self._ensure_source_bucket(source).setdefault("visits", []).append(entry)
+                self._visit_keys.add(_visit_key(source, entry))
+                self._schedule_write()
+        except Exception:
+            pass
+
+    def update_zones(
+        self,
+        zones: List[Dict[str, Any]],
+        updated_at: datetime,
+        source: Optional[str] = None,
+    ) -> None:
+        """Substitui a ocupação das zonas da fonte (contagem atual e acumulados)"""
+        source = source or self._current_source
+        try:
+            with self._wake:
+                if self._ndjson:
+                    self._append({"type": "zones", "source": source, "updated_at": updated_at.isoformat(), "items": zones})
+                else:
+                    self._ensure_source_bucket(source)["zones"] = {"updated_at": updated_at.isoformat(), "items": zones}
+                self._schedule_write()
+        except Exception:
+            pass
+
+    def merge_from(self, path: str) -> int:
+        """Incorpora os registros de outro arquivo do logger (ex.: parcial de um worker)
+
+        Cada registro mantém sua fonte e seu run_id; duplicatas são ignoradas e o
+        arquivo é regravado uma única vez (no modo NDJSON, os registros novos são
+        acrescentados). O parcial pode estar em JSON ou NDJSON. Retorna quantos
+        registros foram adicionados.
+        """
+        try:
+            if is_ndjson_path(path):
+                other = read_ndjson_document(path)
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    other = json.load(f)
+        except Exception:
+            return 0
+
+        added = 0
+        zones_merged = False
+        with self._wake:
+            for src, other_bucket in (other.get("sources") or {}).items():
+                for item in (other_bucket or {}).get("motos", []) or []:
+                    if not isinstance(item, dict):
+                        continue
+                    try:
+                        key = f"{src}|{int(item.get('track_id'))}|{item.get('run_id', '')}"
+                    except Exception:
+                        continue
+                    if key in self._seen_keys:
+                        continue
+                    if self._ndjson:
+                        self._append({"type": "moto", **item, "source": src})
+                    else:
+                        self._ensure_source_bucket(src)["motos"].append(item)
+                    self._seen_keys.add(key)
+                    self._pending_ids.append(int(item.get("track_id")))
+                    added += 1
+
+                # Visitas às zonas e ocupação (--zones) acompanham a fonte
+                for item in (other_bucket or {}).get("visits", []) or []:
+                    if not isinstance(item, dict) or _visit_key(src, item) in self._visit_keys:
+                        continue
+                    if self._ndjson:
+                        self._append({"type": "visit", "source": src, **item})
+                    else:
+                        self._ensure_source_bucket(src).setdefault("visits", []).append(item)
+                    self._visit_keys.add(_visit_key(src, item))
+                    added += 1
+                zones = (other_bucket or {}).get("zones")
+                if isinstance(zones, dict):
+                    if self._ndjson:
+                        self._append({"type": "zones", "source": src, **zones})
+                    else:
+                        self._ensure_source_bucket(src)["zones"] = zones
+                    zones_merged = True
+
+            if added or zones_merged:
+                self._schedule_write(max(1, added))
+        return added
+
+
+def create_json_logger(
+    args: argparse.Namespace,
+    path: str,
+    source_desc: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> JsonLogger:
+    """Cria o JsonLogger com a durabilidade configurada na linha de comando"""
+    return JsonLogger(
+        path,
+        source_desc=source_desc,
+        run_id=run_id,
+        durability=getattr(args, "json_durability", "every"),
+        flush_interval=getattr(args, "json_flush_ms", 500.0) / 1000.0,
+        flush_count=getattr(args, "json_flush_count", 256),
+    )
@@ -32,6 +32,7 @@ class OracleLogger:
             self._conn = oracledb.connect(user=user, password=password, dsn=dsn)  
             self._enabled = True
             self._ensure_table()
+            self._ensure_visits_table()
         except Exception as e:
             print(f"Aviso: falha ao conectar no Oracle: {e}. Integração desativada.")
             self._conn = None
@@ -109,6 +110,60 @@ class OracleLogger:
         except Exception as e:
             print(f"Aviso: não foi possível garantir a tabela MOTOS: {e}")
 
+    def _ensure_visits_table(self) -> None:
+        """Garante que a tabela ZONE_VISITS (visitas às zonas) existe"""
+        if not self._enabled or self._conn is None:
+            return
+        try:
+            with self._conn.cursor() as cur:  # type: ignore[attr-defined]
+                cur.execute("SELECT 1 FROM user_tables WHERE table_name = :t", {"t": "ZONE_VISITS"})
+                if not cur.fetchone():
+                    cur.execute(
+                        (
+                            "CREATE TABLE ZONE_VISITS ("
+                            "ID NUMBER GENERATED BY DEFAULT AS IDENTITY,"
+                            "TRACK_ID NUMBER NOT NULL,"
+                            "ZONE VARCHAR2(200) NOT NULL,"
+                            "ENTERED_AT TIMESTAMP NOT NULL,"
+                            "EXITED_AT TIMESTAMP NOT NULL,"
+                            "DWELL_FRAMES NUMBER NOT NULL,"
+                            "DWELL_SECONDS NUMBER(12,3) NOT NULL)"
+                        )
+                    )
+                    self._conn.commit()
+        except Exception as e:
+            print(f"Aviso: não foi possível garantir a tabela ZONE_VISITS: {e}")
+
+    def insert_visit(
+        self,
+        track_id: int,
+        zone: str,
+        entered_at: datetime,
+        exited_at: datetime,
+        dwell_frames: int,
+        dwell_seconds: float,
+    ) -> None:
+        """Insere uma visita encerrada a uma zona"""
+        if not self._enabled or self._conn is None:
+            return
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO ZONE_VISITS (TRACK_ID, ZONE, ENTERED_AT, EXITED_AT, DWELL_FRAMES, DWELL_SECONDS) "
+                    "VALUES (:id, :zone, :entered, :exited, :frames, :secs)",
+                    {
+                        "id": int(track_id),
+                        "zone": str(zone)[:200],
+                        "entered": entered_at,
+                        "exited": exited_at,
+                        "frames": int(dwell_frames),
+                        "secs": float(round(dwell_seconds, 3)),
+                    },
+                )
+            self._conn.commit()
+        except Exception as e:
+            print(f"Aviso: falha ao inserir na tabela ZONE_VISITS: {e}")
+
     def insert_moto(self, track_id: Optional[int], x: float, y: float, detected_at: datetime) -> Optional[int]:
         """Insere uma nova moto no banco e retorna o ID gerado"""
         if not self._enabled or self._conn is None:
@@ -14,8 +14,8 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from src.config import parse_args
-from src.logging import create_oracle_logger_from_env
-from src.processing import ImageProcessor, VideoProcessor
+from src.logging import compact_ndjson, create_oracle_logger_from_env
+from src.processing import ImageProcessor, MultiStreamProcessor, VideoProcessor, process_directory, process_video_sharded
 from src.ui import startup_menu, gui_startup_menu, interactive_select_file
 from src.utils.io_utils import is_image_file
 
@@ -23,11 +23,34 @@ from src.utils.io_utils import is_image_file
 def main() -> None:
     """Função principal do GeoSense"""
     args = parse_args()
+    
+    # Compactação de um log NDJSON no documento aninhado
+    if args.compact_json:
+        src_path, out_path = args.compact_json
+        totals = compact_ndjson(src_path, out_path)
+        print(
+            f"{out_path}: {totals['motos']} motos e {totals['visits']} visitas "
+            f"de {totals['sources']} fonte(s)"
+        )
+        return
+    
     db_logger = create_oracle_logger_from_env()
     
     source: Optional[object] = None
     used_menu = False
     
+    # Lote de um diretório distribuído entre processos workers
+    if args.input_dir:
+        process_directory(args, args.input_dir, workers=args.workers)
+        return
+    
+    # Várias fontes com um único detector compartilhado
+    if args.sources:
+        sources = [int(s) if s.isdigit() else s for s in args.sources]
+        processor = MultiStreamProcessor(args)
+        processor.process(sources, db_logger=db_logger)
+        return
+    
     # Modo menu interativo
     if args.menu or (not args.source and (args.webcam is None or args.webcam < 0)):
         used_menu = True
@@ -95,6 +118,11 @@ def main() -> None:
             
             source = selected
     
+    # Vídeo longo dividido em segmentos paralelos
+    if isinstance(source, str) and os.path.isfile(source) and args.segments > 1:
+        process_video_sharded(args, source, args.segments, db_logger=db_logger)
+        return
+    
     # Processa vídeo
     if source is not None:
         processor = VideoProcessor(args)
@@ -2,5 +2,8 @@
 
 from .image_processor import ImageProcessor
 from .video_processor import VideoProcessor
+from .multi_stream import MultiStreamProcessor
+from .batch_runner import process_directory
+from .video_shards import process_video_sharded
 
-__all__ = ["ImageProcessor", "VideoProcessor"]
+__all__ = ["ImageProcessor", "VideoProcessor", "MultiStreamProcessor", "process_directory", "process_video_sharded"]
@@ -0,0 +1,190 @@
+"""Processamento em lote de um diretório de mídia com um pool de processos"""
+
+import argparse
+import copy
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+
+try:
+    from ..detection import YoloDetector
+    from ..logging import JsonLogger, OracleLogger, create_json_logger, create_oracle_logger_from_env
+    from ..utils.io_utils import gather_media_files, is_image_file
+    from .image_processor import ImageProcessor
+    from .video_processor import VideoProcessor
+except ImportError:
+    # Fallback para imports absolutos
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+    from src.detection import YoloDetector
+    from src.logging import JsonLogger, OracleLogger, create_json_logger, create_oracle_logger_from_env
+    from src.utils.io_utils import gather_media_files, is_image_file
+    from src.processing.image_processor import ImageProcessor
+    from src.processing.video_processor import VideoProcessor
+
+
+# Estado carregado uma vez por processo worker
+_worker_state: Dict[str, Any] = {}
+
+
+def limit_worker_threads(num_threads: int) -> None:
+    """Limita as threads de torch e OpenCV de um worker para não disputar CPU"""
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(num_threads)
+    try:
+        cv2.setNumThreads(num_threads)
+    except Exception:
+        pass
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except Exception:
+        pass
+
+
+def resolve_workers(args: argparse.Namespace, workers: int, jobs: int) -> Tuple[int, int]:
+    """Número de workers (0 = 1 por 4 núcleos, até `jobs`) e threads por worker"""
+    cpu_count = os.cpu_count() or 1
+    workers = workers if workers > 0 else max(1, cpu_count // 4)
+    workers = max(1, min(workers, jobs))
+    num_threads = args.worker_threads if args.worker_threads > 0 else max(1, cpu_count // workers)
+    return workers, num_threads
+
+
+def init_worker(args: argparse.Namespace, num_threads: int) -> None:
+    """Inicializa o worker: limita threads e carrega o modelo e o Oracle uma única vez
+
+    Usado como `initializer` do ProcessPoolExecutor (lote de arquivos e segmentos de vídeo).
+    """
+    limit_worker_threads(num_threads)
+    _worker_state["detector"] = YoloDetector(args.model, args.device)
+    _worker_state["db_logger"] = create_oracle_logger_from_env()
+
+
+def worker_detector() -> Optional[YoloDetector]:
+    """Detector carregado por `init_worker` neste processo (None fora de um worker)"""
+    return _worker_state.get("detector")
+
+
+def worker_db_logger() -> Optional[OracleLogger]:
+    """Logger Oracle criado por `init_worker` neste processo (None se indisponível)"""
+    return _worker_state.get("db_logger")
+
+
+def _annotated_output_paths(args: argparse.Namespace, files: List[str]) -> Dict[str, str]:
+    """Vídeo anotado de cada arquivo do lote (`<nome>_annotated.mp4`)
+
+    Arquivos com o mesmo nome e extensões diferentes (a.mp4 e a.avi) levam a
+    extensão no nome para que um worker não sobrescreva a saída do outro.
+    """
+    out_dir = os.path.dirname(args.output) or os.path.join("output", "runs")
+    stems = [os.path.splitext(os.path.basename(path)) for path in files]
+    counts: Dict[str, int] = {}
+    for base, _ in stems:
+        counts[base] = counts.get(base, 0) + 1
+    outputs: Dict[str, str] = {}
+    for path, (base, ext) in zip(files, stems):
+        name = f"{base}_{ext.lstrip('.')}_annotated.mp4" if counts[base] > 1 else f"{base}_annotated.mp4"
+        outputs[path] = os.path.join(out_dir, name)
+    return outputs
+
+
+def _process_file(args: argparse.Namespace, path: str, part_path: str, run_id: str, output_path: str) -> Dict[str, Any]:
+    """Processa um arquivo no worker, gravando o JSON em um arquivo parcial próprio"""
+    file_args = copy.copy(args)
+    file_args.source = path
+    file_args.show = False
+    file_args.menu = False
+    file_args.json_out = part_path
+    file_args.run_id = run_id
+    file_args.output = output_path
+
+    result: Dict[str, Any] = {"file": path, "run_id": run_id, "part": part_path, "error": None}
+    start = time.time()
+    try:
+        detector = worker_detector()
+        db_logger = worker_db_logger()
+        if is_image_file(path):
+            result["kind"] = "image"
+            result["count"] = ImageProcessor(file_args, detector=detector).process(path, db_logger=db_logger)
+        else:
+            result["kind"] = "video"
+            processor = VideoProcessor(file_args, detector=detector)
+            processor.process(path, db_logger=db_logger)
+            result["count"] = processor.tracker.get_unique_count() if processor.tracker else 0
+            result["frames"] = processor.stats.get("frames", 0)
+    except Exception as e:
+        result["error"] = str(e)
+    result["elapsed"] = time.time() - start
+    return result
+
+
+def process_directory(args: argparse.Namespace, directory: str, workers: int = 0) -> List[Dict[str, Any]]:
+    """Distribui os vídeos e imagens de um diretório entre processos workers
+
+    Cada arquivo recebe seu próprio run_id e grava em um JSON parcial; ao final os
+    parciais são incorporados ao --json-out pelo processo principal, sem disputa
+    de escrita entre workers.
+    """
+    files = [os.path.join(directory, name) for name in gather_media_files(directory)]
+    if not files:
+        print(f"Nenhum arquivo de mídia encontrado em: {directory}")
+        return []
+
+    workers, num_threads = resolve_workers(args, workers, len(files))
+
+    batch_run_id = args.run_id or str(uuid.uuid4())
+    parts_dir = (args.json_out or os.path.join("output", "runs", "motos.json")) + ".parts"
+    os.makedirs(parts_dir, exist_ok=True)
+    outputs = _annotated_output_paths(args, files)
+
+    print(f"Processando {len(files)} arquivo(s) com {workers} worker(s), {num_threads} thread(s) cada...")
+    results: List[Dict[str, Any]] = []
+    start = time.time()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(args, num_threads)
+    ) as pool:
+        futures = []
+        for idx, path in enumerate(files):
+            run_id = f"{batch_run_id}-{idx + 1:04d}"
+            part_path = os.path.join(parts_dir, run_id + (os.path.splitext(args.json_out)[1] or ".json"))
+            futures.append(pool.submit(_process_file, args, path, part_path, run_id, outputs[path]))
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = f"erro: {result['error']}" if result["error"] else f"{result.get('count', 0)} moto(s)"
+            print(f"[{len(results)}/{len(files)}] {os.path.basename(result['file'])}: {status} ({result['elapsed']:.1f}s)")
+
+    _merge_parts(args, results, batch_run_id)
+    try:
+        shutil.rmtree(parts_dir)
+    except Exception:
+        pass
+
+    results.sort(key=lambda r: r["file"])
+    ok = [r for r in results if not r["error"]]
+    print(
+        f"Lote concluído em {time.time() - start:.1f}s: {len(ok)}/{len(results)} arquivo(s), "
+        f"{sum(r.get('count', 0) for r in ok)} moto(s) no total"
+    )
+    return results
+
+
+def _merge_parts(args: argparse.Namespace, results: List[Dict[str, Any]], batch_run_id: str) -> None:
+    """Incorpora os JSON parciais dos workers ao --json-out em uma única escrita por parcial"""
+    if not args.json_out:
+        return
+    try:
+        json_logger: Optional[JsonLogger] = create_json_logger(args, args.json_out, source_desc=None, run_id=batch_run_id)
+    except Exception as e:
+        print(f"Aviso: falha ao abrir {args.json_out} para consolidar o lote: {e}")
+        return
+    for result in sorted(results, key=lambda r: r["file"]):
+        if os.path.isfile(result["part"]):
+            json_logger.merge_from(result["part"])
+    json_logger.close()
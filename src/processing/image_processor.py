@@ -12,7 +12,7 @@ import numpy as np
 
 try:
     from ..detection import YoloDetector
-    from ..logging import JsonLogger, OracleLogger
+    from ..logging import JsonLogger, OracleLogger, create_json_logger
     from ..utils.geometry import compute_centers
     from ..utils.io_utils import safe_read_line
 except ImportError:
@@ -21,7 +21,7 @@ except ImportError:
     import os
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
     from src.detection import YoloDetector
-    from src.logging import JsonLogger, OracleLogger
+    from src.logging import JsonLogger, OracleLogger, create_json_logger
     from src.utils.geometry import compute_centers
     from src.utils.io_utils import safe_read_line
 
@@ -29,16 +29,17 @@ except ImportError:
 class ImageProcessor:
     """Processador para detecção de motocicletas em imagens estáticas"""
     
-    def __init__(self, args: argparse.Namespace):
+    def __init__(self, args: argparse.Namespace, detector: Optional[YoloDetector] = None):
         self.args = args
-        self.detector = YoloDetector(args.model, args.device)
+        # Um detector já carregado pode ser reutilizado (ex.: workers do modo em lote)
+        self.detector = detector or YoloDetector(args.model, args.device)
         
         # Configurar anotadores
         self.box_annotator = sv.BoxAnnotator(thickness=2, text_thickness=1, text_scale=0.5)
         self.label_annotator = sv.LabelAnnotator(text_thickness=1, text_scale=0.5)
     
-    def process(self, source_path: str, db_logger: Optional[OracleLogger] = None) -> None:
-        """Processa uma imagem para detecção de motocicletas"""
+    def process(self, source_path: str, db_logger: Optional[OracleLogger] = None) -> int:
+        """Processa uma imagem para detecção de motocicletas e retorna quantas foram detectadas"""
         # Carrega a imagem
         image = cv2.imread(source_path)
         if image is None:
@@ -66,7 +67,7 @@ class ImageProcessor:
         json_logger = self._setup_json_logger(source_path)
         
         # Registra detecções se não estiver no modo show
-        if db_logger is not None and len(detections) > 0 and not self.args.show:
+        if (db_logger is not None or json_logger is not None) and len(detections) > 0 and not self.args.show:
             self._log_detections(detections, db_logger, json_logger)
         
         # Exibe ou salva resultado
@@ -75,6 +76,10 @@ class ImageProcessor:
         
         if self.args.save:
             self._save_image(annotated, source_path)
+        
+        if json_logger is not None:
+            json_logger.close()
+        return len(detections)
     
     def _create_labels(self, detections: sv.Detections) -> List[str]:
         """Cria labels para as detecções"""
@@ -115,12 +120,12 @@ class ImageProcessor:
         try:
             if self.args.json_out:
                 run_id = self.args.run_id or str(uuid.uuid4())
-                return JsonLogger(self.args.json_out, source_desc=os.path.basename(source_path), run_id=run_id)
+                return create_json_logger(self.args, self.args.json_out, source_desc=os.path.basename(source_path), run_id=run_id)
         except Exception:
             return None
         return None
     
-    def _log_detections(self, detections: sv.Detections, db_logger: OracleLogger, json_logger: Optional[JsonLogger]) -> None:
+    def _log_detections(self, detections: sv.Detections, db_logger: Optional[OracleLogger], json_logger: Optional[JsonLogger]) -> None:
         """Registra detecções nos loggers"""
         try:
             centers = compute_centers(detections.xyxy)
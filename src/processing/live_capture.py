@@ -0,0 +1,85 @@
+"""Captura ao vivo que mantém apenas o frame mais recente"""
+
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class LatestFrameCapture:
+    """Envolve um cv2.VideoCapture lendo em thread própria e guardando só o último frame
+
+    Quando o processamento é mais lento que a câmera, os frames intermediários são
+    descartados (e contados) em vez de se acumularem no buffer do driver, então a
+    latência não cresce. Com `drop=False` nenhum frame é descartado: a thread apenas
+    antecipa a decodificação do próximo frame (útil para arquivos). Expõe `read`,
+    `get` e `release` como o VideoCapture.
+    """
+
+    def __init__(self, cap: cv2.VideoCapture, drop: bool = True) -> None:
+        self._cap = cap
+        self._drop = drop
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_captured_at = 0.0
+        self._seq = 0
+        self._consumed_seq = 0
+        self._running = True
+        self._ended = False
+
+        # Estatísticas e instante de captura do último frame entregue por `read`
+        self.captured = 0
+        self.dropped = 0
+        self.last_captured_at = 0.0
+
+        self._thread = threading.Thread(target=self._reader, name="geosense-live-capture", daemon=True)
+        self._thread.start()
+
+    def _reader(self) -> None:
+        while self._running:
+            ret, frame = self._cap.read()
+            captured_at = time.time()
+            with self._cond:
+                # Sem descarte: espera o frame anterior ser consumido
+                while not self._drop and self._running and self._seq > self._consumed_seq:
+                    self._cond.wait(0.5)
+                if not ret:
+                    self._ended = True
+                    self._cond.notify_all()
+                    return
+                # O frame anterior nunca foi consumido: descartado
+                if self._seq > self._consumed_seq:
+                    self.dropped += 1
+                self._frame = frame
+                self._frame_captured_at = captured_at
+                self._seq += 1
+                self.captured += 1
+                self._cond.notify_all()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Aguarda e retorna o frame mais recente ainda não entregue"""
+        with self._cond:
+            while self._running and not self._ended and self._seq == self._consumed_seq:
+                self._cond.wait(0.5)
+            if self._seq == self._consumed_seq:
+                return False, None
+            self._consumed_seq = self._seq
+            self.last_captured_at = self._frame_captured_at
+            self._cond.notify_all()
+            return True, self._frame
+
+    def get(self, prop_id: int) -> float:
+        return self._cap.get(prop_id)
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    def release(self) -> None:
+        """Para a thread de leitura e libera a captura"""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=2.0)
+        self._cap.release()
@@ -0,0 +1,67 @@
+"""Gate de movimento para pular inferência em cenas estáticas"""
+
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Decide se um frame mudou o suficiente para justificar nova inferência
+
+    Compara uma versão reduzida e em tons de cinza do frame com a do último frame
+    que passou pelo detector. Assim mudanças lentas se acumulam até disparar uma
+    nova inferência, e `max_skip` força uma detecção periódica mesmo sem movimento.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.002,
+        pixel_delta: int = 25,
+        width: int = 160,
+        max_skip: int = 30,
+    ) -> None:
+        """
+        Args:
+            threshold: Fração mínima de pixels alterados para considerar movimento
+            pixel_delta: Diferença mínima de intensidade para um pixel contar como alterado
+            width: Largura da imagem reduzida usada na comparação
+            max_skip: Máximo de frames seguidos sem inferência (0 = sem limite)
+        """
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.width = width
+        self.max_skip = max_skip
+        self._reference: Optional[np.ndarray] = None
+        self._skipped = 0
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        small_h = max(1, int(round(h * self.width / max(w, 1))))
+        small = cv2.resize(frame, (self.width, small_h), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def has_motion(self, frame: np.ndarray) -> bool:
+        """Retorna True se o frame deve passar pelo detector"""
+        small = self._downscale(frame)
+
+        if self._reference is None or self._reference.shape != small.shape:
+            return self._accept(small)
+        if self.max_skip and self._skipped >= self.max_skip:
+            return self._accept(small)
+
+        diff = cv2.absdiff(small, self._reference)
+        _, changed = cv2.threshold(diff, self.pixel_delta, 255, cv2.THRESH_BINARY)
+        changed_frac = cv2.countNonZero(changed) / float(changed.size)
+        if changed_frac >= self.threshold:
+            return self._accept(small)
+
+        self._skipped += 1
+        return False
+
+    def _accept(self, small: np.ndarray) -> bool:
+        self._reference = small
+        self._skipped = 0
+        return True
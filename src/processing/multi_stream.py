@@ -0,0 +1,302 @@
+"""Processamento de várias câmeras/arquivos com um único detector compartilhado"""
+
+import argparse
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import List, Optional, Set, Union
+
+import cv2
+import numpy as np
+import supervision as sv
+
+try:
+    from ..detection import YoloDetector, MotorcycleTracker
+    from ..logging import JsonLogger, OracleLogger, create_json_logger
+    from ..utils.geometry import compute_centers
+    from ..utils.media_clock import MediaClock, create_media_clock
+    from .live_capture import LatestFrameCapture
+    from .video_processor import open_video_capture
+except ImportError:
+    # Fallback para imports absolutos
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+    from src.detection import YoloDetector, MotorcycleTracker
+    from src.logging import JsonLogger, OracleLogger, create_json_logger
+    from src.utils.geometry import compute_centers
+    from src.utils.media_clock import MediaClock, create_media_clock
+    from src.processing.live_capture import LatestFrameCapture
+    from src.processing.video_processor import open_video_capture
+
+
+class StreamState:
+    """Estado de uma fonte no processamento multi-stream: captura, tracker e contagens"""
+
+    def __init__(
+        self,
+        source: Union[str, int],
+        name: str,
+        cap: LatestFrameCapture,
+        tracker: MotorcycleTracker,
+        media_clock: Optional[MediaClock] = None,
+        fps: float = 0.0,
+    ) -> None:
+        self.source = source
+        self.name = name
+        self.cap = cap
+        self.tracker = tracker
+        self.media_clock = media_clock
+        self.fps = fps
+        self.logged_ids: Set[int] = set()
+        self.frames = 0
+        self.ended = False
+
+    def read(self) -> Optional[np.ndarray]:
+        """Próximo frame da fonte (o mais recente, em webcams) ou None ao terminar"""
+        ret, frame = self.cap.read()
+        if not ret or frame is None:
+            self.ended = True
+            return None
+        return frame
+
+    def event_time(self) -> datetime:
+        """Horário do frame atual: pela posição no arquivo com --recording-start, senão agora"""
+        if self.media_clock is not None and self.fps > 0:
+            return self.media_clock.at(self.frames * 1000.0 / self.fps)
+        return datetime.now()
+
+
+class MultiStreamProcessor:
+    """Processa várias fontes com um único YoloDetector e inferência em lote entre fontes
+
+    A cada passo coleta um frame de cada fonte ativa e faz uma única chamada em lote ao
+    detector. Cada fonte tem seu próprio MotorcycleTracker e seu bucket no JSON, então
+    as contagens de motos únicas ficam isoladas por câmera.
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.detector = YoloDetector(args.model, args.device)
+
+        # Configurar anotadores
+        self.box_annotator = sv.BoxAnnotator(thickness=2, text_thickness=1, text_scale=0.5)
+        self.label_annotator = sv.LabelAnnotator(text_thickness=1, text_scale=0.5)
+
+        self.streams: List[StreamState] = []
+
+    def process(self, sources: List[Union[str, int]], db_logger: Optional[OracleLogger] = None) -> None:
+        """Processa todas as fontes até terminarem, --max-frames ou 'q'"""
+        self._warn_unsupported()
+        self.streams = []
+        used_names: Set[str] = set()
+        for source in sources:
+            try:
+                self.streams.append(self._open_stream(source, used_names))
+            except Exception as e:
+                print(f"Aviso: fonte ignorada ({source}): {e}")
+        if not self.streams:
+            raise RuntimeError("Nenhuma fonte pôde ser aberta.")
+
+        json_logger = self._setup_json_logger()
+
+        last_summary = time.time()
+        summary_frames = 0
+        try:
+            while True:
+                active = [stream for stream in self.streams if not stream.ended]
+                if not active:
+                    break
+
+                # Um frame por fonte ativa; fontes que terminaram saem do lote
+                batch = []
+                for stream in active:
+                    frame = stream.read()
+                    if frame is not None:
+                        batch.append((stream, frame))
+                if not batch:
+                    break
+
+                frames = [frame for _, frame in batch]
+                if len(frames) == 1:
+                    detections_list = [self._detect(frames[0])]
+                else:
+                    detections_list = self.detector.detect_batch(
+                        frames,
+                        conf=self.args.conf,
+                        iou=self.args.iou,
+                        imgsz=self.args.imgsz,
+                        half=self.args.half,
+                        augment=self.args.tta
+                    )
+
+                for (stream, frame), detections in zip(batch, detections_list):
+                    detections, det_canonical_ids = stream.tracker.update(detections)
+                    if db_logger is not None or json_logger is not None:
+                        self._log_newly_confirmed(stream, detections, det_canonical_ids, db_logger, json_logger)
+
+                    stream.frames += 1
+                    if self.args.max_frames and stream.frames >= self.args.max_frames:
+                        stream.ended = True
+
+                    if self.args.show:
+                        cv2.imshow(self._window_name(stream), self._render(stream, frame, detections, det_canonical_ids))
+
+                summary_frames += len(batch)
+                if self.args.show:
+                    if (cv2.waitKey(1) & 0xFF) == ord("q"):
+                        break
+                elif time.time() - last_summary >= self.args.summary_interval:
+                    self._print_summary(summary_frames / max(time.time() - last_summary, 1e-6))
+                    last_summary = time.time()
+                    summary_frames = 0
+        finally:
+            for stream in self.streams:
+                stream.cap.release()
+            if self.args.show:
+                cv2.destroyAllWindows()
+            if json_logger is not None:
+                json_logger.close()
+
+        total = 0
+        for stream in self.streams:
+            count = stream.tracker.get_unique_count()
+            total += count
+            print(f"[{stream.name}] Motos únicas: {count} em {stream.frames} frames")
+        print(f"Total de motos únicas (todas as fontes): {total}")
+
+    def _warn_unsupported(self) -> None:
+        """Avisa sobre opções do modo de fonte única que o multi-stream não aplica"""
+        unsupported = [
+            flag for flag, enabled in (
+                ("--save", self.args.save),
+                ("--zones", bool(self.args.zones)),
+                ("--zones-reload", bool(self.args.zones) and self.args.zones_reload > 0),
+                ("--checkpoint-dir", bool(self.args.checkpoint_dir)),
+                ("--detect-every", self.args.detect_every > 1),
+                ("--motion-gate", self.args.motion_gate),
+                ("--pipeline", self.args.pipeline),
+                ("--batch-size", self.args.batch_size > 1),
+                ("--live", self.args.live),
+            ) if enabled
+        ]
+        if unsupported:
+            print(f"Aviso: opções não suportadas com --sources serão ignoradas: {', '.join(unsupported)}")
+
+    def _open_stream(self, source: Union[str, int], used_names: Set[str]) -> StreamState:
+        """Abre a captura e cria o tracker de uma fonte"""
+        live = isinstance(source, int)
+        cap = open_video_capture(source, backend=self.args.backend, live=live)
+        # Webcams mantêm só o frame mais recente; arquivos só antecipam a decodificação
+        reader = LatestFrameCapture(cap, drop=live)
+
+        frame_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 1920
+        frame_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 1080
+        tracker = MotorcycleTracker(
+            track_thresh=self.args.track_thresh,
+            match_thresh=self.args.match_thresh,
+            track_buffer=self.args.track_buffer,
+            min_track_frames=self.args.min_track_frames,
+            reassoc_window=self.args.reassoc_window,
+            reassoc_iou=self.args.reassoc_iou,
+            reassoc_dist_frac=self.args.reassoc_dist_frac,
+            frame_width=frame_w,
+            frame_height=frame_h,
+            backend=self.args.tracker_backend
+        )
+
+        name = f"webcam_{int(source)}" if live else os.path.basename(str(source))
+        base, suffix = name, 2
+        while name in used_names:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        used_names.add(name)
+
+        # Modo offline: horário dos eventos pela posição de cada arquivo
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        media_clock = None
+        if self.args.recording_start and live:
+            print(f"Aviso: --recording-start só vale para arquivos; {name} usa o relógio do sistema.")
+        elif self.args.recording_start:
+            media_clock = create_media_clock(
+                self.args.recording_start, str(source), int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), fps
+            )
+        return StreamState(source, name, reader, tracker, media_clock, fps)
+
+    def _setup_json_logger(self) -> Optional[JsonLogger]:
+        """Um único JsonLogger para todas as fontes, com um bucket por fonte"""
+        try:
+            if self.args.json_out:
+                run_id = self.args.run_id or str(uuid.uuid4())
+                return create_json_logger(self.args, self.args.json_out, source_desc=self.streams[0].name, run_id=run_id)
+        except Exception:
+            return None
+        return None
+
+    def _detect(self, frame: np.ndarray) -> sv.Detections:
+        return self.detector.detect(
+            image=frame,
+            conf=self.args.conf,
+            iou=self.args.iou,
+            imgsz=self.args.imgsz,
+            half=self.args.half,
+            augment=self.args.tta
+        )
+
+    def _log_newly_confirmed(
+        self,
+        stream: StreamState,
+        detections: sv.Detections,
+        det_canonical_ids: List[Optional[int]],
+        db_logger: Optional[OracleLogger],
+        json_logger: Optional[JsonLogger],
+    ) -> None:
+        """Registra motos recém-confirmadas de uma fonte no bucket dela"""
+        if not (len(detections) > 0 and detections.tracker_id is not None):
+            return
+        try:
+            centers = compute_centers(detections.xyxy)
+            now = stream.event_time()
+            for i, cid in enumerate(det_canonical_ids):
+                if cid is None or int(cid) in stream.logged_ids:
+                    continue
+                if not stream.tracker.is_newly_confirmed(cid):
+                    continue
+                cx, cy = centers[i]
+                db_id = None
+                if db_logger is not None:
+                    db_id = db_logger.insert_moto(int(cid), float(cx), float(cy), now)
+                if json_logger is not None:
+                    json_logger.insert_moto(int(cid), float(cx), float(cy), now, db_id=db_id, source=stream.name)
+                print(f"[{stream.name}] TRACK #{int(cid)}: x={cx:.2f}, y={cy:.2f}, time={now}")
+                stream.logged_ids.add(int(cid))
+        except Exception as e:
+            print(f"Aviso: falha ao registrar detecções ({stream.name}): {e}")
+
+    def _render(
+        self,
+        stream: StreamState,
+        frame: np.ndarray,
+        detections: sv.Detections,
+        det_canonical_ids: List[Optional[int]],
+    ) -> np.ndarray:
+        """Anota o frame de uma fonte com caixas, IDs e contagem"""
+        annotated = frame.copy()
+        if len(detections) > 0:
+            labels = [f"#{int(cid)}" if cid is not None else "" for cid in det_canonical_ids]
+            annotated = self.box_annotator.annotate(scene=annotated, detections=detections)
+            annotated = self.label_annotator.annotate(scene=annotated, detections=detections, labels=labels)
+        hud_text = (
+            f"{stream.name} | Motos ativas: {stream.tracker.get_active_count(det_canonical_ids)} | "
+            f"Únicas conf.: {stream.tracker.get_unique_count()}"
+        )
+        cv2.putText(annotated, hud_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2, cv2.LINE_AA)
+        return annotated
+
+    def _window_name(self, stream: StreamState) -> str:
+        return f"GeoSense - {stream.name}"
+
+    def _print_summary(self, fps: float) -> None:
+        """Resumo em texto das contagens por fonte"""
+        parts = [f"{stream.name}: {stream.tracker.get_unique_count()}" for stream in self.streams]
+        print(f"Únicas por fonte -> {' | '.join(parts)} | FPS total: {fps:.1f}", flush=True)
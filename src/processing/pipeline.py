@@ -0,0 +1,156 @@
+"""Pipeline em estágios com filas limitadas para processamento de vídeo"""
+
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+# Marca o fim do fluxo entre os estágios
+_END = object()
+
+
+class FramePacket:
+    """Dados de um frame que atravessam os estágios do pipeline"""
+
+    def __init__(self, index: int, frame: np.ndarray, captured_at: float) -> None:
+        self.index = index
+        self.frame: Optional[np.ndarray] = frame
+        self.captured_at = captured_at
+        # Posição do frame no arquivo em ms (modo offline com --recording-start)
+        self.media_msec: Optional[float] = None
+        self.detections: Any = None
+        self.canonical_ids: List[Optional[int]] = []
+
+
+class Stage:
+    """Estágio em lote do pipeline: a função recebe e devolve listas de até `batch_size` itens"""
+
+    def __init__(self, fn: Callable[[Any], Any], batch_size: int = 1, batched: bool = True) -> None:
+        self.fn = fn
+        self.batch_size = max(1, int(batch_size))
+        self.batched = batched
+
+
+class FramePipeline:
+    """Executa produtor e estágios em threads ligadas por filas limitadas
+
+    O produtor (captura) e cada estágio rodam em sua própria thread; o consumidor
+    final (renderização/exibição) roda na thread que chama `run`, pois o HighGUI
+    do OpenCV precisa da thread principal. Filas limitadas dão backpressure: um
+    estágio rápido bloqueia ao publicar até que o seguinte consuma.
+    """
+
+    def __init__(
+        self,
+        producer: Iterable[Any],
+        stages: Sequence[Union[Stage, Callable[[Any], Any]]],
+        queue_size: int = 4,
+    ) -> None:
+        self._producer = producer
+        # Funções simples viram estágios item a item
+        self._stages = [st if isinstance(st, Stage) else Stage(st, batched=False) for st in stages]
+        self._queues: List["queue.Queue[Any]"] = [
+            queue.Queue(maxsize=max(1, int(queue_size))) for _ in range(len(self._stages) + 1)
+        ]
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._error: Optional[BaseException] = None
+
+    def stop(self) -> None:
+        """Solicita o encerramento de todos os estágios"""
+        self._stop.set()
+
+    def _put(self, q: "queue.Queue[Any]", item: Any) -> bool:
+        """Publica respeitando backpressure; retorna False se o pipeline parou"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: "queue.Queue[Any]") -> Any:
+        """Consome da fila; retorna _END se o pipeline parou"""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _fail(self, exc: BaseException) -> None:
+        if self._error is None:
+            self._error = exc
+        self._stop.set()
+
+    def _run_producer(self) -> None:
+        out_q = self._queues[0]
+        try:
+            for item in self._producer:
+                if not self._put(out_q, item):
+                    return
+        except BaseException as e:
+            self._fail(e)
+            return
+        self._put(out_q, _END)
+
+    def _run_stage(self, stage: Stage, in_q: "queue.Queue[Any]", out_q: "queue.Queue[Any]") -> None:
+        finished = False
+        while not finished:
+            batch: List[Any] = []
+            while len(batch) < stage.batch_size:
+                item = self._get(in_q)
+                if item is _END:
+                    finished = True
+                    break
+                batch.append(item)
+            if batch:
+                try:
+                    if stage.batched:
+                        results = list(stage.fn(batch))
+                    else:
+                        results = [stage.fn(batch[0])]
+                except BaseException as e:
+                    self._fail(e)
+                    return
+                for result in results:
+                    # Estágios podem descartar itens retornando None
+                    if result is not None and not self._put(out_q, result):
+                        return
+        self._put(out_q, _END)
+
+    def run(self, sink: Callable[[Any], bool]) -> None:
+        """Executa o pipeline; `sink` retorna False para encerrar antecipadamente"""
+        self._threads = [threading.Thread(target=self._run_producer, name="geosense-capture", daemon=True)]
+        for idx, stage in enumerate(self._stages):
+            self._threads.append(
+                threading.Thread(
+                    target=self._run_stage,
+                    args=(stage, self._queues[idx], self._queues[idx + 1]),
+                    name=f"geosense-stage-{idx + 1}",
+                    daemon=True,
+                )
+            )
+        for t in self._threads:
+            t.start()
+
+        try:
+            final_q = self._queues[-1]
+            while True:
+                item = self._get(final_q)
+                if item is _END:
+                    break
+                if not sink(item):
+                    break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._stop.set()
+            for t in self._threads:
+                t.join()
+
+        if self._error is not None:
+            raise self._error
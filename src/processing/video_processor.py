@@ -3,36 +3,102 @@
 import argparse
 import cv2
 import os
+import threading
 import time
 import uuid
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
 
 import supervision as sv
 import numpy as np
 
 try:
     from ..detection import YoloDetector, MotorcycleTracker
-    from ..logging import JsonLogger, OracleLogger
+    from ..detection.checkpoint import TrackerCheckpointer, checkpoint_path, load_checkpoint
+    from ..logging import JsonLogger, OracleLogger, create_json_logger
     from ..utils.geometry import compute_centers
     from ..utils.io_utils import safe_read_line
+    from ..utils.media_clock import MediaClock, create_media_clock
+    from ..utils.zone_layout import ZoneConfigWatcher, ZoneLayout, build_zone_layout
+    from ..utils.zone_occupancy import ZoneOccupancy
+    from ..utils.zone_visits import ZoneVisitTracker
+    from .pipeline import FramePacket, FramePipeline, Stage
+    from .motion_gate import MotionGate
+    from .live_capture import LatestFrameCapture
+    from .video_writer import AsyncVideoWriter, FfmpegWriter, OpenCVWriter, create_video_writer
 except ImportError:
     # Fallback para imports absolutos
     import sys
     import os
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
     from src.detection import YoloDetector, MotorcycleTracker
-    from src.logging import JsonLogger, OracleLogger
+    from src.detection.checkpoint import TrackerCheckpointer, checkpoint_path, load_checkpoint
+    from src.logging import JsonLogger, OracleLogger, create_json_logger
     from src.utils.geometry import compute_centers
     from src.utils.io_utils import safe_read_line
+    from src.utils.media_clock import MediaClock, create_media_clock
+    from src.utils.zone_layout import ZoneConfigWatcher, ZoneLayout, build_zone_layout
+    from src.utils.zone_occupancy import ZoneOccupancy
+    from src.utils.zone_visits import ZoneVisitTracker
+    from src.processing.pipeline import FramePacket, FramePipeline, Stage
+    from src.processing.motion_gate import MotionGate
+    from src.processing.live_capture import LatestFrameCapture
+    from src.processing.video_writer import AsyncVideoWriter, FfmpegWriter, OpenCVWriter, create_video_writer
+
+
+def open_video_capture(source: Union[str, int], backend: str = "auto", live: bool = False) -> cv2.VideoCapture:
+    """Abre a captura de vídeo com fallbacks para webcam (buffer mínimo e MJPG se `live`)"""
+    backend_map = {
+        "any": getattr(cv2, "CAP_ANY", 0),
+        "dshow": getattr(cv2, "CAP_DSHOW", 700),
+        "msmf": getattr(cv2, "CAP_MSMF", 1400),
+    }
+
+    if isinstance(source, int):
+        # Webcam
+        if backend != "auto":
+            cap = cv2.VideoCapture(source, backend_map[backend])
+        else:
+            cap = cv2.VideoCapture(source)
+            
+        # Fallback para outros backends no Windows
+        if not cap.isOpened() and os.name == "nt":
+            for flag in [backend_map["dshow"], backend_map["msmf"], backend_map["any"]]:
+                try:
+                    cap.release()
+                except Exception:
+                    pass
+                cap = cv2.VideoCapture(source, flag)
+                if cap.isOpened():
+                    break
+    else:
+        # Arquivo
+        cap = cv2.VideoCapture(source)
+
+    if not cap or not cap.isOpened():
+        raise RuntimeError(f"Não foi possível abrir a fonte: {source}")
+
+    # Modo ao vivo: buffer mínimo no driver e MJPG quando a câmera suportar
+    if live:
+        try:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        except Exception:
+            pass
+        try:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        except Exception:
+            pass
+
+    return cap
 
 
 class VideoProcessor:
     """Processador para detecção e rastreamento de motocicletas em vídeo"""
     
-    def __init__(self, args: argparse.Namespace):
+    def __init__(self, args: argparse.Namespace, detector: Optional[YoloDetector] = None):
         self.args = args
-        self.detector = YoloDetector(args.model, args.device)
+        # Um detector já carregado pode ser reutilizado (ex.: workers do modo em lote)
+        self.detector = detector or YoloDetector(args.model, args.device)
         
         # Configurar anotadores
         self.box_annotator = sv.BoxAnnotator(thickness=2, text_thickness=1, text_scale=0.5)
@@ -41,10 +107,73 @@ class VideoProcessor:
         # Tracker será inicializado quando soubermos o tamanho do frame
         self.tracker: Optional[MotorcycleTracker] = None
         
+        # Tamanho do lote de inferência (definido por fonte em process)
+        self._batch_size = 1
+        self._detect_every = max(1, args.detect_every)
+        
+        # Zonas configuradas e regiões de inferência (carregadas por fonte em process)
+        self.zones: List[Dict[str, Any]] = []
+        self._rois: List[Tuple[int, int, int, int]] = []
+        self._roi_imgsz = args.imgsz
+        
+        # Ocupação das zonas por frame (HUD, resumo e --json-out)
+        self.zone_occupancy: Optional[ZoneOccupancy] = None
+        self.zone_visits: Optional[ZoneVisitTracker] = None
+        self._zone_watcher: Optional[ZoneConfigWatcher] = None
+        self._zones_json_last = 0.0
+        self._zones_media_msec: Optional[float] = None
+        
+        # Gate de movimento (recriado por fonte em process)
+        self.motion_gate: Optional[MotionGate] = None
+        self._last_raw_detections: Optional[sv.Detections] = None
+        
+        # Captura ao vivo com descarte de frames antigos (--live em webcam)
+        self._live = False
+        self._live_capture: Optional[LatestFrameCapture] = None
+        self._last_latency = 0.0
+        
+        # Checkpoint periódico do tracker (--checkpoint-dir) e retomada de arquivos
+        self._checkpointer: Optional[TrackerCheckpointer] = None
+        self._logged_journal: Optional[TextIO] = None
+        # IDs já gravados em cada destino ("db" = Oracle, "json" = --json-out): só
+        # eles vão para o diário e o checkpoint, e a retomada pula cada destino à parte
+        self._durable_logged: Dict[str, Set[int]] = {"db": set(), "json": set()}
+        self._resume_unlogged: Set[int] = set()
+        self._journal_lock = threading.Lock()
+        self._run_id = ""
+        self._start_index = 0
+        self._frame_offset = 0
+        self._finished = False
+        
+        # Horário dos eventos pela posição no arquivo (--recording-start)
+        self._media_clock: Optional[MediaClock] = None
+        
+        # Writer da execução atual (estatísticas de gravação ao final)
+        self._writer: Optional[Union[AsyncVideoWriter, OpenCVWriter, FfmpegWriter]] = None
+        
+        # Contadores de execução exibidos ao final
+        self.stats = {
+            "frames": 0,
+            "detected_frames": 0,
+            "motion_skipped": 0,
+            "latency_sum": 0.0,
+            "latency_max": 0.0,
+        }
+        
+        # Modo headless e resumo periódico em texto
+        self._headless = False
+        self._progress_last = 0.0
+        self._progress_frames = 0
+        
     def process(self, source: Union[str, int], db_logger: Optional[OracleLogger] = None) -> None:
         """Processa um fluxo de vídeo (arquivo ou webcam) com detecção e rastreamento"""
         # Abre a fonte de vídeo
+        self._live = self.args.live and isinstance(source, int)
         cap = self._open_video_capture(source)
+        self._live_capture = None
+        if self._live:
+            cap = LatestFrameCapture(cap)
+            self._live_capture = cap
         
         # Lê primeiro frame para obter dimensões
         ret, first_frame = cap.read()
@@ -53,6 +182,31 @@ class VideoProcessor:
         
         frame_h, frame_w = first_frame.shape[:2]
         
+        # Zera contadores de uma execução anterior (menu reutiliza o processador)
+        self.stats = dict.fromkeys(self.stats, 0)
+        self._progress_last = time.time()
+        self._progress_frames = 0
+        
+        # Sem janela e sem gravação não há por que renderizar
+        self._headless = not self.args.show and not self.args.save
+        self._last_raw_detections = None
+        if self.args.motion_gate:
+            self.motion_gate = MotionGate(
+                threshold=self.args.motion_thresh,
+                max_skip=self.args.motion_max_skip,
+            )
+        else:
+            self.motion_gate = None
+        
+        # Lotes só para arquivos: em fontes ao vivo a latência importa
+        self._batch_size = 1 if isinstance(source, int) else max(1, self.args.batch_size)
+        
+        # Zonas (--zones) restringem a inferência às regiões configuradas
+        self._setup_zones(frame_w, frame_h)
+        
+        # Modo offline: detected_at vem da posição do frame, não do relógio
+        self._media_clock = self._setup_media_clock(source, cap)
+        
         # Inicializa tracker com dimensões do frame
         self.tracker = MotorcycleTracker(
             track_thresh=self.args.track_thresh,
@@ -63,12 +217,33 @@ class VideoProcessor:
             reassoc_iou=self.args.reassoc_iou,
             reassoc_dist_frac=self.args.reassoc_dist_frac,
             frame_width=frame_w,
-            frame_height=frame_h
+            frame_height=frame_h,
+            detect_every=self._detect_every,
+            backend=self.args.tracker_backend
         )
         
+        # Controle de IDs já logados no banco (restaurado junto com o checkpoint)
+        canonical_logged_db: Set[int] = set()
+        self._run_id = self.args.run_id or str(uuid.uuid4())
+        self._start_index = 0
+        self._finished = False
+        self._durable_logged = {"db": set(), "json": set()}
+        self._resume_unlogged = set()
+        self._checkpointer = self._setup_checkpoint(source, cap)
+        
+        # Retomada de arquivo: continua do primeiro frame ainda não rastreado
+        if self._start_index > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, self._start_index)
+            ret, first_frame = cap.read()
+            if not ret:
+                first_frame = None
+        
         # Configura writer e logger
         writer = self._setup_video_writer(cap, frame_w, frame_h)
+        self._writer = writer
         json_logger = self._setup_json_logger(source)
+        if self._checkpointer is not None:
+            self._restore_logged(canonical_logged_db, db_logger, json_logger)
         
         # Configura janela se necessário
         window_name = "GeoSense - Mottu x FIAP"
@@ -76,43 +251,70 @@ class VideoProcessor:
             cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
             cv2.resizeWindow(window_name, min(1280, frame_w), min(720, frame_h))
         
-        # Controle de IDs já logados no banco
-        canonical_logged_db = set()
-        
         try:
-            frame = first_frame
-            while True:
-                if frame is None:
-                    break
-                
+            if self.args.pipeline:
+                self._run_pipelined(
+                    cap, first_frame, window_name, writer, db_logger, json_logger, canonical_logged_db
+                )
+            else:
+                self._run_sequential(
+                    cap, first_frame, window_name, writer, db_logger, json_logger, canonical_logged_db
+                )
+        finally:
+            self._cleanup_resources(cap, writer, window_name)
+            if self._zone_watcher is not None:
+                self._zone_watcher.close()
+            if self.zone_visits is not None:
+                self._log_zone_visits(self.zone_visits.close_all(), db_logger, json_logger)
+            if self.zone_occupancy is not None and json_logger is not None:
+                json_logger.update_zones(self.zone_occupancy.summary(), self._event_time(self._zones_media_msec))
+            if json_logger is not None:
+                json_logger.close()
+            if self._checkpointer is not None:
+                self._checkpointer.close(self.tracker)
+            if self._logged_journal is not None:
+                self._logged_journal.close()
+                self._logged_journal = None
+            
+        # Mostra estatísticas finais
+        final_total = self.tracker.get_unique_count() if self.tracker else 0
+        print(f"Total de motos únicas vistas no vídeo: {final_total}")
+        self._print_run_stats()
+        
+        # Mostra popup no Windows
+        if os.name == "nt" and self.args.show:
+            self._show_final_popup(final_total)
+    
+    def _run_sequential(
+        self,
+        cap: cv2.VideoCapture,
+        first_frame: np.ndarray,
+        window_name: str,
+        writer: Optional[Union[AsyncVideoWriter, OpenCVWriter, FfmpegWriter]],
+        db_logger: Optional[OracleLogger],
+        json_logger: Optional[JsonLogger],
+        canonical_logged_db: set
+    ) -> None:
+        """Executa decodificação, inferência, rastreamento e saída em sequência"""
+        for batch in self._iter_batches(self._iter_packets(cap, first_frame)):
+            start = time.time()
+            self._detect_many(batch)
+            # Tempo de inferência do lote é dividido entre os frames
+            infer_share = (time.time() - start) / len(batch)
+            
+            for packet in batch:
                 start = time.time()
-                
-                # Detecta motocicletas
-                detections = self.detector.detect(
-                    image=frame,
-                    conf=self.args.conf,
-                    iou=self.args.iou,
-                    imgsz=self.args.imgsz,
-                    half=self.args.half,
-                    augment=self.args.tta
+                detections, det_canonical_ids = self._track_and_log(
+                    packet.detections, db_logger, json_logger, canonical_logged_db, packet.media_msec
                 )
                 
-                # Atualiza tracker
-                detections, det_canonical_ids = self.tracker.update(detections)
-                
-                # Registra motos recém-confirmadas
-                if (db_logger is not None or json_logger is not None) and len(detections) > 0:
-                    self._log_newly_confirmed_motorcycles(
-                        detections, det_canonical_ids, db_logger, json_logger, canonical_logged_db
-                    )
-                
-                # Cria labels e anota frame
-                labels = self._create_labels(detections, det_canonical_ids)
-                annotated = self._annotate_frame(frame, detections, labels)
+                # Modo headless: nada é desenhado, apenas resumo periódico em texto
+                if self._headless:
+                    self._report_progress(det_canonical_ids)
+                    continue
                 
-                # Adiciona HUD
-                elapsed = time.time() - start
-                annotated = self._add_hud(annotated, det_canonical_ids, elapsed)
+                elapsed = infer_share + (time.time() - start)
+                annotated = self._render(packet.frame, detections, det_canonical_ids, elapsed)
                 
                 # Exibe frame
                 if self.args.show:
@@ -120,88 +322,628 @@ class VideoProcessor:
                     if self._check_quit_key():
                         # Salva snapshot final
                         self._save_final_snapshot(
-                            detections, det_canonical_ids, db_logger, json_logger, canonical_logged_db
+                            detections, det_canonical_ids, db_logger, json_logger, canonical_logged_db,
+                            packet.media_msec
                         )
-                        break
+                        return
                 
                 # Salva frame
                 if writer is not None:
                     writer.write(annotated)
-                
-                # Verifica limite de frames
-                if self.args.max_frames and self.tracker.frame_count >= self.args.max_frames:
-                    break
-                
-                # Lê próximo frame
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                    
-        finally:
-            self._cleanup_resources(cap, writer, window_name)
+    
+    def _run_pipelined(
+        self,
+        cap: cv2.VideoCapture,
+        first_frame: np.ndarray,
+        window_name: str,
+        writer: Optional[Union[AsyncVideoWriter, OpenCVWriter, FfmpegWriter]],
+        db_logger: Optional[OracleLogger],
+        json_logger: Optional[JsonLogger],
+        canonical_logged_db: set
+    ) -> None:
+        """Executa captura, inferência, rastreamento e saída em estágios paralelos
+        
+        Captura, inferência e rastreamento rodam em threads próprias ligadas por filas
+        limitadas; anotação, exibição e escrita rodam nesta thread. O rastreamento é
+        um único estágio, então os frames chegam ao tracker na ordem de captura.
+        """
+        def infer(packets: List[FramePacket]) -> List[FramePacket]:
+            self._detect_many(packets)
+            return packets
+        
+        def track(packet: FramePacket) -> FramePacket:
+            packet.detections, packet.canonical_ids = self._track_and_log(
+                packet.detections, db_logger, json_logger, canonical_logged_db, packet.media_msec
+            )
+            # Sem renderização o frame não é mais necessário: libera memória cedo
+            if self._headless:
+                packet.frame = None
+            return packet
+        
+        last_out = [time.time()]
+        quit_packet: List[FramePacket] = []
+        
+        def sink(packet: FramePacket) -> bool:
+            if self._headless:
+                self._report_progress(packet.canonical_ids)
+                return True
             
-        # Mostra estatísticas finais
-        final_total = self.tracker.get_unique_count() if self.tracker else 0
-        print(f"Total de motos únicas vistas no vídeo: {final_total}")
+            now = time.time()
+            elapsed = now - last_out[0]
+            last_out[0] = now
+            annotated = self._render(packet.frame, packet.detections, packet.canonical_ids, elapsed)
+            
+            if self.args.show:
+                cv2.imshow(window_name, annotated)
+                if self._check_quit_key():
+                    quit_packet.append(packet)
+                    return False
+            
+            if writer is not None:
+                writer.write(annotated)
+            return True
         
-        # Mostra popup no Windows
-        if os.name == "nt" and self.args.show:
-            self._show_final_popup(final_total)
+        pipeline = FramePipeline(
+            self._iter_packets(cap, first_frame),
+            [Stage(infer, batch_size=self._batch_size), track],
+            # Ao vivo, filas longas reintroduziriam os frames atrasados que a captura descarta
+            queue_size=1 if self._live else max(self.args.queue_size, self._batch_size),
+        )
+        pipeline.run(sink)
+        
+        # Snapshot só depois que o estágio de rastreamento terminou
+        if quit_packet:
+            packet = quit_packet[0]
+            self._save_final_snapshot(
+                packet.detections, packet.canonical_ids, db_logger, json_logger, canonical_logged_db,
+                packet.media_msec
+            )
     
-    def _open_video_capture(self, source: Union[str, int]) -> cv2.VideoCapture:
-        """Abre a captura de vídeo com fallbacks para webcam"""
-        backend_map = {
-            "any": getattr(cv2, "CAP_ANY", 0),
-            "dshow": getattr(cv2, "CAP_DSHOW", 700),
-            "msmf": getattr(cv2, "CAP_MSMF", 1400),
-        }
+    def _iter_packets(self, cap: cv2.VideoCapture, first_frame: Optional[np.ndarray]) -> Iterator[FramePacket]:
+        """Itera os frames da captura como pacotes, respeitando --max-frames
         
-        if isinstance(source, int):
-            # Webcam
-            if self.args.backend != "auto":
-                cap = cv2.VideoCapture(source, backend_map[self.args.backend])
+        Índices são absolutos no vídeo (uma retomada começa em `_start_index`). Chegar
+        ao fim do vídeo marca a execução como concluída para o checkpoint; parar no
+        --max-frames não, para que a próxima execução retome dali.
+        """
+        frame = first_frame
+        index = self._start_index
+        while frame is not None:
+            packet = FramePacket(index, frame, self._captured_at(cap))
+            if self._media_clock is not None:
+                packet.media_msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+            yield packet
+            index += 1
+            if self.args.max_frames and index >= self.args.max_frames:
+                return
+            ret, frame = cap.read()
+            if not ret:
+                break
+        self._finished = True
+    
+    def _captured_at(self, cap: cv2.VideoCapture) -> float:
+        """Instante de captura do último frame lido"""
+        if isinstance(cap, LatestFrameCapture):
+            return cap.last_captured_at
+        return time.time()
+    
+    def _iter_batches(self, packets: Iterator[FramePacket]) -> Iterator[List[FramePacket]]:
+        """Agrupa pacotes em lotes de até --batch-size"""
+        batch: List[FramePacket] = []
+        for packet in packets:
+            batch.append(packet)
+            if len(batch) >= self._batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def _is_keyframe(self, index: int) -> bool:
+        """Indica se o frame passa pelo detector no modo --detect-every"""
+        return index % self._detect_every == 0
+    
+    def _detect_many(self, batch: List[FramePacket]) -> None:
+        """Detecta motocicletas nos keyframes de um lote (um forward pass quando > 1)
+        
+        Pacotes fora dos keyframes ficam com detecções None e terão as caixas
+        propagadas pelo tracker. Keyframes sem movimento (--motion-gate) reutilizam as
+        últimas detecções, que seguem para o tracker normalmente para que os tracks
+        continuem envelhecendo.
+        """
+        to_detect: List[FramePacket] = []
+        reused: Set[int] = set()
+        for packet in batch:
+            packet.detections = None
+            if not self._is_keyframe(packet.index):
+                continue
+            if (
+                self.motion_gate is not None
+                and not self.motion_gate.has_motion(packet.frame)
+                and (self._last_raw_detections is not None or to_detect)
+            ):
+                reused.add(packet.index)
             else:
-                cap = cv2.VideoCapture(source)
-                
-            # Fallback para outros backends no Windows
-            if not cap.isOpened() and os.name == "nt":
-                for flag in [backend_map["dshow"], backend_map["msmf"], backend_map["any"]]:
-                    try:
-                        cap.release()
-                    except Exception:
-                        pass
-                    cap = cv2.VideoCapture(source, flag)
-                    if cap.isOpened():
-                        break
+                to_detect.append(packet)
+        
+        self.stats["frames"] += len(batch)
+        self.stats["detected_frames"] += len(to_detect)
+        self.stats["motion_skipped"] += len(reused)
+        
+        if to_detect:
+            detections_list = self._run_detector([packet.frame for packet in to_detect])
+            for packet, detections in zip(to_detect, detections_list):
+                packet.detections = detections
+        
+        # Preenche os keyframes pulados com a detecção mais recente anterior a eles
+        if self.motion_gate is not None:
+            for packet in batch:
+                if packet.index in reused:
+                    packet.detections = self._last_raw_detections
+                elif packet.detections is not None:
+                    self._last_raw_detections = packet.detections
+        
+        # Latência captura -> detecção disponível
+        detected_at = time.time()
+        for packet in batch:
+            self._record_latency(detected_at - packet.captured_at)
+    
+    def _run_detector(self, frames: List[np.ndarray]) -> List[sv.Detections]:
+        """Roda o detector em um ou mais frames, no frame inteiro ou só nas zonas"""
+        if self._rois:
+            return self.detector.detect_regions(
+                frames,
+                self._rois,
+                conf=self.args.conf,
+                iou=self.args.iou,
+                imgsz=self._roi_imgsz,
+                half=self.args.half,
+                augment=self.args.tta
+            )
+        if len(frames) == 1:
+            return [self._detect(frames[0])]
+        return self.detector.detect_batch(
+            frames,
+            conf=self.args.conf,
+            iou=self.args.iou,
+            imgsz=self.args.imgsz,
+            half=self.args.half,
+            augment=self.args.tta
+        )
+    
+    def _detect(self, frame: np.ndarray) -> sv.Detections:
+        """Detecta motocicletas em um frame"""
+        return self.detector.detect(
+            image=frame,
+            conf=self.args.conf,
+            iou=self.args.iou,
+            imgsz=self.args.imgsz,
+            half=self.args.half,
+            augment=self.args.tta
+        )
+    
+    def _track_and_log(
+        self,
+        detections: Optional[sv.Detections],
+        db_logger: Optional[OracleLogger],
+        json_logger: Optional[JsonLogger],
+        canonical_logged_db: set,
+        media_msec: Optional[float] = None
+    ) -> Tuple[sv.Detections, List[Optional[int]]]:
+        """Atualiza o tracker e registra motos recém-confirmadas
+        
+        Sem detecções (frame fora dos keyframes), o tracker apenas propaga as caixas.
+        """
+        # Zonas recarregadas (--zones-reload) entram entre dois frames
+        if self._zone_watcher is not None:
+            layout = self._zone_watcher.take()
+            if layout is not None:
+                print(f"Zonas recarregadas de {self.args.zones}: {len(layout.zones)} zona(s)")
+                self._apply_zone_layout(layout, db_logger, json_logger)
+        
+        if detections is None:
+            detections, det_canonical_ids = self.tracker.propagate()
         else:
-            # Arquivo
-            cap = cv2.VideoCapture(source)
+            detections, det_canonical_ids = self.tracker.update(detections)
+            
+            if (db_logger is not None or json_logger is not None) and len(detections) > 0:
+                self._log_newly_confirmed_motorcycles(
+                    detections, det_canonical_ids, db_logger, json_logger, canonical_logged_db, media_msec
+                )
+        
+        if self.zone_occupancy is not None:
+            self._update_zones(detections, det_canonical_ids, db_logger, json_logger, media_msec)
+        
+        # Snapshot entre dois updates; a escrita roda em segundo plano
+        if self._checkpointer is not None:
+            self._checkpointer.maybe_save(self.tracker)
+        return detections, det_canonical_ids
+    
+    def _render(
+        self,
+        frame: np.ndarray,
+        detections: sv.Detections,
+        det_canonical_ids: List[Optional[int]],
+        elapsed: float
+    ) -> np.ndarray:
+        """Cria labels, anota o frame e adiciona o HUD"""
+        labels = self._create_labels(detections, det_canonical_ids)
+        # Zonas são desenhadas por baixo das caixas
+        if self.zone_occupancy is not None:
+            frame = self._draw_zones(frame.copy(), detections, det_canonical_ids)
+        annotated = self._annotate_frame(frame, detections, labels)
+        return self._add_hud(annotated, det_canonical_ids, elapsed)
+    
+    def _open_video_capture(self, source: Union[str, int]) -> cv2.VideoCapture:
+        """Abre a captura de vídeo com fallbacks para webcam"""
+        return open_video_capture(source, backend=self.args.backend, live=self._live)
+    
+    def _setup_zones(self, frame_w: int, frame_h: int) -> None:
+        """Carrega as zonas e calcula as regiões de inferência (--zones)"""
+        self.zones = []
+        self.zone_occupancy = None
+        self.zone_visits = None
+        self._zone_watcher = None
+        self._zones_json_last = time.time()
+        self._zones_media_msec = None
+        self._rois = []
+        self._roi_imgsz = self.args.imgsz
+        if not self.args.zones:
+            return
+        
+        # Edições no arquivo são preparadas em segundo plano e aplicadas entre frames
+        if self.args.zones_reload > 0:
+            self._zone_watcher = ZoneConfigWatcher(
+                self.args.zones, frame_w, frame_h,
+                pad=self.args.zones_pad,
+                imgsz=self.args.imgsz,
+                interval=self.args.zones_reload,
+            )
+        
+        try:
+            layout = build_zone_layout(self.args.zones, frame_w, frame_h, self.args.zones_pad, self.args.imgsz)
+        except Exception as e:
+            print(f"Aviso: falha ao ler zonas de {self.args.zones}: {e}. Usando o frame inteiro.")
+            return
+        self._apply_zone_layout(layout)
+    
+    def _apply_zone_layout(
+        self,
+        layout: ZoneLayout,
+        db_logger: Optional[OracleLogger] = None,
+        json_logger: Optional[JsonLogger] = None
+    ) -> None:
+        """Troca a configuração de zonas (carga inicial ou recarga entre dois frames)
+        
+        Acumulados de ocupação e visitas em andamento continuam nas zonas que mantêm o
+        mesmo id; visitas a zonas removidas são encerradas e registradas.
+        """
+        if layout.occupancy is not None and self.zone_occupancy is not None:
+            layout.occupancy.carry_over(self.zone_occupancy)
+        
+        if self.zone_visits is not None:
+            closed = self.zone_visits.set_zones(layout.zones)
+            if closed:
+                self._log_zone_visits(closed, db_logger, json_logger)
+            if not layout.zones:
+                self.zone_visits = None
+        elif layout.zones:
+            self.zone_visits = ZoneVisitTracker(
+                layout.zones,
+                debounce=self.args.zone_debounce,
+                exit_after=self.args.zone_exit_after or self.args.reassoc_window,
+            )
+        
+        self.zones = layout.zones
+        self.zone_occupancy = layout.occupancy
+        # A inferência pode estar em outra thread: imgsz antes, lista de regiões por último
+        self._roi_imgsz = layout.roi_imgsz
+        self._rois = layout.rois
+        
+        if layout.rois:
+            frame_w, frame_h = layout.frame_size
+            roi_area = sum((x2 - x1) * (y2 - y1) for (x1, y1, x2, y2) in layout.rois)
+            print(
+                f"Inferência restrita a {len(layout.rois)} região(ões) das zonas "
+                f"({100.0 * roi_area / (frame_w * frame_h):.0f}% do frame, imgsz={layout.roi_imgsz})"
+            )
+    
+    @staticmethod
+    def _tracked_centers(
+        detections: sv.Detections, det_canonical_ids: List[Optional[int]]
+    ) -> Tuple[List[int], np.ndarray]:
+        """IDs canônicos e centros das detecções com ID (as mesmas contadas como motos ativas)"""
+        keep: List[int] = []
+        seen: Set[int] = set()
+        for i, cid in enumerate(det_canonical_ids[:len(detections)]):
+            if cid is not None and cid not in seen:
+                seen.add(cid)
+                keep.append(i)
+        if not keep:
+            return [], np.zeros((0, 2), dtype=np.float64)
+        return [int(det_canonical_ids[i]) for i in keep], compute_centers(detections.xyxy[keep])
+    
+    def _update_zones(
+        self,
+        detections: sv.Detections,
+        det_canonical_ids: List[Optional[int]],
+        db_logger: Optional[OracleLogger],
+        json_logger: Optional[JsonLogger],
+        media_msec: Optional[float]
+    ) -> None:
+        """Atualiza ocupação e visitas das zonas; grava a ocupação a cada --zones-json-every segundos"""
+        canonical_ids, centers = self._tracked_centers(detections, det_canonical_ids)
+        zone_idx = self.zone_occupancy.locate(centers)
+        self.zone_occupancy.accumulate(zone_idx)
+        self._zones_media_msec = media_msec
         
-        if not cap or not cap.isOpened():
-            raise RuntimeError(f"Não foi possível abrir a fonte: {source}")
+        if self.zone_visits is not None:
+            closed = self.zone_visits.update(
+                canonical_ids, zone_idx, self.tracker.frame_count, self._event_time(media_msec)
+            )
+            if closed:
+                self._log_zone_visits(closed, db_logger, json_logger)
         
-        return cap
+        if json_logger is None or self.args.zones_json_every <= 0:
+            return
+        now = time.time()
+        if now - self._zones_json_last >= self.args.zones_json_every:
+            json_logger.update_zones(self.zone_occupancy.summary(), self._event_time(media_msec))
+            self._zones_json_last = now
     
-    def _setup_video_writer(self, cap: cv2.VideoCapture, frame_w: int, frame_h: int) -> Optional[cv2.VideoWriter]:
-        """Configura o writer de vídeo se necessário"""
+    def _log_zone_visits(
+        self,
+        visits: List[Dict[str, Any]],
+        db_logger: Optional[OracleLogger],
+        json_logger: Optional[JsonLogger]
+    ) -> None:
+        """Registra visitas encerradas às zonas no Oracle e no JSON"""
+        for visit in visits:
+            if db_logger is not None:
+                db_logger.insert_visit(
+                    visit["track_id"], visit["zone"], visit["entered_at"], visit["exited_at"],
+                    visit["dwell_frames"], visit["dwell_seconds"]
+                )
+            if json_logger is not None:
+                json_logger.insert_visit(visit)
+    
+    @staticmethod
+    def _format_zone(zone_id: str, count: int, capacity: float) -> str:
+        """Texto 'zona: ocupação/capacidade (%)' de uma zona"""
+        if capacity > 0:
+            return f"{zone_id}: {count}/{capacity:.0f} ({100.0 * count / capacity:.0f}%)"
+        return f"{zone_id}: {count}"
+    
+    def _setup_video_writer(
+        self, cap: cv2.VideoCapture, frame_w: int, frame_h: int
+    ) -> Optional[Union[AsyncVideoWriter, OpenCVWriter, FfmpegWriter]]:
+        """Configura o writer de vídeo se necessário
+        
+        Por padrão a escrita roda em thread própria com fila limitada (--writer-queue);
+        arquivos esperam a fila esvaziar, fontes ao vivo descartam o frame.
+        """
         if not self.args.save:
             return None
             
         os.makedirs(os.path.dirname(self.args.output), exist_ok=True)
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
         fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-        return cv2.VideoWriter(self.args.output, fourcc, float(fps), (frame_w, frame_h))
+        writer = create_video_writer(
+            self.args.output,
+            float(fps),
+            (frame_w, frame_h),
+            backend=self.args.writer,
+            output_size=self._parse_output_size(self.args.output_size),
+            output_fps=self.args.output_fps,
+            codec=self.args.ffmpeg_codec,
+            preset=self.args.ffmpeg_preset,
+        )
+        if self.args.writer_queue <= 0:
+            return writer
+        return AsyncVideoWriter(writer, queue_size=self.args.writer_queue, block=not self._live)
+    
+    @staticmethod
+    def _parse_output_size(value: str) -> Optional[Tuple[int, int]]:
+        """Converte 'LxA' (ex.: 1280x720) em (largura, altura)"""
+        if not value:
+            return None
+        try:
+            w_txt, h_txt = value.lower().split("x")
+            return int(w_txt), int(h_txt)
+        except Exception:
+            print(f"Aviso: --output-size inválido ({value}); usando o tamanho do frame.")
+            return None
+    
+    def _setup_media_clock(self, source: Union[str, int], cap: cv2.VideoCapture) -> Optional[MediaClock]:
+        """Relógio de mídia para arquivos com --recording-start"""
+        if not self.args.recording_start:
+            return None
+        if isinstance(source, int):
+            print("Aviso: --recording-start só vale para arquivos; usando o relógio do sistema.")
+            return None
+        return create_media_clock(
+            self.args.recording_start,
+            str(source),
+            int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            cap.get(cv2.CAP_PROP_FPS) or 0.0,
+        )
+    
+    def _event_time(self, media_msec: Optional[float]) -> datetime:
+        """Horário de um evento: pela posição no arquivo no modo offline, senão agora"""
+        if self._media_clock is not None and media_msec is not None:
+            return self._media_clock.at(media_msec)
+        return datetime.now()
+    
+    @staticmethod
+    def _source_desc(source: Union[str, int]) -> str:
+        """Nome curto da fonte, usado no JSON e no arquivo de checkpoint"""
+        if isinstance(source, int):
+            return f"webcam_{int(source)}"
+        return os.path.basename(str(source))
+    
+    def _setup_checkpoint(self, source: Union[str, int], cap: cv2.VideoCapture) -> Optional[TrackerCheckpointer]:
+        """Restaura o checkpoint da fonte, se houver, e cria o checkpointer
+        
+        Além do tracker, o checkpoint guarda o run_id, os IDs já registrados e, para
+        arquivos, a posição do próximo frame (`_start_index`). IDs registrados depois
+        do último checkpoint vêm do diário `.logged`, escrito a cada registro, para
+        que os frames reprocessados na retomada não gerem linhas duplicadas. O diário
+        separa os destinos: o Oracle é anotado logo após o INSERT e o --json-out só
+        depois que o JsonLogger grava a linha (na escrita em segundo plano, no grupo
+        seguinte), então a retomada refaz em cada destino só o que faltou nele.
+        """
+        if not self.args.checkpoint_dir:
+            return None
+        path = checkpoint_path(self.args.checkpoint_dir, self._source_desc(source))
+        is_file = not isinstance(source, int)
+        source_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if is_file else 0
+        
+        state = load_checkpoint(path)
+        if state is not None and is_file and bool(state.get("finished", False)):
+            print(f"Checkpoint {path} é de um processamento concluído; processando do início.")
+            state = None
+        if state is not None and int(state.get("source_frames", source_frames)) != source_frames:
+            print(f"Aviso: checkpoint {path} ignorado (arquivo com outro número de frames); iniciando do zero.")
+            state = None
+        
+        resumed = False
+        if state is not None:
+            try:
+                self.tracker.restore(state)
+                resumed = True
+            except (KeyError, ValueError) as e:
+                print(f"Aviso: checkpoint {path} ignorado ({e}); iniciando do zero.")
+        
+        journal_path = path + ".logged"
+        if resumed:
+            self._durable_logged = self._read_logged_journal(journal_path)
+            legacy = state["logged_ids"].tolist() if "logged_ids" in state else []
+            for sink, logged in self._durable_logged.items():
+                key = f"logged_{sink}_ids"
+                logged.update(state[key].tolist() if key in state else legacy)
+            if not self.args.run_id and "run_id" in state:
+                self._run_id = str(state["run_id"])
+            if is_file and "position" in state:
+                self._start_index = int(state["position"])
+            print(
+                f"Tracker restaurado de {path}: {self.tracker.get_unique_count()} motos únicas, "
+                f"{self.tracker.get_state_size()['canonical_ids']} IDs em memória"
+                + (f", retomando no frame {self._start_index}" if self._start_index else "")
+            )
+        self._frame_offset = self._start_index - self.tracker.frame_count
+        
+        try:
+            os.makedirs(self.args.checkpoint_dir, exist_ok=True)
+            self._logged_journal = open(journal_path, "a" if resumed else "w", encoding="utf-8")
+        except Exception as e:
+            print(f"Aviso: não foi possível abrir o diário de registros {journal_path}: {e}")
+            self._logged_journal = None
+        
+        return TrackerCheckpointer(
+            path,
+            every_frames=self.args.checkpoint_every,
+            every_seconds=self.args.checkpoint_seconds,
+            extra=lambda: self._resume_state(source_frames),
+        )
+    
+    def _resume_state(self, source_frames: int) -> Dict[str, np.ndarray]:
+        """Estado da execução gravado junto com o tracker para permitir a retomada"""
+        state = {
+            "position": np.int64(self._frame_offset + self.tracker.frame_count),
+            "source_frames": np.int64(source_frames),
+            "finished": np.bool_(self._finished),
+            "run_id": np.array(self._run_id),
+        }
+        with self._journal_lock:
+            for sink, logged in self._durable_logged.items():
+                state[f"logged_{sink}_ids"] = np.fromiter(logged, dtype=np.int64, count=len(logged))
+        return state
+    
+    def _restore_logged(
+        self,
+        canonical_logged_db: Set[int],
+        db_logger: Optional[OracleLogger],
+        json_logger: Optional[JsonLogger]
+    ) -> None:
+        """Marca como registrados os IDs já gravados em todos os destinos ativos
+        
+        IDs confirmados no tracker restaurado que faltam em algum destino (ex.: a
+        linha do JSON ainda estava na fila na queda) são registrados de novo, só
+        nesse destino, quando voltarem a aparecer.
+        """
+        sinks = [sink for sink, logger in (("db", db_logger), ("json", json_logger)) if logger is not None]
+        if not sinks:
+            return
+        done = set.intersection(*(self._durable_logged[sink] for sink in sinks))
+        canonical_logged_db.update(done)
+        store = self.tracker.store
+        confirmed = store.canonical_id[store.alive & store.confirmed].tolist()
+        self._resume_unlogged = set(confirmed) - done
+    
+    @staticmethod
+    def _read_logged_journal(path: str) -> Dict[str, Set[int]]:
+        """IDs do diário de registros por destino (linhas incompletas de uma queda são ignoradas)
+        
+        Cada linha é "<destino> <id>"; linhas só com o ID (formato antigo) valem
+        para todos os destinos.
+        """
+        logged: Dict[str, Set[int]] = {"db": set(), "json": set()}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    parts = line.split()
+                    try:
+                        if len(parts) == 1:
+                            for ids in logged.values():
+                                ids.add(int(parts[0]))
+                        elif len(parts) == 2 and parts[0] in logged:
+                            logged[parts[0]].add(int(parts[1]))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return logged
+    
+    def _journal_logged(self, canonical_ids: Iterable[int], sink: str) -> None:
+        """Anota no diário IDs já gravados em `sink` (chamado também pela thread do JsonLogger)"""
+        with self._journal_lock:
+            canonical_ids = [int(cid) for cid in canonical_ids]
+            self._durable_logged[sink].update(canonical_ids)
+            if self._logged_journal is None:
+                return
+            try:
+                self._logged_journal.write("".join(f"{sink} {cid}\n" for cid in canonical_ids))
+                self._logged_journal.flush()
+            except Exception:
+                pass
+    
+    def _log_moto(
+        self,
+        canonical_id: int,
+        cx: float,
+        cy: float,
+        detected_at: datetime,
+        db_logger: Optional[OracleLogger],
+        json_logger: Optional[JsonLogger]
+    ) -> None:
+        """Registra uma moto nos destinos que ainda não a têm (na retomada, um pode já ter)"""
+        db_id = None
+        if db_logger is not None and canonical_id not in self._durable_logged["db"]:
+            db_id = db_logger.insert_moto(canonical_id, cx, cy, detected_at)
+            self._journal_logged([canonical_id], "db")
+        if json_logger is not None and canonical_id not in self._durable_logged["json"]:
+            json_logger.insert_moto(canonical_id, cx, cy, detected_at, db_id=db_id)
+        self._resume_unlogged.discard(canonical_id)
     
     def _setup_json_logger(self, source: Union[str, int]) -> Optional[JsonLogger]:
         """Configura o logger JSON"""
         try:
             if self.args.json_out:
-                if isinstance(source, int):
-                    src_desc = f"webcam_{int(source)}"
-                else:
-                    src_desc = os.path.basename(str(source))
-                run_id = self.args.run_id or str(uuid.uuid4())
-                return JsonLogger(self.args.json_out, source_desc=src_desc, run_id=run_id)
+                json_logger = create_json_logger(
+                    self.args, self.args.json_out, source_desc=self._source_desc(source), run_id=self._run_id
+                )
+                json_logger.on_commit = lambda ids: self._journal_logged(ids, "json")
+                return json_logger
         except Exception:
             return None
         return None
@@ -226,6 +968,34 @@ class VideoProcessor:
             annotated = self.label_annotator.annotate(scene=annotated, detections=detections, labels=labels)
         return annotated
     
+    def _draw_zones(
+        self, frame: np.ndarray, detections: sv.Detections, det_canonical_ids: List[Optional[int]]
+    ) -> np.ndarray:
+        """Desenha o contorno das zonas com a ocupação do frame exibido"""
+        occupancy = self.zone_occupancy
+        counts = occupancy.count(self._tracked_centers(detections, det_canonical_ids)[1])
+        for i, zone in enumerate(occupancy.zones):
+            pts = np.asarray(zone["points"], dtype=np.int32).reshape(-1, 2)
+            if len(pts) < 3:
+                continue
+            # Cor da zona vem em RGB; acima da capacidade o contorno fica vermelho
+            color = tuple(reversed(zone["color"])) if zone["color"] else (255, 255, 0)
+            if occupancy.capacity[i] > 0 and counts[i] > occupancy.capacity[i]:
+                color = (0, 0, 255)
+            cv2.polylines(frame, [pts.reshape(-1, 1, 2)], True, color, 2, cv2.LINE_AA)
+            x, y = int(pts[:, 0].min()) + 6, int(pts[:, 1].min()) + 24
+            cv2.putText(
+                frame,
+                self._format_zone(zone["id"], int(counts[i]), occupancy.capacity[i]),
+                (x, y),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.6,
+                color,
+                2,
+                cv2.LINE_AA,
+            )
+        return frame
+    
     def _add_hud(self, frame: np.ndarray, det_canonical_ids: List[Optional[int]], elapsed: float) -> np.ndarray:
         """Adiciona HUD com estatísticas"""
         fps_inst = 1.0 / max(elapsed, 1e-6)
@@ -236,6 +1006,13 @@ class VideoProcessor:
             f"Motos ativas: {active_tracked} | Únicas conf.: {unique_total} | "
             f"FPS: {fps_inst:.1f} | conf>={self.args.conf:.2f} iou={self.args.iou:.2f}"
         )
+        if self.motion_gate is not None:
+            hud_text += f" | Pulados: {100.0 * self._motion_skip_ratio():.0f}%"
+        if self._live_capture is not None:
+            hud_text += (
+                f" | Latência: {1000.0 * self._last_latency:.0f} ms"
+                f" | Descartados: {self._live_capture.dropped}"
+            )
         
         cv2.putText(
             frame,
@@ -249,13 +1026,51 @@ class VideoProcessor:
         )
         return frame
     
+    def _report_progress(self, det_canonical_ids: List[Optional[int]]) -> None:
+        """Imprime um resumo periódico em texto no lugar do HUD (modo headless)"""
+        self._progress_frames += 1
+        now = time.time()
+        interval = now - self._progress_last
+        if interval < self.args.summary_interval:
+            return
+        
+        fps = self._progress_frames / max(interval, 1e-6)
+        active_tracked = self.tracker.get_active_count(det_canonical_ids) if self.tracker else 0
+        unique_total = self.tracker.get_unique_count() if self.tracker else 0
+        frame_count = self.tracker.frame_count if self.tracker else 0
+        
+        summary = (
+            f"[frame {frame_count}] Motos ativas: {active_tracked} | "
+            f"Únicas conf.: {unique_total} | FPS: {fps:.1f}"
+        )
+        if self.tracker is not None:
+            summary += f" | IDs em memória: {self.tracker.get_state_size()['canonical_ids']}"
+        if self.zone_occupancy is not None:
+            occupancy = self.zone_occupancy
+            summary += " | " + ", ".join(
+                self._format_zone(zone["id"], int(occupancy.counts[i]), occupancy.capacity[i])
+                for i, zone in enumerate(occupancy.zones)
+            )
+        if self.motion_gate is not None:
+            summary += f" | Pulados: {100.0 * self._motion_skip_ratio():.0f}%"
+        if self._live_capture is not None:
+            summary += (
+                f" | Latência: {1000.0 * self._last_latency:.0f} ms"
+                f" | Descartados: {self._live_capture.dropped}"
+            )
+        print(summary, flush=True)
+        
+        self._progress_last = now
+        self._progress_frames = 0
+    
     def _log_newly_confirmed_motorcycles(
         self,
         detections: sv.Detections,
         det_canonical_ids: List[Optional[int]],
         db_logger: Optional[OracleLogger],
         json_logger: Optional[JsonLogger],
-        canonical_logged_db: set
+        canonical_logged_db: set,
+        media_msec: Optional[float] = None
     ) -> None:
         """Registra motocicletas recém-confirmadas"""
         if not (len(detections) > 0 and detections.tracker_id is not None):
@@ -263,22 +1078,19 @@ class VideoProcessor:
             
         try:
             centers = compute_centers(detections.xyxy)
-            now = datetime.now()
+            now = self._event_time(media_msec)
             logged_canons = set()
             
             for i in range(len(detections)):
                 cid = det_canonical_ids[i]
-                if cid is None or cid in logged_canons:
+                # IDs restaurados de um checkpoint já foram registrados antes da retomada
+                if cid is None or cid in logged_canons or cid in canonical_logged_db:
                     continue
                 
-                # Só loga quando é recém-confirmado
-                if self.tracker and self.tracker.is_newly_confirmed(cid):
+                # Só loga quando é recém-confirmado (ou confirmado antes de uma queda sem registro)
+                if self.tracker and (self.tracker.is_newly_confirmed(cid) or cid in self._resume_unlogged):
                     cx, cy = centers[i]
-                    db_id = None
-                    if db_logger is not None:
-                        db_id = db_logger.insert_moto(int(cid), float(cx), float(cy), now)
-                    if json_logger is not None:
-                        json_logger.insert_moto(int(cid), float(cx), float(cy), now, db_id=db_id)
+                    self._log_moto(int(cid), float(cx), float(cy), now, db_logger, json_logger)
                     print(f"TRACK #{int(cid)}: x={cx:.2f}, y={cy:.2f}, time={now}")
                     logged_canons.add(int(cid))
                     canonical_logged_db.add(int(cid))
@@ -320,7 +1132,8 @@ class VideoProcessor:
         det_canonical_ids: List[Optional[int]],
         db_logger: Optional[OracleLogger],
         json_logger: Optional[JsonLogger],
-        canonical_logged_db: set
+        canonical_logged_db: set,
+        media_msec: Optional[float] = None
     ) -> None:
         """Salva snapshot final das detecções"""
         if not ((db_logger is not None or json_logger is not None) and 
@@ -329,7 +1142,7 @@ class VideoProcessor:
             
         try:
             centers = compute_centers(detections.xyxy)
-            now = datetime.now()
+            now = self._event_time(media_msec)
             newly_logged = set()
             
             for i in range(len(detections)):
@@ -340,11 +1153,7 @@ class VideoProcessor:
                     continue
                     
                 cx, cy = centers[i]
-                db_id = None
-                if db_logger is not None:
-                    db_id = db_logger.insert_moto(int(cid), float(cx), float(cy), now)
-                if json_logger is not None:
-                    json_logger.insert_moto(int(cid), float(cx), float(cy), now, db_id=db_id)
+                self._log_moto(int(cid), float(cx), float(cy), now, db_logger, json_logger)
                 newly_logged.add(int(cid))
                 canonical_logged_db.add(int(cid))
                 
@@ -355,7 +1164,7 @@ class VideoProcessor:
     def _cleanup_resources(
         self, 
         cap: cv2.VideoCapture, 
-        writer: Optional[cv2.VideoWriter], 
+        writer: Optional[Union[AsyncVideoWriter, OpenCVWriter, FfmpegWriter]], 
         window_name: str
     ) -> None:
         """Limpa recursos utilizados"""
@@ -368,6 +1177,77 @@ class VideoProcessor:
             except Exception:
                 cv2.destroyAllWindows()
     
+    def _print_run_stats(self) -> None:
+        """Mostra quantos frames passaram pelo detector"""
+        frames = self.stats["frames"]
+        if frames <= 0:
+            return
+        detected = self.stats["detected_frames"]
+        print(
+            f"Frames processados: {frames} | Inferências: {detected} "
+            f"({100.0 * detected / frames:.1f}% dos frames)"
+        )
+        if self.motion_gate is not None:
+            print(
+                f"Gate de movimento: {self.stats['motion_skipped']} inferências puladas "
+                f"({100.0 * self._motion_skip_ratio():.1f}% dos keyframes)"
+            )
+    
+        if self._live_capture is not None:
+            avg_latency = self.stats["latency_sum"] / frames
+            print(
+                f"Captura ao vivo: {self._live_capture.captured} frames capturados, "
+                f"{self._live_capture.dropped} descartados | Latência captura->detecção: "
+                f"média {1000.0 * avg_latency:.0f} ms, máx {1000.0 * self.stats['latency_max']:.0f} ms"
+            )
+    
+        if self.tracker is not None:
+            state = self.tracker.get_state_size()
+            print(
+                f"Estado do tracker: {state['canonical_ids']} IDs canônicos e "
+                f"{state['tracks']} tracks em memória | {state['evicted']} IDs removidos"
+            )
+    
+        if self.zone_occupancy is not None:
+            for item in self.zone_occupancy.summary():
+                line = f"Zona {item['id']}: média {item['mean_count']:.1f} motos, máx {item['max_count']}"
+                if item["capacity"] is not None:
+                    line += (
+                        f"/{item['capacity']} ({100.0 * item['peak_utilization']:.0f}%) | "
+                        f"{item['frames_over_capacity']} frames acima da capacidade"
+                    )
+                print(line)
+        if self.zone_visits is not None:
+            print(f"Visitas às zonas: {self.zone_visits.closed} registradas")
+        if self._zone_watcher is not None and self._zone_watcher.reloads:
+            print(f"Zonas recarregadas {self._zone_watcher.reloads} vez(es) de {self._zone_watcher.path}")
+    
+        if self._checkpointer is not None:
+            print(
+                f"Checkpoints do tracker: {self._checkpointer.saved} gravados em {self._checkpointer.path}"
+                + (f" | {self._checkpointer.failed} com erro" if self._checkpointer.failed else "")
+            )
+    
+        if isinstance(self._writer, AsyncVideoWriter):
+            print(
+                f"Gravação: {self._writer.written} frames escritos | "
+                f"{self._writer.late} atrasados (fila cheia) | {self._writer.dropped} descartados"
+                + (f" | {self._writer.failed} com erro" if self._writer.failed else "")
+            )
+    
+    def _record_latency(self, latency: float) -> None:
+        """Acumula a latência entre captura e detecção de um frame"""
+        self._last_latency = latency
+        self.stats["latency_sum"] += latency
+        if latency > self.stats["latency_max"]:
+            self.stats["latency_max"] = latency
+    
+    def _motion_skip_ratio(self) -> float:
+        """Fração dos keyframes em que o gate de movimento pulou a inferência"""
+        skipped = self.stats["motion_skipped"]
+        total = skipped + self.stats["detected_frames"]
+        return skipped / total if total > 0 else 0.0
+    
     def _show_final_popup(self, final_total: int) -> None:
         """Mostra popup final no Windows"""
         try:
@@ -0,0 +1,342 @@
+"""Processamento paralelo de um vídeo longo em segmentos com costura de IDs"""
+
+import argparse
+import math
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    from ..detection import MotorcycleTracker
+    from ..logging import JsonLogger, OracleLogger, create_json_logger
+    from ..utils.geometry import compute_centers, pairwise_center_distance_xyxy, pairwise_iou_xyxy
+    from ..utils.media_clock import MediaClock, create_media_clock
+    from .batch_runner import init_worker, resolve_workers, worker_detector
+    from .video_processor import open_video_capture
+except ImportError:
+    # Fallback para imports absolutos
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+    from src.detection import MotorcycleTracker
+    from src.logging import JsonLogger, OracleLogger, create_json_logger
+    from src.utils.geometry import compute_centers, pairwise_center_distance_xyxy, pairwise_iou_xyxy
+    from src.utils.media_clock import MediaClock, create_media_clock
+    from src.processing.batch_runner import init_worker, resolve_workers, worker_detector
+    from src.processing.video_processor import open_video_capture
+
+
+def plan_segments(total_frames: int, segments: int, overlap: int) -> List[Tuple[int, int, int]]:
+    """Divide [0, total_frames) em segmentos (início, fim, início da leitura com sobreposição)"""
+    segments = max(1, min(segments, total_frames))
+    length = int(math.ceil(total_frames / float(segments)))
+    plan = []
+    for start in range(0, total_frames, length):
+        end = min(total_frames, start + length)
+        plan.append((start, end, max(0, start - overlap)))
+    return plan
+
+
+def _create_tracker(args: argparse.Namespace, frame_w: int, frame_h: int) -> MotorcycleTracker:
+    return MotorcycleTracker(
+        track_thresh=args.track_thresh,
+        match_thresh=args.match_thresh,
+        track_buffer=args.track_buffer,
+        min_track_frames=args.min_track_frames,
+        reassoc_window=args.reassoc_window,
+        reassoc_iou=args.reassoc_iou,
+        reassoc_dist_frac=args.reassoc_dist_frac,
+        frame_width=frame_w,
+        frame_height=frame_h,
+        backend=args.tracker_backend
+    )
+
+
+def _process_segment(args: argparse.Namespace, path: str, index: int, start: int, end: int, read_start: int) -> Dict[str, Any]:
+    """Roda detector e um MotorcycleTracker próprio sobre [read_start, end) de um vídeo
+
+    Retorna, por ID canônico do segmento, a primeira e a última observação, se foi
+    confirmado e onde, além do histórico de caixas do fim do segmento usado na costura.
+    """
+    detector = worker_detector()
+    cap = open_video_capture(path, backend=args.backend)
+    if not cap.isOpened():
+        raise RuntimeError(f"Não foi possível abrir o vídeo: {path}")
+    if read_start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, read_start)
+        actual = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if actual != read_start:
+            print(f"Aviso: segmento {index + 1} posicionado no frame {actual} em vez de {read_start}")
+
+    frame_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 1920
+    frame_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 1080
+    tracker = _create_tracker(args, frame_w, frame_h)
+    history_from = end - args.segment_overlap - args.reassoc_window
+    batch_size = max(1, args.batch_size)
+
+    tracks: Dict[int, Dict[str, Any]] = {}
+    history: Dict[int, List[Tuple[int, List[float]]]] = {}
+    frame_idx = read_start
+    start_time = time.time()
+    try:
+        while frame_idx < end:
+            frames = []
+            msecs = []
+            while len(frames) < batch_size and frame_idx + len(frames) < end:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frames.append(frame)
+                # Posição no arquivo para o horário dos eventos no modo offline
+                msecs.append(cap.get(cv2.CAP_PROP_POS_MSEC) if args.recording_start else None)
+            if not frames:
+                break
+
+            if len(frames) == 1:
+                detections_list = [detector.detect(
+                    image=frames[0], conf=args.conf, iou=args.iou, imgsz=args.imgsz,
+                    half=args.half, augment=args.tta
+                )]
+            else:
+                detections_list = detector.detect_batch(
+                    frames, conf=args.conf, iou=args.iou, imgsz=args.imgsz,
+                    half=args.half, augment=args.tta
+                )
+
+            for detections, media_msec in zip(detections_list, msecs):
+                detections, det_canonical_ids = tracker.update(detections)
+                centers = compute_centers(detections.xyxy) if len(detections) > 0 else []
+                for i, cid in enumerate(det_canonical_ids):
+                    if cid is None:
+                        continue
+                    cid = int(cid)
+                    bbox = [float(v) for v in detections.xyxy[i]]
+                    track = tracks.setdefault(cid, {
+                        "first_frame": frame_idx, "first_bbox": bbox,
+                        "confirmed": False, "confirm_frame": None, "confirm_center": None,
+                        "confirm_msec": None,
+                    })
+                    track["last_frame"] = frame_idx
+                    track["last_bbox"] = bbox
+                    if tracker.is_newly_confirmed(cid):
+                        track["confirmed"] = True
+                        track["confirm_frame"] = frame_idx
+                        track["confirm_center"] = [float(centers[i][0]), float(centers[i][1])]
+                        track["confirm_msec"] = media_msec
+                    if frame_idx >= history_from:
+                        history.setdefault(cid, []).append((frame_idx, bbox))
+                frame_idx += 1
+    finally:
+        cap.release()
+
+    return {
+        "index": index,
+        "start": start,
+        "end": end,
+        "read_start": read_start,
+        "frames": frame_idx - read_start,
+        "elapsed": time.time() - start_time,
+        "frame_size": (frame_w, frame_h),
+        "tracks": tracks,
+        "history": history,
+    }
+
+
+class _UnionFind:
+    """Conjuntos disjuntos de (segmento, ID canônico) ligados pela costura"""
+
+    def __init__(self) -> None:
+        self.parent: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+    def find(self, key: Tuple[int, int]) -> Tuple[int, int]:
+        self.parent.setdefault(key, key)
+        while self.parent[key] != key:
+            self.parent[key] = self.parent[self.parent[key]]
+            key = self.parent[key]
+        return key
+
+    def union(self, a: Tuple[int, int], b: Tuple[int, int]) -> None:
+        self.parent[self.find(b)] = self.find(a)
+
+
+def stitch_segments(results: List[Dict[str, Any]], tracker: MotorcycleTracker) -> Tuple[List[List[Tuple[int, int]]], int]:
+    """Une os IDs canônicos de segmentos vizinhos com a regra de reassociação do tracker
+
+    Cada ID do segmento seguinte que surge até `reassoc_window` frames após a fronteira
+    (inclusive na sobreposição, onde ambos os segmentos viram os mesmos frames) é
+    comparado com a última caixa dos IDs do segmento anterior vistos até
+    `reassoc_window` frames antes dele, com o mesmo critério de IoU/distância de
+    `MotorcycleTracker.update`.
+
+    Returns:
+        Tuple de (grupos de (segmento, ID) que são a mesma moto, IDs confirmados
+        vistos na sobreposição que não puderam ser costurados)
+    """
+    results = sorted(results, key=lambda r: r["index"])
+    uf = _UnionFind()
+    unmatched = 0
+    for prev, nxt in zip(results, results[1:]):
+        boundary = nxt["start"]
+        used = set()
+        candidates = sorted(nxt["tracks"].items(), key=lambda item: item[1]["first_frame"])
+        for cid_b, track_b in candidates:
+            first_frame = track_b["first_frame"]
+            if first_frame > boundary + tracker.reassoc_window:
+                continue
+            bbox_b = np.asarray(track_b["first_bbox"], dtype=float)
+
+            ref_cids: List[int] = []
+            ref_boxes: List[List[float]] = []
+            for cid_a, observations in prev["history"].items():
+                if cid_a in used:
+                    continue
+                # Última observação do segmento anterior até o primeiro frame do ID
+                ref = None
+                for frame, bbox in observations:
+                    if frame > first_frame:
+                        break
+                    ref = (frame, bbox)
+                if ref is None or first_frame - ref[0] > tracker.reassoc_window:
+                    continue
+                ref_cids.append(cid_a)
+                ref_boxes.append(ref[1])
+
+            best_cid: Optional[int] = None
+            best_iou = -1.0
+            best_dist = 1e12
+            if ref_cids:
+                ious = pairwise_iou_xyxy(bbox_b[None, :], np.asarray(ref_boxes))[0]
+                dists = pairwise_center_distance_xyxy(bbox_b[None, :], np.asarray(ref_boxes))[0]
+                # Maior IoU, desempatando pela menor distância
+                best = int(np.lexsort((dists, -ious))[0])
+                best_cid, best_iou, best_dist = ref_cids[best], float(ious[best]), float(dists[best])
+
+            if best_cid is not None and tracker.accepts_reassociation(best_iou, best_dist):
+                used.add(best_cid)
+                uf.union((prev["index"], best_cid), (nxt["index"], cid_b))
+            elif track_b["confirmed"] and first_frame < boundary:
+                unmatched += 1
+
+    groups: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    for result in results:
+        for cid in result["tracks"]:
+            key = (result["index"], cid)
+            groups.setdefault(uf.find(key), []).append(key)
+    return list(groups.values()), unmatched
+
+
+def process_video_sharded(
+    args: argparse.Namespace,
+    path: str,
+    segments: int,
+    db_logger: Optional[OracleLogger] = None,
+) -> int:
+    """Processa um vídeo em segmentos paralelos e costura os IDs entre as fronteiras
+
+    Cada segmento começa `--segment-overlap` frames antes do seu início para aquecer
+    o tracker; a contagem final é a de grupos costurados com ao menos um ID
+    confirmado. A tolerância reportada é o número de IDs confirmados na sobreposição
+    sem par no segmento anterior, que podem divergir de uma execução sequencial.
+    """
+    cap = open_video_capture(path, backend=args.backend)
+    if not cap.isOpened():
+        raise RuntimeError(f"Não foi possível abrir o vídeo: {path}")
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frame_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 1920
+    frame_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 1080
+    media_clock = create_media_clock(args.recording_start, path, total_frames, cap.get(cv2.CAP_PROP_FPS) or 0.0)
+    cap.release()
+    if total_frames <= 0:
+        raise RuntimeError("Não foi possível obter o número de frames do vídeo para segmentá-lo.")
+    if args.max_frames:
+        total_frames = min(total_frames, args.max_frames)
+
+    plan = plan_segments(total_frames, segments, args.segment_overlap)
+    workers, num_threads = resolve_workers(args, args.workers or len(plan), len(plan))
+    print(
+        f"Processando {total_frames} frames em {len(plan)} segmento(s) com "
+        f"{workers} worker(s), {num_threads} thread(s) cada, sobreposição de {args.segment_overlap} frames..."
+    )
+
+    results: List[Dict[str, Any]] = []
+    start_time = time.time()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(args, num_threads)
+    ) as pool:
+        futures = [
+            pool.submit(_process_segment, args, path, idx, start, end, read_start)
+            for idx, (start, end, read_start) in enumerate(plan)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            confirmed = sum(1 for t in result["tracks"].values() if t["confirmed"])
+            print(
+                f"[{len(results)}/{len(plan)}] frames {result['start']}-{result['end'] - 1}: "
+                f"{confirmed} confirmada(s) ({result['elapsed']:.1f}s)"
+            )
+
+    tracker = _create_tracker(args, frame_w, frame_h)
+    groups, unmatched = stitch_segments(results, tracker)
+    by_index = {r["index"]: r for r in results}
+
+    # Cada grupo com ao menos um ID confirmado é uma moto única
+    motos = []
+    for group in groups:
+        confirmed = [
+            by_index[idx]["tracks"][cid] for idx, cid in group if by_index[idx]["tracks"][cid]["confirmed"]
+        ]
+        if confirmed:
+            motos.append(min(confirmed, key=lambda t: t["confirm_frame"]))
+    motos.sort(key=lambda t: t["confirm_frame"])
+
+    _log_stitched(args, path, motos, db_logger, media_clock)
+
+    stitched = sum(len(group) - 1 for group in groups)
+    print(f"Costura: {stitched} ID(s) unidos entre {len(plan) - 1} fronteira(s)")
+    print(f"Total de motos únicas vistas no vídeo: {len(motos)} (tolerância ±{unmatched} nas fronteiras)")
+    print(f"Segmentação concluída em {time.time() - start_time:.1f}s")
+    return len(motos)
+
+
+def _log_stitched(
+    args: argparse.Namespace,
+    path: str,
+    motos: List[Dict[str, Any]],
+    db_logger: Optional[OracleLogger],
+    media_clock: Optional[MediaClock] = None,
+) -> None:
+    """Registra cada moto costurada uma única vez, com o centro da confirmação
+
+    No modo offline (`media_clock`) o horário é o da confirmação no vídeo.
+    """
+    json_logger: Optional[JsonLogger] = None
+    try:
+        if args.json_out:
+            run_id = args.run_id or str(uuid.uuid4())
+            json_logger = create_json_logger(args, args.json_out, source_desc=os.path.basename(path), run_id=run_id)
+    except Exception:
+        json_logger = None
+    if db_logger is None and json_logger is None:
+        return
+    now = datetime.now()
+    for moto_id, track in enumerate(motos, start=1):
+        cx, cy = track["confirm_center"]
+        detected_at = now
+        if media_clock is not None and track.get("confirm_msec") is not None:
+            detected_at = media_clock.at(track["confirm_msec"])
+        try:
+            db_id = None
+            if db_logger is not None:
+                db_id = db_logger.insert_moto(moto_id, cx, cy, detected_at)
+            if json_logger is not None:
+                json_logger.insert_moto(moto_id, cx, cy, detected_at, db_id=db_id)
+        except Exception as e:
+            print(f"Aviso: falha ao registrar moto #{moto_id}: {e}")
+    if json_logger is not None:
+        json_logger.close()
@@ -0,0 +1,154 @@
+"""Escrita de vídeo anotado em thread própria, com backends OpenCV e ffmpeg"""
+
+import queue
+import shutil
+import subprocess
+import threading
+from typing import List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+
+class OpenCVWriter:
+    """Backend de escrita usando cv2.VideoWriter (mp4v)"""
+
+    def __init__(self, path: str, fps: float, frame_size: Tuple[int, int], output_size: Optional[Tuple[int, int]] = None) -> None:
+        self._output_size = output_size
+        size = output_size or frame_size
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        self._writer = cv2.VideoWriter(path, fourcc, float(fps), size)
+
+    def write(self, frame: np.ndarray) -> None:
+        if self._output_size is not None:
+            frame = cv2.resize(frame, self._output_size, interpolation=cv2.INTER_AREA)
+        self._writer.write(frame)
+
+    def release(self) -> None:
+        self._writer.release()
+
+
+class FfmpegWriter:
+    """Backend de escrita que envia frames BGR crus para um processo ffmpeg local"""
+
+    def __init__(
+        self,
+        path: str,
+        fps: float,
+        frame_size: Tuple[int, int],
+        output_size: Optional[Tuple[int, int]] = None,
+        output_fps: float = 0.0,
+        codec: str = "libx264",
+        preset: str = "veryfast",
+        ffmpeg_bin: str = "ffmpeg",
+    ) -> None:
+        width, height = frame_size
+        cmd: List[str] = [
+            ffmpeg_bin, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24",
+            "-s", f"{width}x{height}", "-r", f"{float(fps):.3f}",
+            "-i", "-",
+        ]
+        if output_size is not None:
+            cmd += ["-vf", f"scale={output_size[0]}:{output_size[1]}"]
+        if output_fps and output_fps > 0:
+            cmd += ["-r", f"{float(output_fps):.3f}"]
+        cmd += ["-c:v", codec]
+        if preset:
+            cmd += ["-preset", preset]
+        cmd += ["-pix_fmt", "yuv420p", path]
+
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        self.failed = False
+
+    def write(self, frame: np.ndarray) -> None:
+        if self.failed or self._proc.stdin is None:
+            raise BrokenPipeError("processo ffmpeg encerrado")
+        try:
+            self._proc.stdin.write(np.ascontiguousarray(frame).tobytes())
+        except (BrokenPipeError, OSError):
+            self.failed = True
+            raise
+
+    def release(self) -> None:
+        try:
+            if self._proc.stdin is not None:
+                self._proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            self._proc.wait(timeout=30)
+        except Exception:
+            self._proc.kill()
+
+
+class AsyncVideoWriter:
+    """Escreve frames em uma thread de fundo a partir de uma fila limitada
+
+    Com `block=True` (arquivos) o chamador espera quando a fila enche e o frame é
+    contado como atrasado; com `block=False` (ao vivo) o frame é descartado e
+    contado. Os frames enfileirados não podem ser modificados depois de `write`.
+    """
+
+    def __init__(self, writer: Union[OpenCVWriter, FfmpegWriter], queue_size: int = 32, block: bool = True) -> None:
+        self._writer = writer
+        self._queue: "queue.Queue[Optional[np.ndarray]]" = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._block = block
+        self.written = 0
+        self.dropped = 0
+        self.late = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="geosense-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            try:
+                self._writer.write(frame)
+                self.written += 1
+            except Exception:
+                self.failed += 1
+
+    def write(self, frame: np.ndarray) -> None:
+        try:
+            self._queue.put_nowait(frame)
+            return
+        except queue.Full:
+            pass
+        if self._block:
+            self.late += 1
+            self._queue.put(frame)
+        else:
+            self.dropped += 1
+
+    def release(self) -> None:
+        """Esvazia a fila, encerra a thread e fecha o backend"""
+        self._queue.put(None)
+        self._thread.join()
+        self._writer.release()
+
+
+def create_video_writer(
+    path: str,
+    fps: float,
+    frame_size: Tuple[int, int],
+    backend: str = "opencv",
+    output_size: Optional[Tuple[int, int]] = None,
+    output_fps: float = 0.0,
+    codec: str = "libx264",
+    preset: str = "veryfast",
+) -> Union[OpenCVWriter, FfmpegWriter]:
+    """Cria o backend de escrita; sem ffmpeg no PATH, usa o OpenCV"""
+    if backend == "ffmpeg":
+        ffmpeg_bin = shutil.which("ffmpeg")
+        if ffmpeg_bin:
+            return FfmpegWriter(
+                path, fps, frame_size,
+                output_size=output_size, output_fps=output_fps,
+                codec=codec, preset=preset, ffmpeg_bin=ffmpeg_bin,
+            )
+        print("Aviso: ffmpeg não encontrado no PATH; usando o writer do OpenCV.")
+    return OpenCVWriter(path, fps, frame_size, output_size=output_size)
@@ -1,7 +1,20 @@
 """Módulo de utilitários para o GeoSense"""
 
-from .geometry import compute_centers, bbox_iou_xyxy, center_distance_xyxy
-from .zones import read_zones_config
+from .geometry import (
+    compute_centers,
+    bbox_iou_xyxy,
+    center_distance_xyxy,
+    pairwise_iou_xyxy,
+    pairwise_center_distance_xyxy,
+    paired_iou_xyxy,
+    paired_center_distance_xyxy,
+    points_in_boxes
+)
+from .zones import read_zones_config, zones_bounding_rois
+from .zone_occupancy import ZoneOccupancy, rasterize_zones
+from .zone_visits import ZoneVisitTracker
+from .zone_layout import ZoneConfigWatcher, ZoneLayout, build_zone_layout
+from .media_clock import MediaClock, create_media_clock, parse_recording_start
 from .io_utils import (
     is_webcam_source, 
     is_image_file, 
@@ -13,7 +26,22 @@ __all__ = [
     "compute_centers",
     "bbox_iou_xyxy", 
     "center_distance_xyxy",
+    "pairwise_iou_xyxy",
+    "pairwise_center_distance_xyxy",
+    "paired_iou_xyxy",
+    "paired_center_distance_xyxy",
+    "points_in_boxes",
     "read_zones_config",
+    "zones_bounding_rois",
+    "ZoneOccupancy",
+    "rasterize_zones",
+    "ZoneVisitTracker",
+    "ZoneConfigWatcher",
+    "ZoneLayout",
+    "build_zone_layout",
+    "MediaClock",
+    "create_media_clock",
+    "parse_recording_start",
     "is_webcam_source",
     "is_image_file",
     "gather_media_files", 
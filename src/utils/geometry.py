@@ -47,3 +47,96 @@ def center_distance_xyxy(a: np.ndarray, b: np.ndarray) -> float:
         return float(np.hypot(acx - bcx, acy - bcy))
     except Exception:
         return 1e9
+
+
+def _as_boxes(boxes: np.ndarray) -> np.ndarray:
+    """Caixas como array (N, 4) em float32/float64, sem copiar quando já estão assim"""
+    boxes = np.asarray(boxes)
+    if boxes.dtype != np.float32 and boxes.dtype != np.float64:
+        boxes = boxes.astype(np.float32)
+    return boxes.reshape(-1, 4)
+
+
+def _areas(boxes: np.ndarray) -> np.ndarray:
+    w = np.maximum(boxes[:, 2] - boxes[:, 0], 0)
+    h = np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+    w *= h
+    return w
+
+
+def pairwise_iou_xyxy(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Matriz (N, M) de IoU entre as caixas de `a` (N, 4) e `b` (M, 4) em formato [x1,y1,x2,y2]
+
+    Mantém o dtype de entrada (float32 para caixas do detector) e reutiliza dois
+    buffers (N, M) em vez de criar um temporário por operação.
+    """
+    a = _as_boxes(a)
+    b = _as_boxes(b)
+    shape = (len(a), len(b))
+    dtype = np.result_type(a, b)
+    inter = np.empty(shape, dtype=dtype)
+    buf = np.empty(shape, dtype=dtype)
+
+    np.minimum(a[:, None, 2], b[None, :, 2], out=inter)
+    np.maximum(a[:, None, 0], b[None, :, 0], out=buf)
+    inter -= buf
+    np.maximum(inter, 0, out=inter)
+    np.minimum(a[:, None, 3], b[None, :, 3], out=buf)
+    buf -= np.maximum(a[:, None, 1], b[None, :, 1])
+    np.maximum(buf, 0, out=buf)
+    inter *= buf
+
+    # buf passa a guardar a união
+    np.add(_areas(a)[:, None], _areas(b)[None, :], out=buf)
+    buf -= inter
+    np.divide(inter, buf, out=inter, where=buf > 0)
+    return inter
+
+
+def pairwise_center_distance_xyxy(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Matriz (N, M) de distâncias entre os centros das caixas de `a` e `b`"""
+    ca = compute_centers(_as_boxes(a))
+    cb = compute_centers(_as_boxes(b))
+    dx = np.subtract(ca[:, None, 0], cb[None, :, 0])
+    dy = np.subtract(ca[:, None, 1], cb[None, :, 1])
+    return np.hypot(dx, dy, out=dx)
+
+
+def paired_iou_xyxy(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU elemento a elemento entre as linhas de `a` e `b` (K, 4)"""
+    a = _as_boxes(a)
+    b = _as_boxes(b)
+    inter = np.minimum(a[:, 2], b[:, 2])
+    inter -= np.maximum(a[:, 0], b[:, 0])
+    np.maximum(inter, 0, out=inter)
+    h = np.minimum(a[:, 3], b[:, 3])
+    h -= np.maximum(a[:, 1], b[:, 1])
+    np.maximum(h, 0, out=h)
+    inter *= h
+
+    union = _areas(a) + _areas(b)
+    union -= inter
+    np.divide(inter, union, out=inter, where=union > 0)
+    return inter
+
+
+def paired_center_distance_xyxy(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distância elemento a elemento entre os centros das linhas de `a` e `b`"""
+    ca = compute_centers(_as_boxes(a))
+    cb = compute_centers(_as_boxes(b))
+    ca -= cb
+    return np.hypot(ca[:, 0], ca[:, 1])
+
+
+def points_in_boxes(points: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Máscara (P, B) indicando se cada ponto (x, y) está dentro (bordas inclusas) de cada caixa"""
+    points = np.asarray(points).reshape(-1, 2)
+    boxes = _as_boxes(boxes)
+    px = points[:, 0:1]
+    py = points[:, 1:2]
+    mask = np.greater_equal(px, boxes[None, :, 0])
+    buf = np.empty_like(mask)
+    mask &= np.less_equal(px, boxes[None, :, 2], out=buf)
+    mask &= np.greater_equal(py, boxes[None, :, 1], out=buf)
+    mask &= np.less_equal(py, boxes[None, :, 3], out=buf)
+    return mask
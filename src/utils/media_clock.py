@@ -0,0 +1,43 @@
+"""Horário dos eventos a partir da posição do frame no vídeo (modo offline)"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class MediaClock:
+    """Converte a posição de um frame no arquivo (ms, CAP_PROP_POS_MSEC) em horário real
+
+    O horário do evento passa a ser `início da gravação + posição no vídeo`, então
+    não depende da velocidade de processamento: arquivos podem ser processados mais
+    rápido que o tempo real, em paralelo ou pulando frames.
+    """
+
+    def __init__(self, recording_start: datetime) -> None:
+        self.recording_start = recording_start
+
+    def at(self, msec: float) -> datetime:
+        return self.recording_start + timedelta(milliseconds=max(0.0, float(msec)))
+
+
+def parse_recording_start(value: str, path: str, duration_sec: float) -> datetime:
+    """Início da gravação a partir de ISO 8601 ou de 'mtime' (modificação do arquivo - duração)
+
+    Raises:
+        ValueError: se o valor não é uma data ISO 8601 válida
+    """
+    if value.strip().lower() == "mtime":
+        return datetime.fromtimestamp(os.path.getmtime(path)) - timedelta(seconds=max(0.0, duration_sec))
+    return datetime.fromisoformat(value.strip())
+
+
+def create_media_clock(value: str, path: str, total_frames: int, fps: float) -> Optional[MediaClock]:
+    """MediaClock para um arquivo com --recording-start, ou None para usar o relógio do sistema"""
+    if not value:
+        return None
+    duration = total_frames / fps if fps > 0 and total_frames > 0 else 0.0
+    try:
+        return MediaClock(parse_recording_start(value, path, duration))
+    except (OSError, ValueError) as e:
+        print(f"Aviso: --recording-start inválido ({value}: {e}); usando o relógio do sistema.")
+        return None
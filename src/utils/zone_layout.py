@@ -0,0 +1,125 @@
+"""Configuração de zonas pronta para uso e recarga a quente do arquivo de zonas"""
+
+import os
+import threading
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+from .zones import read_zones_config, zones_bounding_rois
+from .zone_occupancy import ZoneOccupancy
+
+
+class ZoneLayout:
+    """Zonas de um arquivo já processadas para um tamanho de frame
+
+    Agrupa tudo o que é pré-calculado a partir do arquivo (polígonos em pixels,
+    imagem de rótulos e regiões de inferência), para ser trocado de uma vez.
+    """
+
+    def __init__(
+        self,
+        zones: List[Dict[str, Any]],
+        occupancy: Optional[ZoneOccupancy],
+        rois: List[Tuple[int, int, int, int]],
+        roi_imgsz: int,
+        frame_size: Tuple[int, int],
+    ) -> None:
+        self.zones = zones
+        self.occupancy = occupancy
+        self.rois = rois
+        self.roi_imgsz = roi_imgsz
+        self.frame_size = frame_size
+
+
+def build_zone_layout(path: str, frame_width: int, frame_height: int, pad: int, imgsz: int) -> ZoneLayout:
+    """
+    Lê o arquivo de zonas e pré-calcula rótulos e regiões de inferência
+
+    Raises:
+        Exception: se o arquivo não puder ser lido ou interpretado
+    """
+    zones = read_zones_config(path, frame_width, frame_height)
+    occupancy = ZoneOccupancy(zones, frame_width, frame_height) if zones else None
+    rois = zones_bounding_rois(zones, frame_width, frame_height, pad=pad)
+    roi_imgsz = imgsz
+    if rois:
+        # Mantém a resolução efetiva do frame inteiro: imgsz proporcional ao maior recorte
+        longest = max(max(x2 - x1, y2 - y1) for (x1, y1, x2, y2) in rois)
+        scale = longest / float(max(frame_width, frame_height))
+        roi_imgsz = max(32, int(np.ceil(imgsz * scale / 32.0)) * 32)
+    return ZoneLayout(zones, occupancy, rois, roi_imgsz, (frame_width, frame_height))
+
+
+class ZoneConfigWatcher:
+    """
+    Observa o arquivo de zonas e prepara a nova configuração fora do loop de frames
+
+    Uma thread de fundo compara o mtime (e o tamanho) do arquivo a cada `interval`
+    segundos; quando muda, relê as zonas e rasteriza os rótulos ali mesmo. O loop
+    de frames só chama `take()`, que custa uma leitura de atributo quando não há
+    nada novo, e aplica a configuração entre dois frames. Arquivos inválidos (ex.:
+    salvos pela metade) são ignorados e a configuração atual continua valendo.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        frame_width: int,
+        frame_height: int,
+        pad: int,
+        imgsz: int,
+        interval: float = 1.0,
+    ) -> None:
+        self.path = path
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.pad = pad
+        self.imgsz = imgsz
+        self.interval = max(0.05, float(interval))
+        self.reloads = 0
+        self._stamp = self._stat()
+        self._pending: Optional[ZoneLayout] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="geosense-zones-watch", daemon=True)
+        self._thread.start()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            stamp = self._stat()
+            if stamp is None or stamp == self._stamp:
+                continue
+            try:
+                layout = build_zone_layout(self.path, self.frame_width, self.frame_height, self.pad, self.imgsz)
+            except Exception as e:
+                print(f"Aviso: zonas de {self.path} não recarregadas: {e}. Mantendo a configuração atual.")
+                self._stamp = stamp
+                continue
+            # Arquivo mudou de novo durante a leitura: relê na próxima volta
+            if self._stat() != stamp:
+                continue
+            self._stamp = stamp
+            with self._lock:
+                self._pending = layout
+
+    def take(self) -> Optional[ZoneLayout]:
+        """Nova configuração pronta desde a última chamada, ou None"""
+        if self._pending is None:
+            return None
+        with self._lock:
+            layout, self._pending = self._pending, None
+        if layout is not None:
+            self.reloads += 1
+        return layout
+
+    def close(self) -> None:
+        """Para a thread de observação"""
+        self._stop.set()
+        self._thread.join()
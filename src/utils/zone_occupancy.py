@@ -0,0 +1,125 @@
+"""Ocupação das zonas por frame a partir de uma imagem de rótulos pré-rasterizada"""
+
+import cv2
+import numpy as np
+from typing import Any, Dict, List
+
+
+def rasterize_zones(zones: List[Dict[str, Any]], frame_width: int, frame_height: int) -> np.ndarray:
+    """
+    Rasteriza os polígonos das zonas em uma imagem de rótulos do tamanho do frame
+
+    O pixel vale 0 fora das zonas e i + 1 dentro da zona i (uint8 até 254 zonas,
+    uint16 acima). Em sobreposições vale a zona que aparece por último no arquivo.
+    """
+    dtype = np.uint8 if len(zones) < 255 else np.uint16
+    labels = np.zeros((max(1, int(frame_height)), max(1, int(frame_width))), dtype=dtype)
+    for i, zone in enumerate(zones):
+        pts = np.asarray(zone.get("points", []), dtype=np.int32).reshape(-1, 2)
+        if len(pts) < 3:
+            continue
+        cv2.fillPoly(labels, [pts.reshape(-1, 1, 2)], int(i + 1))
+    return labels
+
+
+class ZoneOccupancy:
+    """
+    Contagem de motos por zona e utilização da capacidade, frame a frame
+
+    As zonas são rasterizadas uma única vez por tamanho de frame; a cada frame os
+    centros das caixas viram zonas com uma única indexação na imagem de rótulos e
+    as contagens saem de um `np.bincount`, sem teste ponto-em-polígono em Python.
+    Também acumula, por zona, média, máximo e frames acima da capacidade.
+    """
+
+    def __init__(self, zones: List[Dict[str, Any]], frame_width: int, frame_height: int) -> None:
+        self.zones = zones
+        self.labels = rasterize_zones(zones, frame_width, frame_height)
+        capacity = []
+        for zone in zones:
+            try:
+                capacity.append(max(0.0, float(zone.get("capacity") or 0)))
+            except (TypeError, ValueError):
+                capacity.append(0.0)
+        # Capacidade 0 = zona sem capacidade configurada
+        self.capacity = np.asarray(capacity, dtype=np.float64)
+
+        n = len(zones)
+        self.counts = np.zeros(n, dtype=np.int64)
+        self._frames = np.zeros(n, dtype=np.int64)
+        self._count_sum = np.zeros(n, dtype=np.int64)
+        self._count_max = np.zeros(n, dtype=np.int64)
+        self._over_capacity = np.zeros(n, dtype=np.int64)
+
+    def locate(self, centers: np.ndarray) -> np.ndarray:
+        """Índice da zona de cada centro (x, y) em pixels; -1 fora de todas as zonas"""
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        zone_idx = np.full(len(centers), -1, dtype=np.int64)
+        if len(centers) == 0:
+            return zone_idx
+
+        h, w = self.labels.shape
+        x = np.floor(centers[:, 0])
+        y = np.floor(centers[:, 1])
+        inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+        zone_idx[inside] = self.labels[y[inside].astype(np.int64), x[inside].astype(np.int64)].astype(np.int64) - 1
+        return zone_idx
+
+    def count(self, centers: np.ndarray) -> np.ndarray:
+        """Quantidade de centros em cada zona (não altera o estado acumulado)"""
+        zone_idx = self.locate(centers)
+        return np.bincount(zone_idx + 1, minlength=len(self.zones) + 1)[1:].astype(np.int64)
+
+    def update(self, centers: np.ndarray) -> np.ndarray:
+        """Conta os centros do frame atual por zona e acumula as estatísticas"""
+        return self.accumulate(self.locate(centers))
+
+    def accumulate(self, zone_idx: np.ndarray) -> np.ndarray:
+        """Como `update`, a partir das zonas já localizadas com `locate`"""
+        counts = np.bincount(np.asarray(zone_idx) + 1, minlength=len(self.zones) + 1)[1:].astype(np.int64)
+        self.counts = counts
+        self._frames += 1
+        self._count_sum += counts
+        np.maximum(self._count_max, counts, out=self._count_max)
+        self._over_capacity += (self.capacity > 0) & (counts > self.capacity)
+        return counts
+
+    def carry_over(self, previous: "ZoneOccupancy") -> None:
+        """Herda os acumulados das zonas que continuam (mesmo id) de uma configuração anterior"""
+        old_index = {zone["id"]: i for i, zone in enumerate(previous.zones)}
+        for i, zone in enumerate(self.zones):
+            j = old_index.get(zone["id"])
+            if j is None:
+                continue
+            self.counts[i] = previous.counts[j]
+            self._frames[i] = previous._frames[j]
+            self._count_sum[i] = previous._count_sum[j]
+            self._count_max[i] = previous._count_max[j]
+            self._over_capacity[i] = previous._over_capacity[j]
+
+    def utilization(self, counts: np.ndarray) -> np.ndarray:
+        """Fração da capacidade ocupada por zona (NaN em zonas sem capacidade)"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.capacity > 0, counts / self.capacity, np.nan)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Ocupação atual e acumulada por zona, pronta para JSON"""
+        util = self.utilization(self.counts)
+        peak = self.utilization(self._count_max)
+        mean = self._count_sum / np.maximum(1, self._frames)
+        out: List[Dict[str, Any]] = []
+        for i, zone in enumerate(self.zones):
+            has_capacity = self.capacity[i] > 0
+            out.append({
+                "id": zone["id"],
+                "purpose": zone.get("purpose"),
+                "capacity": int(self.capacity[i]) if has_capacity else None,
+                "count": int(self.counts[i]),
+                "utilization": round(float(util[i]), 3) if has_capacity else None,
+                "mean_count": round(float(mean[i]), 2),
+                "max_count": int(self._count_max[i]),
+                "peak_utilization": round(float(peak[i]), 3) if has_capacity else None,
+                "frames_over_capacity": int(self._over_capacity[i]),
+                "frames": int(self._frames[i]),
+            })
+        return out
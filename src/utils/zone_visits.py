@@ -0,0 +1,147 @@
+"""Visitas às zonas (entrada, saída e permanência) por ID canônico, atualizadas a cada frame"""
+
+import numpy as np
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class _VisitState:
+    """Zona atual de um ID canônico e a transição pendente (debounce)"""
+
+    def __init__(self, frame: int) -> None:
+        # Zona confirmada (-1 = fora de todas as zonas)
+        self.zone = -1
+        self.entered_at: Optional[datetime] = None
+        self.last_in_at: Optional[datetime] = None
+        self.dwell_frames = 0
+        self.last_seen = frame
+        # Zona observada que ainda não durou o bastante para virar transição
+        self.candidate: Optional[int] = None
+        self.candidate_at: Optional[datetime] = None
+        self.candidate_frames = 0
+
+
+class ZoneVisitTracker:
+    """
+    Máquina de estados incremental de visitas às zonas por ID canônico
+
+    Cada ID tem uma zona confirmada; uma troca de zona (inclusive para fora) só
+    vale depois de `debounce` frames seguidos na zona nova, então caixas tremendo
+    na borda não geram visitas de um frame. A entrada é datada no primeiro frame
+    da sequência e a saída no último frame observado na zona antiga. IDs que somem
+    por mais de `exit_after` frames têm a visita encerrada. O custo por frame é
+    proporcional aos IDs ativos; visitas encerradas saem como registros compactos.
+    """
+
+    def __init__(self, zones: List[Dict[str, Any]], debounce: int = 5, exit_after: int = 45) -> None:
+        self.zones = zones
+        self.debounce = max(1, int(debounce))
+        self.exit_after = max(0, int(exit_after))
+        self._states: Dict[int, _VisitState] = {}
+        self.closed = 0
+
+    def open_count(self) -> int:
+        """Quantidade de visitas em andamento"""
+        return sum(1 for state in self._states.values() if state.zone >= 0)
+
+    def update(
+        self, canonical_ids: Sequence[int], zone_idx: np.ndarray, frame: int, at: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Processa as zonas observadas dos IDs no frame atual
+
+        Returns:
+            Visitas encerradas neste frame
+        """
+        closed: List[Dict[str, Any]] = []
+        for cid, zone in zip(canonical_ids, np.asarray(zone_idx).tolist()):
+            state = self._states.get(cid)
+            if state is None:
+                state = _VisitState(frame)
+                self._states[cid] = state
+            state.last_seen = frame
+            self._observe(cid, state, int(zone), at, closed)
+
+        # IDs que não aparecem há mais de exit_after frames saem da zona
+        for cid in [cid for cid, state in self._states.items() if frame - state.last_seen > self.exit_after]:
+            state = self._states.pop(cid)
+            if state.zone >= 0:
+                closed.append(self._close(cid, state, "lost"))
+        return closed
+
+    def set_zones(self, zones: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Troca a configuração de zonas mantendo as visitas das zonas que continuam
+
+        Zonas são casadas pelo id; visitas a zonas que deixaram de existir são
+        encerradas e retornadas. Transições pendentes são descartadas.
+        """
+        new_index = {zone["id"]: i for i, zone in enumerate(zones)}
+        closed: List[Dict[str, Any]] = []
+        for cid, state in self._states.items():
+            state.candidate = None
+            if state.zone < 0:
+                continue
+            idx = new_index.get(self.zones[state.zone]["id"])
+            if idx is None:
+                closed.append(self._close(cid, state, "reload"))
+            else:
+                state.zone = idx
+        self.zones = zones
+        return closed
+
+    def close_all(self, reason: str = "end") -> List[Dict[str, Any]]:
+        """Encerra todas as visitas em andamento (fim da fonte)"""
+        closed = [self._close(cid, state, reason) for cid, state in self._states.items() if state.zone >= 0]
+        self._states.clear()
+        return closed
+
+    def _observe(
+        self, cid: int, state: _VisitState, zone: int, at: datetime, closed: List[Dict[str, Any]]
+    ) -> None:
+        if zone == state.zone:
+            state.candidate = None
+            if zone >= 0:
+                state.dwell_frames += 1
+                state.last_in_at = at
+            return
+
+        if state.candidate != zone:
+            state.candidate = zone
+            state.candidate_at = at
+            state.candidate_frames = 0
+        state.candidate_frames += 1
+
+        if state.candidate_frames < self.debounce:
+            # Transição pendente: o frame ainda conta para a zona confirmada
+            if state.zone >= 0:
+                state.dwell_frames += 1
+            return
+
+        if state.zone >= 0:
+            # Os frames pendentes já pertencem à zona nova
+            state.dwell_frames -= state.candidate_frames - 1
+            closed.append(self._close(cid, state, "exit"))
+        state.zone = zone
+        state.candidate = None
+        if zone >= 0:
+            state.entered_at = state.candidate_at
+            state.last_in_at = at
+            state.dwell_frames = state.candidate_frames
+
+    def _close(self, cid: int, state: _VisitState, reason: str) -> Dict[str, Any]:
+        entered_at = state.entered_at
+        exited_at = state.last_in_at or entered_at
+        record = {
+            "track_id": int(cid),
+            "zone": self.zones[state.zone]["id"],
+            "entered_at": entered_at,
+            "exited_at": exited_at,
+            "dwell_frames": int(state.dwell_frames),
+            "dwell_seconds": round(max(0.0, (exited_at - entered_at).total_seconds()), 3),
+            "reason": reason,
+        }
+        state.zone = -1
+        state.dwell_frames = 0
+        self.closed += 1
+        return record
@@ -65,3 +65,37 @@ def read_zones_config(
         )
 
     return zones_out
+
+
+def zones_bounding_rois(
+    zones: List[Dict[str, Any]], frame_width: int, frame_height: int, pad: int = 0
+) -> List[Tuple[int, int, int, int]]:
+    """Calcula retângulos (x1, y1, x2, y2) que cobrem as zonas, unindo os sobrepostos"""
+    rects: List[List[int]] = []
+    for zone in zones:
+        pts = np.asarray(zone.get("points", []))
+        if pts.size == 0:
+            continue
+        x1 = max(0, int(np.floor(pts[:, 0].min())) - pad)
+        y1 = max(0, int(np.floor(pts[:, 1].min())) - pad)
+        x2 = min(frame_width, int(np.ceil(pts[:, 0].max())) + pad)
+        y2 = min(frame_height, int(np.ceil(pts[:, 1].max())) + pad)
+        if x2 > x1 and y2 > y1:
+            rects.append([x1, y1, x2, y2])
+
+    # Une retângulos que se sobrepõem até não haver mais interseções
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                a, b = rects[i], rects[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    rects[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del rects[j]
+                    merged = True
+                    break
+            if merged:
+                break
+
+    return [(r[0], r[1], r[2], r[3]) for r in rects]
@@ -0,0 +1,88 @@
+"""Testes do JsonLogger (escrita em segundo plano e recuperação de falhas)"""
+
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from src.logging import json_logger as json_logger_module
+from src.logging.json_logger import JsonLogger, read_ndjson_document
+
+
+class _FailingStream:
+    """Arquivo cujo `write` falha nas primeiras `failures` chamadas"""
+
+    def __init__(self, stream, failures: int = 1) -> None:
+        self._stream = stream
+        self.failures = failures
+
+    def write(self, text: str) -> int:
+        if self.failures > 0:
+            self.failures -= 1
+            self._stream.write(text[: len(text) // 2])
+            raise OSError("disco cheio")
+        return self._stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "tempo esgotado"
+        time.sleep(0.01)
+
+
+def _motos(path: str):
+    if path.endswith(".ndjson"):
+        document = read_ndjson_document(path)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+    return [m["track_id"] for m in document["sources"]["cam"]["motos"]]
+
+
+def test_failed_json_group_is_written_at_close(tmp_path, monkeypatch):
+    path = str(tmp_path / "motos.json")
+    real_write = json_logger_module._write_text_atomic
+    calls = {"n": 0}
+
+    def fail_once(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise OSError("disco cheio")
+        return real_write(*args, **kwargs)
+
+    monkeypatch.setattr(json_logger_module, "_write_text_atomic", fail_once)
+    logger = JsonLogger(path, source_desc="cam", durability="batch", flush_interval=0.01)
+    committed = []
+    logger.on_commit = committed.extend
+    logger.insert_moto(1, 10.0, 20.0, datetime.now())
+    _wait_for(lambda: logger.failed == 1)
+    logger.close()
+
+    assert _motos(path) == [1]
+    assert committed == [1]
+
+
+@pytest.mark.parametrize("durability", ["every", "batch"])
+def test_failed_ndjson_group_lands_once(tmp_path, durability):
+    path = str(tmp_path / "motos.ndjson")
+    logger = JsonLogger(path, source_desc="cam", durability=durability, flush_interval=0.01)
+    committed = []
+    logger.on_commit = committed.extend
+    with logger._wake:
+        logger._stream = _FailingStream(logger._stream)
+    logger.insert_moto(1, 10.0, 20.0, datetime.now())
+    _wait_for(lambda: logger.failed == 1)
+    if durability == "batch":
+        # Nova tentativa no próximo flush, sem precisar de outra inserção
+        _wait_for(lambda: committed == [1])
+    logger.insert_moto(2, 10.0, 20.0, datetime.now())
+    logger.close()
+
+    # A linha cortada pela falha foi descartada e o grupo entrou uma única vez
+    assert _motos(path) == [1, 2]
+    assert committed == [1, 2]
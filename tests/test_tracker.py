@@ -0,0 +1,37 @@
+"""Testes do MotorcycleTracker"""
+
+import numpy as np
+import pytest
+import supervision as sv
+
+from src.detection.tracker import MotorcycleTracker
+
+
+def _flicker_frames(n_motos: int, n_frames: int):
+    """Motos paradas que somem 10 frames a cada 20 (o ByteTrack troca o tid a cada volta)"""
+    xy = np.array([[20 + (i % 40) * 45, 20 + (i // 40) * 100] for i in range(n_motos)], dtype=np.float32)
+    boxes = np.hstack([xy, xy + 30])
+    for frame in range(n_frames):
+        visible = ((np.arange(n_motos) + frame) % 20) < 10
+        count = int(visible.sum())
+        yield sv.Detections(
+            xyxy=boxes[visible],
+            confidence=np.full(count, 0.9, dtype=np.float32),
+            class_id=np.full(count, 3),
+        )
+
+
+@pytest.mark.parametrize("backend", ["supervision", "native"])
+def test_track_mapping_stays_bounded_while_ids_change_tid(backend):
+    n_motos = 100
+    tracker = MotorcycleTracker(track_buffer=4, reassoc_window=60, min_track_frames=1, backend=backend)
+    for detections in _flicker_frames(n_motos, 400):
+        tracker.update(detections)
+
+    # Os IDs canônicos continuam vivos (reassociados), mas os tids descartados saem
+    assert tracker.get_unique_count() == n_motos
+    assert tracker.get_state_size()["canonical_ids"] == n_motos
+    assert len(tracker.store.track_slot) <= n_motos
+    assert tracker.get_state_size()["tracks"] <= n_motos
+    # O checkpoint cresce com os tracks vivos, não com a idade do stream
+    assert len(tracker.snapshot()["store_track_tids"]) <= n_motos